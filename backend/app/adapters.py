@@ -0,0 +1,202 @@
+"""
+adapters.py
+
+LoRA adapter serving on a single base model. train_finetune.py produces PEFT LoRA adapters;
+instead of loading a full 7B model per fine-tuned variant, the base is loaded once and every
+adapter in LORA_ADAPTERS is attached to it. Requests name an adapter (per task or model
+version) and the manager activates it with set_adapter.
+
+The active adapter is model-global state, so jobs hold it for their whole model call: jobs
+for the active adapter run concurrently, a job for another adapter waits until they drain,
+and new jobs for the active adapter queue behind a pending switch so it is not starved.
+With MERGE_DEFAULT_ADAPTER the default adapter is merged into the base weights (no LoRA
+overhead on the common path) and only unmerged while another adapter is active.
+"""
+import functools
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LORA_ADAPTERS = os.getenv("LORA_ADAPTERS", "")  # "name=path,name2=path2"; a bare path is named after its directory
+DEFAULT_ADAPTER = os.getenv("DEFAULT_ADAPTER", "")  # Empty uses the first adapter in LORA_ADAPTERS
+MERGE_DEFAULT_ADAPTER = os.getenv("MERGE_DEFAULT_ADAPTER", "false").lower() == "true"
+BASE_MODEL_VERSION = os.getenv("MODEL_VERSION", "7b-instruction-tuned")
+
+
+def parse_adapter_spec(spec: str) -> "OrderedDict[str, str]":
+    """Parse LORA_ADAPTERS into an ordered name -> path mapping"""
+    adapters: "OrderedDict[str, str]" = OrderedDict()
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, path = entry.partition("=")
+        if not sep:
+            name, path = os.path.basename(entry.rstrip("/")), entry
+        name, path = name.strip(), path.strip()
+        if not name or not path:
+            raise ValueError(f"Invalid LoRA adapter entry {entry!r}, expected name=path")
+        if name in adapters:
+            raise ValueError(f"Duplicate LoRA adapter name {name!r}")
+        adapters[name] = path
+    return adapters
+
+
+class AdapterManager:
+    """
+    Registry and switcher for the LoRA adapters of one base model.
+
+    Args:
+        adapters: Adapter name -> PEFT adapter path
+        default: Adapter serving requests that do not name one (defaults to the first)
+        merge: Merge the default adapter's weights into the base model
+        base_version: model_version reported without adapters
+    """
+
+    def __init__(self, adapters: Dict[str, str], default: Optional[str] = None, merge: bool = False,
+                 base_version: str = BASE_MODEL_VERSION):
+        self.adapters = OrderedDict(adapters)
+        self.default = default or next(iter(self.adapters), None)
+        if self.default is not None and self.default not in self.adapters:
+            raise ValueError(f"Default adapter {self.default!r} is not in {list(self.adapters)}")
+        self.merge = merge
+        self.base_version = base_version
+        self._model = None
+        self._loader: Optional[Callable[[], Any]] = None
+        self._active: Optional[str] = None
+        self._merged = False
+        self._running = 0
+        self._waiting: Counter = Counter()
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {"switches": 0, "jobs": Counter()}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.adapters)
+
+    def attach(self, model):
+        """Load every adapter onto the base model with PEFT; returns the model to serve"""
+        if not self.enabled:
+            return model
+        from peft import PeftModel
+        names = [self.default] + [name for name in self.adapters if name != self.default]
+        logger.info(f"Attaching LoRA adapters {names} (default {self.default}, merge={self.merge})")
+        model = PeftModel.from_pretrained(model, self.adapters[self.default], adapter_name=self.default)
+        for name in names[1:]:
+            model.load_adapter(self.adapters[name], adapter_name=name)
+        if self.merge and len(names) == 1:
+            # Nothing to switch to: fold the adapter in for good and drop the LoRA layers
+            model = model.merge_and_unload()
+            self._model, self._active, self._merged = None, self.default, True
+            model.eval()
+            return model
+        model.eval()
+        self.bind(model)
+        return model
+
+    def set_loader(self, loader: Callable[[], Any]):
+        """Model load function (model_inference.get_model) that attaches and binds the adapters;
+        use() calls it first, so no job runs on the base model before set_adapter is possible"""
+        self._loader = loader
+
+    def bind(self, model):
+        """Serve a model that already carries the adapters (PEFT-style set_adapter/merge_adapter)"""
+        with self._cond:
+            self._model = model
+            self._active = None
+            self._merged = False
+            self._switch(self.default)
+
+    def _switch(self, name: str):
+        if self._merged:
+            self._model.unmerge_adapter()
+            self._merged = False
+        self._model.set_adapter(name)
+        if self.merge and name == self.default:
+            self._model.merge_adapter()
+            self._merged = True
+        if self._active is not None:
+            self._stats["switches"] += 1
+            logger.debug(f"Switched LoRA adapter {self._active} -> {name}")
+        self._active = name
+
+    def resolve(self, name: Optional[str] = None) -> Optional[str]:
+        """Adapter serving a request: the named one, the one this thread already holds, or the default"""
+        if name is None:
+            return getattr(self._local, "held", None) or self.default
+        if name not in self.adapters:
+            raise ValueError(f"Unknown LoRA adapter {name!r}, expected one of {list(self.adapters)}")
+        return name
+
+    def _can_enter(self, name: str) -> bool:
+        if name == self._active:
+            return not any(count for other, count in self._waiting.items() if other != name)
+        return self._running == 0
+
+    @contextmanager
+    def use(self, name: Optional[str] = None) -> Iterator[Optional[str]]:
+        """
+        Hold an adapter active for the duration of a model call; yields the adapter name.
+        Re-entrant: nested calls on the same thread share the outer adapter.
+        """
+        held = getattr(self._local, "held", None)
+        name = self.resolve(name)
+        if held is not None:
+            if name != held:
+                raise RuntimeError(f"Cannot switch to adapter {name!r} while holding {held!r}")
+            yield held
+            return
+        if self.enabled and self._model is None and not self._merged and self._loader is not None:
+            self._loader()  # Concurrent first callers share one load, which binds the model
+
+        with self._cond:
+            self._waiting[name] += 1
+            try:
+                while not self._can_enter(name):
+                    self._cond.wait()
+            finally:
+                self._waiting[name] -= 1
+            if self._active != name:
+                if self._model is not None:
+                    self._switch(name)
+                else:
+                    # No adapters, or the only one is merged into the weights: nothing to switch
+                    self._active = name
+                self._cond.notify_all()  # jobs queued behind this switch may now enter
+            self._running += 1
+            self._stats["jobs"][name] += 1
+        self._local.held = name
+        try:
+            yield name
+        finally:
+            self._local.held = None
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def holding(self, fn: Callable) -> Callable:
+        """Decorator: run fn holding the adapter this thread already holds, or the default"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.use():
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def model_version(self, name: Optional[str] = None) -> str:
+        """Version string for responses: the base version plus the adapter used"""
+        return f"{self.base_version}+{name}" if name else self.base_version
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "adapters": list(self.adapters),
+                "default": self.default,
+                "active": self._active,
+                "merged": self._merged,
+                "running": self._running,
+                "switches": self._stats["switches"],
+                "jobs": dict(self._stats["jobs"]),
+            }
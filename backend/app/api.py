@@ -5,18 +5,38 @@ FastAPI application exposing production-ready endpoints for news summarization a
 Designed for high-throughput processing of ~30,000 articles per day with structured outputs for 
 downstream decision-making and research dashboards.
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from .model_inference import (
     summarize_article,
     batch_summarize,
     importance_score,
-    process_article_batch
+    process_article_batch,
+    summarize_and_score_async,
+    process_article_batch_async,
+    importance_score_async,
+    stream_summary_async,
+    start_background_warmup,
+    model_ready,
+    warmup_status,
+    adapter_manager,
+    inference_executor,
+    summary_cache
 )
+from .executor import InferenceBusy
+from .fingerprint import content_fingerprint
+from .worker_pool import get_worker_client, INFERENCE_QUEUE, WorkerTimeout
+from .decoding import decoding_stats
+from .metrics import CONTENT_TYPE, Gauge, render as render_metrics
+
 import logging
+import os
+
+DecodingProfile = Literal["fast", "balanced", "quality", "sampled"]
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,14 +56,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Load and warm up the model at startup instead of on the first request
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+WARMUP_RETRY_AFTER_SECONDS = 10
+# Model runs in separate worker processes (worker_pool.py); this process only queues jobs
+REMOTE_INFERENCE = INFERENCE_QUEUE != "none"
+
+Gauge("simplenews_inference_inflight", "Inference jobs running or queued in this process",
+      lambda: inference_executor.stats()["inflight"])
+Gauge("simplenews_inference_queue_depth", "Inference jobs waiting for an executor slot",
+      lambda: inference_executor.stats()["queue_depth"])
+Gauge("simplenews_summary_cache_entries", "Entries in the local summary cache", lambda: len(summary_cache))
+
+@app.on_event("startup")
+async def warmup_model():
+    if REMOTE_INFERENCE:
+        get_worker_client()
+    elif MODEL_WARMUP:
+        start_background_warmup()
+
+@app.exception_handler(InferenceBusy)
+async def inference_busy_handler(request, exc: InferenceBusy):
+    """Backpressure: the inference queue is full, ask the client to back off"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(WorkerTimeout)
+async def worker_timeout_handler(request, exc: WorkerTimeout):
+    """The inference workers did not answer in time"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+def _check_adapter(adapter: Optional[str]):
+    """Reject unknown LoRA adapter names with 400 before any work is queued"""
+    if adapter is not None and adapter not in adapter_manager.adapters:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown adapter {adapter!r}, available: {list(adapter_manager.adapters)}"
+        )
+
+def _require_model():
+    """Reject inference requests with 503 until the background warmup has finished"""
+    if not REMOTE_INFERENCE and not model_ready():
+        status = warmup_status()
+        detail = "Model failed to load" if status["status"] == "failed" else "Model is warming up, retry shortly"
+        raise HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(WARMUP_RETRY_AFTER_SECONDS)}
+        )
+
 # Request/Response Models with structured schemas
 class ArticleRequest(BaseModel):
     article: str = Field(..., description="News article text to summarize", min_length=50)
     use_cache: bool = Field(True, description="Whether to use cached results")
+    profile: Optional[DecodingProfile] = Field(None, description="Decoding profile (defaults to DECODING_PROFILE)")
+    adapter: Optional[str] = Field(None, description="LoRA adapter name (defaults to DEFAULT_ADAPTER)")
 
 class BatchRequest(BaseModel):
     articles: List[str] = Field(..., description="List of article texts", min_items=1, max_items=100)
     batch_size: Optional[int] = Field(None, description="Custom batch size for processing")
+    profile: Optional[DecodingProfile] = Field(None, description="Decoding profile (defaults to DECODING_PROFILE)")
+    adapter: Optional[str] = Field(None, description="LoRA adapter name (defaults to DEFAULT_ADAPTER)")
 
 class SummaryResponse(BaseModel):
     """Structured response for single article summarization"""
@@ -65,6 +141,8 @@ class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     model_loaded: bool
+    model_status: str
+    warmup: Dict[str, Any]
     cache_size: int
     timestamp: str
 
@@ -72,13 +150,24 @@ class HealthResponse(BaseModel):
 async def health_check():
     """Health check endpoint for monitoring"""
     from .model_inference import _model_loaded, summary_cache
+    warmup = warmup_status()
     return {
-        "status": "healthy",
+        "status": "healthy" if model_ready() else ("unhealthy" if warmup["status"] == "failed" else "starting"),
         "model_loaded": _model_loaded,
-        "cache_size": len(summary_cache) if summary_cache else 0,
+        "model_status": warmup["status"],
+        "warmup": warmup,
+        "cache_size": len(summary_cache),
         "timestamp": datetime.utcnow().isoformat()
     }
 
+async def _process_articles(articles: List[str], profile: Optional[str] = None,
+                            adapter: Optional[str] = None, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """process_article_batch on the worker pool, or in-process on the bounded executor"""
+    if REMOTE_INFERENCE:
+        return await get_worker_client().process_async(articles, profile=profile, adapter=adapter,
+                                                       use_cache=use_cache)
+    return await process_article_batch_async(articles, profile, adapter, use_cache)
+
 @app.post("/summarize", response_model=SummaryResponse)
 async def summarize(req: ArticleRequest):
     """
@@ -86,11 +175,19 @@ async def summarize(req: ArticleRequest):
     
     Returns structured output suitable for downstream integration.
     """
+    _check_adapter(req.adapter)
+    _require_model()
     try:
         start_time = datetime.utcnow()
         
-        summary = summarize_article(req.article, use_cache=req.use_cache)
-        score = importance_score(req.article, summary)
+        if REMOTE_INFERENCE or req.adapter:
+            # Adapter requests run as a batch of one holding that adapter
+            result = (await _process_articles([req.article], req.profile, req.adapter, req.use_cache))[0]
+            summary, score, model_version = result["summary"], result["score"], result["model_version"]
+        else:
+            # Runs on the bounded inference executor; concurrent requests share batched model calls
+            summary, score = await summarize_and_score_async(req.article, use_cache=req.use_cache, profile=req.profile)
+            model_version = adapter_manager.model_version(adapter_manager.default)
         
         return SummaryResponse(
             summary=summary,
@@ -98,8 +195,10 @@ async def summarize(req: ArticleRequest):
             timestamp=datetime.utcnow().isoformat(),
             article_length=len(req.article),
             summary_length=len(summary),
-            model_version="7b-instruction-tuned"
+            model_version=model_version
         )
+    except (InferenceBusy, WorkerTimeout):
+        raise
     except Exception as e:
         logger.error(f"Error in summarize endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -114,10 +213,12 @@ async def batch_summarize_endpoint(req: BatchRequest, background_tasks: Backgrou
     """
     import time
     start_time = time.time()
+    _check_adapter(req.adapter)
+    _require_model()
     
     try:
         # Process batch with optimized batching
-        results = process_article_batch(req.articles)
+        results = await _process_articles(req.articles, req.profile, req.adapter)
         
         # Convert to response format
         summary_responses = [
@@ -127,7 +228,7 @@ async def batch_summarize_endpoint(req: BatchRequest, background_tasks: Backgrou
                 timestamp=r["timestamp"],
                 article_length=r["article_length"],
                 summary_length=r["summary_length"],
-                model_version="7b-instruction-tuned"
+                model_version=r["model_version"]
             )
             for r in results
         ]
@@ -140,29 +241,87 @@ async def batch_summarize_endpoint(req: BatchRequest, background_tasks: Backgrou
             processing_time_ms=processing_time,
             batch_size=req.batch_size or 8
         )
+    except (InferenceBusy, WorkerTimeout):
+        raise
     except Exception as e:
         logger.error(f"Error in batch_summarize endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/process_stream")
-async def process_stream(articles: List[str]):
+async def process_stream(articles: List[str] = Body(..., min_items=1, max_items=100), stream_tokens: bool = False,
+                         profile: Optional[DecodingProfile] = None):
     """
     Stream processing endpoint for continuous article ingestion.
     
-    Optimized for real-time processing of articles as they arrive.
-    Returns results as they are processed (streaming response).
+    Articles run on the bounded inference executor, at most its worker count at a time per
+    stream, and results are sent as SSE events in completion order, each carrying the index
+    of its input article. Answers 429 up front when the executor (or worker queue) is full; an article
+    rejected later is reported as an error event with retry_after.
+    With stream_tokens=true, summary text is also streamed as it is generated.
+    
+    Events:
+        {"type": "token", "index", "text"}: summary text chunk (stream_tokens only)
+        {"type": "result", "index", "summary", "score", ...}: finished article
+        {"type": "error", "index", "error"}: failed article
     """
     from fastapi.responses import StreamingResponse
+    import asyncio
     import json
+    _require_model()
+    (get_worker_client() if REMOTE_INFERENCE else inference_executor).check_capacity()
     
     async def generate():
-        for article in articles:
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        # One stream must not take every executor slot and queue position by itself
+        slots = asyncio.Semaphore(inference_executor.max_workers)
+        
+        async def process(index: int, article: str):
             try:
-                result = process_article_batch([article])[0]
-                yield f"data: {json.dumps(result)}\n\n"
+                if REMOTE_INFERENCE:
+                    # Workers batch concurrent jobs; token streaming is in-process only
+                    async with slots:
+                        result = (await get_worker_client().process_async([article], profile=profile))[0]
+                    summary, score = result["summary"], result["score"]
+                elif stream_tokens:
+                    def on_text(text: str):
+                        loop.call_soon_threadsafe(events.put_nowait, {"type": "token", "index": index, "text": text})
+                    fingerprint = content_fingerprint(article)
+                    async with slots:
+                        summary = await stream_summary_async(article, on_text, profile=profile, fingerprint=fingerprint)
+                        score = await importance_score_async(article, summary, fingerprint)
+                else:
+                    # summarize_and_score still goes through the micro-batcher from the executor thread
+                    async with slots:
+                        summary, score = await summarize_and_score_async(article, profile=profile)
+                event = {
+                    "type": "result",
+                    "index": index,
+                    "summary": summary,
+                    "score": score,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "article_length": len(article),
+                    "summary_length": len(summary)
+                }
+            except InferenceBusy as e:
+                event = {"type": "error", "index": index, "error": str(e), "retry_after": e.retry_after}
             except Exception as e:
-                logger.error(f"Error processing article in stream: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                logger.error(f"Error processing article {index} in stream: {e}")
+                event = {"type": "error", "index": index, "error": str(e)}
+            events.put_nowait(event)
+        
+        tasks = [asyncio.create_task(process(index, article)) for index, article in enumerate(articles)]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await events.get()
+                if event["type"] != "token":
+                    remaining -= 1
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            # Client went away: stop waiting on work nobody will read
+            for task in tasks:
+                task.cancel()
     
     return StreamingResponse(generate(), media_type="text/event-stream")
 
@@ -171,16 +330,38 @@ async def get_stats():
     """
     Get system statistics for monitoring and optimization.
     """
-    from .model_inference import summary_cache, score_cache, _model_loaded
+    from .model_inference import (
+        summary_cache, score_cache, _model_loaded, summary_batcher, model_loader, inference_executor
+    )
     
+    summary_stats = summary_cache.stats()
+    score_stats = score_cache.stats()
     return {
         "model_loaded": _model_loaded,
-        "summary_cache_size": len(summary_cache) if summary_cache else 0,
-        "score_cache_size": len(score_cache) if score_cache else 0,
-        "cache_hit_rate": "N/A",  # Can be implemented with metrics
+        "summary_cache_size": len(summary_cache),
+        "score_cache_size": len(score_cache),
+        "cache_hit_rate": {
+            "summary": summary_stats["hit_rate"],
+            "score": score_stats["hit_rate"]
+        },
+        "cache_stats": {
+            "summary": summary_stats,
+            "score": score_stats
+        },
+        "micro_batching": summary_batcher.stats(),
+        "model_loading": model_loader.stats(),
+        "inference_executor": inference_executor.stats(),
+        "decoding": decoding_stats(),
+        "adapters": adapter_manager.stats(),
+        "worker_pool": get_worker_client().stats() if REMOTE_INFERENCE else None,
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms in the Prometheus text format"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -193,7 +374,8 @@ async def root():
             "/batch_summarize": "Batch processing for high throughput",
             "/process_stream": "Streaming processing endpoint",
             "/health": "Health check",
-            "/stats": "System statistics"
+            "/stats": "System statistics",
+            "/metrics": "Prometheus metrics"
         }
     }
 
@@ -0,0 +1,153 @@
+"""
+batching.py
+
+Dynamic micro-batching for single-item inference requests.
+Callers submit one item and get a Future back; a background thread gathers queued items
+until the batch is full or the max-wait deadline passes, runs them through one batch
+function call and resolves each caller's Future with its own result.
+Also holds the length-bucketing planner used to cut padding waste in batch_summarize.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Gather concurrent single-item requests into batches.
+
+    Args:
+        batch_fn: Takes a list of items, returns a list of results in the same order
+        max_batch_size: Largest batch passed to batch_fn
+        max_wait_ms: How long the first item of a batch waits for company
+        name: Thread name, used in logs
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 5.0, name: str = "micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self.last_queue_wait_ms = 0.0  # Longest queue wait in the batch being run, for deadline-aware callers
+        self._stats = {"batches": 0, "items": 0, "max_batch_size_seen": 0, "queue_wait_ms_total": 0.0}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the returned Future resolves with its result"""
+        if self._stopped:
+            raise RuntimeError(f"{self.name} is stopped")
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    def _gather(self) -> List[tuple]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Drain whatever is already queued even once the deadline has passed
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._stopped = True
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while not (self._stopped and self._queue.empty()):
+            batch = self._gather()
+            if not batch:
+                break
+            # Skip futures cancelled while waiting
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.monotonic()
+            self._stats["queue_wait_ms_total"] += sum(started - queued_at for _, _, queued_at in batch) * 1000
+            self.last_queue_wait_ms = (started - min(queued_at for _, _, queued_at in batch)) * 1000
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
+
+    def stop(self):
+        """Finish queued work and stop the background thread"""
+        self._stopped = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["avg_queue_wait_ms"] = round(stats.pop("queue_wait_ms_total") / stats["items"], 3) if stats["items"] else 0.0
+        return stats
+
+
+def plan_length_batches(lengths: List[int], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Group item indices into batches of similar token length.
+    Items are sorted by length and a batch is closed once its padded size
+    (longest item x batch size) would exceed max_batch_tokens. An item longer
+    than the budget gets a batch of its own.
+
+    Returns:
+        Lists of original indices, one list per batch
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches, current = [], []
+    for idx in order:
+        # Sorted ascending, so the incoming item is the longest in the batch
+        padded = (len(current) + 1) * lengths[idx]
+        if current and (padded > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padding_stats(lengths: List[int], batches: List[List[int]]) -> Dict[str, Any]:
+    """Real vs padded token counts for a batch plan; padding_ratio is the wasted fraction"""
+    real = sum(lengths)
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
+    return {
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "padding_ratio": round(1 - real / padded, 4) if padded else 0.0,
+    }
@@ -0,0 +1,117 @@
+"""
+cpu_backend.py
+
+Model loading for CPU-only workers. fp16 matmuls are slow or unsupported on most CPUs,
+so instead of the GPU fp16 path the model is loaded in one of:
+
+    fp32  - full precision reference (default)
+    bf16  - half the memory, fast on CPUs with AVX512-BF16/AMX
+    int8  - fp32 weights with nn.Linear layers dynamically quantized to int8
+    onnx  - exported to ONNX Runtime with all graph optimizations enabled (needs optimum[onnxruntime])
+
+bf16 and int8 change summaries and scores slightly, so they are opt-in; check them with
+logit_parity first. The ONNX model only supports generate() and plain forward calls (the
+benchmarks); model_inference also needs the summarization pipeline, the prefix KV cache and
+forward-signature checks, so it only serves SERVING_BACKENDS.
+
+Also holds the parity check used to compare a backend against the fp32 reference.
+"""
+import logging
+import os
+from typing import Any, Dict, List
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+CPU_BACKENDS = ("fp32", "bf16", "int8", "onnx")
+SERVING_BACKENDS = ("fp32", "bf16", "int8")  # Torch models, usable by every model_inference path
+CPU_BACKEND = os.getenv("CPU_BACKEND", "fp32").lower()
+CPU_THREADS = int(os.getenv("CPU_THREADS", "0"))  # 0 keeps torch's default
+
+# ONNX Runtime is optional; without it the onnx backend falls back to int8
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForCausalLM
+    _HAS_ORT = True
+except ImportError:
+    _HAS_ORT = False
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Replace nn.Linear layers with dynamically quantized int8 versions (weights int8, activations fp32)"""
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name: str):
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if CPU_THREADS > 0:
+        session_options.intra_op_num_threads = CPU_THREADS
+    return ORTModelForCausalLM.from_pretrained(
+        model_name,
+        export=True,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+        use_cache=True
+    )
+
+
+def load_cpu_model(model_name: str, backend: str = CPU_BACKEND, model_cls=None):
+    """
+    Load a causal LM for CPU inference with the selected backend.
+
+    Args:
+        model_name: HuggingFace model id or local path
+        backend: One of CPU_BACKENDS
+        model_cls: Model class for the torch backends (defaults to AutoModelForCausalLM)
+    """
+    if backend not in CPU_BACKENDS:
+        raise ValueError(f"Unknown CPU_BACKEND {backend!r}, expected one of {CPU_BACKENDS}")
+    if CPU_THREADS > 0:
+        torch.set_num_threads(CPU_THREADS)
+
+    if backend == "onnx":
+        if _HAS_ORT:
+            logger.info(f"Loading {model_name} with ONNX Runtime (CPUExecutionProvider)")
+            return _load_onnx(model_name)
+        logger.warning("optimum[onnxruntime] not installed, falling back to int8 CPU backend")
+        backend = "int8"
+
+    if model_cls is None:
+        from transformers import AutoModelForCausalLM
+        model_cls = AutoModelForCausalLM
+    dtype = torch.bfloat16 if backend == "bf16" else torch.float32
+    logger.info(f"Loading {model_name} for CPU with backend={backend}")
+    model = model_cls.from_pretrained(
+        model_name,
+        torch_dtype=dtype,
+        low_cpu_mem_usage=True,
+        trust_remote_code=True
+    )
+    model.eval()
+    if backend == "int8":
+        model = quantize_model(model)
+    return model
+
+
+def logit_parity(tokenizer, reference, candidate, prompts: List[str]) -> Dict[str, Any]:
+    """
+    Compare next-token logits of a candidate backend with the reference model.
+
+    Returns:
+        max_abs_diff: Largest absolute logit difference (in fp32)
+        top1_agreement: Fraction of prompts whose argmax next token matches
+        top5_overlap: Mean overlap of the top-5 next tokens
+    """
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+    with torch.no_grad():
+        ref = reference(**inputs).logits[:, -1, :].float()
+        cand = candidate(**inputs).logits[:, -1, :].float()
+    ref_top5 = ref.topk(5, dim=-1).indices.tolist()
+    cand_top5 = cand.topk(5, dim=-1).indices.tolist()
+    return {
+        "max_abs_diff": round((ref - cand).abs().max().item(), 6),
+        "top1_agreement": round((ref.argmax(dim=-1) == cand.argmax(dim=-1)).float().mean().item(), 4),
+        "top5_overlap": round(sum(len(set(a) & set(b)) / 5 for a, b in zip(ref_top5, cand_top5)) / len(prompts), 4),
+    }
@@ -0,0 +1,75 @@
+"""
+decoding.py
+
+Named decoding profiles for summary generation and the deadline-aware downgrade rule.
+Beam search with 4 beams costs roughly 4x greedy, so callers pick the trade-off per request:
+
+    fast     - greedy, shorter summaries
+    balanced - 2 beams
+    quality  - 4 beams (the original settings, default)
+    sampled  - nucleus sampling, greedy cost
+
+With a latency budget (DECODING_LATENCY_BUDGET_MS) a request that already waited longer than
+the budget in the queue is served with the next cheaper profile (two steps past twice the
+budget), so p99 stays bounded under load.
+"""
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {"max_length": 128, "min_length": 32, "do_sample": False, "num_beams": 1},
+    "balanced": {"max_length": 192, "min_length": 48, "do_sample": False, "num_beams": 2, "early_stopping": True},
+    "quality": {"max_length": 256, "min_length": 64, "do_sample": False, "num_beams": 4, "early_stopping": True},
+    "sampled": {"max_length": 256, "min_length": 64, "do_sample": True, "num_beams": 1, "top_p": 0.9, "temperature": 0.7},
+}
+# Cheapest last; profiles not listed here are never downgraded
+DOWNGRADE_ORDER = ["quality", "balanced", "fast"]
+
+DEFAULT_PROFILE = os.getenv("DECODING_PROFILE", "quality")
+LATENCY_BUDGET_MS = float(os.getenv("DECODING_LATENCY_BUDGET_MS", "0"))  # 0 disables downgrades
+
+_stats_lock = threading.Lock()
+_stats = {"requested": Counter(), "used": Counter(), "downgrades": 0}
+
+
+def resolve_profile(name: Optional[str] = None, queue_wait_ms: float = 0.0,
+                    budget_ms: Optional[float] = None) -> str:
+    """
+    Profile to run for a request: the requested one (or DEFAULT_PROFILE), stepped down
+    DOWNGRADE_ORDER when the request already waited past the latency budget.
+    Raises ValueError for unknown profile names.
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile {name!r}, expected one of {list(DECODING_PROFILES)}")
+    budget_ms = LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+
+    used = name
+    if budget_ms > 0 and queue_wait_ms > budget_ms and name in DOWNGRADE_ORDER:
+        steps = 1 if queue_wait_ms <= 2 * budget_ms else 2
+        used = DOWNGRADE_ORDER[min(DOWNGRADE_ORDER.index(name) + steps, len(DOWNGRADE_ORDER) - 1)]
+
+    with _stats_lock:
+        _stats["requested"][name] += 1
+        _stats["used"][used] += 1
+        if used != name:
+            _stats["downgrades"] += 1
+    return used
+
+
+def profile_kwargs(name: str) -> Dict[str, Any]:
+    """Generation kwargs of a profile (pipeline style max_length/min_length)"""
+    return dict(DECODING_PROFILES[name])
+
+
+def decoding_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {
+            "default_profile": DEFAULT_PROFILE,
+            "latency_budget_ms": LATENCY_BUDGET_MS,
+            "requested": dict(_stats["requested"]),
+            "used": dict(_stats["used"]),
+            "downgrades": _stats["downgrades"],
+        }
@@ -0,0 +1,109 @@
+"""
+executor.py
+
+Bounded execution layer for blocking inference calls made from async handlers.
+Work runs on a dedicated thread pool so the event loop keeps serving /health and other
+requests while a long generation is in flight. Admission is bounded: once running +
+queued jobs reach max_workers + max_queue, new work is rejected with InferenceBusy so
+the API can answer 429 with Retry-After instead of building an unbounded backlog.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def current_queue_wait_ms() -> float:
+    """How long the job running on this thread waited for a worker (0 outside the executor)"""
+    return getattr(_local, "queue_wait_ms", 0.0)
+
+
+def _call_with_wait(submitted: float, fn: Callable, args, kwargs):
+    _local.queue_wait_ms = (time.monotonic() - submitted) * 1000
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _local.queue_wait_ms = 0.0
+
+
+class InferenceBusy(Exception):
+    """Raised when the inference executor's queue is full"""
+
+    def __init__(self, retry_after: int, message: str = "Inference queue is full"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Thread pool with a queue-depth limit.
+
+    Args:
+        max_workers: Concurrent inference jobs
+        max_queue: Jobs allowed to wait for a worker before submissions are rejected
+        retry_after: Seconds suggested to rejected clients
+        name: Thread name prefix, used in logs
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 64, retry_after: int = 5,
+                 name: str = "inference"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "max_inflight_seen": 0}
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._inflight -= 1
+            self._stats["failed" if future.exception() else "completed"] += 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn on the pool; raises InferenceBusy when the queue is full"""
+        with self._lock:
+            if self._inflight >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise InferenceBusy(self.retry_after)
+            self._inflight += 1
+            self._stats["submitted"] += 1
+            self._stats["max_inflight_seen"] = max(self._stats["max_inflight_seen"], self._inflight)
+        try:
+            future = self._pool.submit(_call_with_wait, time.monotonic(), fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._inflight -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def check_capacity(self, jobs: int = 1):
+        """Raise InferenceBusy unless jobs more submissions would be admitted right now"""
+        with self._lock:
+            if self._inflight + jobs > self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise InferenceBusy(self.retry_after)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Awaitable submit: the event loop is free while fn runs"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["inflight"] = self._inflight
+        stats["queue_depth"] = max(0, stats["inflight"] - self.max_workers)
+        stats["max_workers"] = self.max_workers
+        stats["max_queue"] = self.max_queue
+        return stats
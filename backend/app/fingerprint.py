@@ -0,0 +1,54 @@
+"""
+fingerprint.py
+
+Shared content fingerprint for articles. The fingerprint is computed once per article
+(at fetch time) and carried with it through summarization and scoring, so caches are
+keyed on normalized content instead of re-hashing multi-KB strings at every stage.
+"""
+import hashlib
+import html
+import re
+import unicodedata
+from typing import Optional
+
+# xxhash is much faster than the hashlib digests, but it is optional
+try:
+    import xxhash
+    _HAS_XXHASH = True
+except ImportError:
+    _HAS_XXHASH = False
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """
+    Normalize article text so trivial differences do not change the fingerprint.
+    Strips HTML markup, unescapes entities, applies NFKC and collapses whitespace.
+    """
+    if not text:
+        return ""
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    text = unicodedata.normalize("NFKC", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _digest(data: bytes) -> str:
+    if _HAS_XXHASH:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def content_fingerprint(text: str) -> str:
+    """Return the fingerprint of an article's normalized content."""
+    return _digest(normalize_content(text).encode("utf-8"))
+
+
+def cache_key(task: str, text: str = "", fingerprint: Optional[str] = None) -> str:
+    """
+    Build a cache key for a task (e.g. "summary", "score") on an article.
+    Pass a precomputed fingerprint to avoid hashing the text again.
+    """
+    return f"{task}:{fingerprint or content_fingerprint(text)}"
@@ -0,0 +1,172 @@
+"""
+inference_cache.py
+
+Two-tier cache for inference results (summaries, importance scores).
+Tier 1 is an in-process LRU bounded by bytes with per-entry expiry; tier 2 is the shared
+Redis instance so workers reuse each other's results. Failures are cached as negative
+entries with a short TTL so a bad input is not retried on every request but recovers quickly.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .metrics import CACHE_OP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Fixed per-entry overhead (OrderedDict node, tuple, floats) added to key/value sizes
+_ENTRY_OVERHEAD_BYTES = 100
+
+
+def _entry_size(key: str, payload: str) -> int:
+    return len(key) + len(payload) + _ENTRY_OVERHEAD_BYTES
+
+
+class InferenceCache:
+    """
+    LRU + Redis cache keyed by content fingerprint.
+
+    Args:
+        namespace: Redis key prefix, e.g. "summary" or "score"
+        max_bytes: Memory budget for the in-process tier
+        ttl: Lifetime of successful results in seconds
+        negative_ttl: Lifetime of cached failures in seconds
+        redis_client: Shared Redis client (None disables tier 2)
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, ttl: int, negative_ttl: int = 60,
+                 redis_client=None):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size, negative)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "redis_hits": 0, "misses": 0, "negative_hits": 0,
+                       "sets": 0, "evictions": 0, "redis_errors": 0}
+
+    def _redis_key(self, key: str) -> str:
+        return f"inference:{self.namespace}:{key}"
+
+    def _store_local(self, key: str, value: Any, payload: str, ttl: int, negative: bool):
+        size = _entry_size(key, payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, time.time() + ttl, size, negative)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self._stats["evictions"] += 1
+
+    def _decode(self, key: str, payload) -> Optional[Dict[str, Any]]:
+        """Parse a Redis record; a corrupt one is deleted and treated as a miss"""
+        try:
+            if isinstance(payload, bytes):
+                payload = payload.decode("utf-8")
+            record = json.loads(payload)
+            if not isinstance(record, dict) or "value" not in record:
+                raise ValueError("not an inference cache record")
+            return record
+        except ValueError as e:  # JSONDecodeError and UnicodeDecodeError included
+            logger.warning(f"Dropping corrupt {self.namespace} cache entry {key}: {e}")
+            try:
+                self.redis.delete(self._redis_key(key))
+            except Exception:
+                pass
+            return None
+
+    def _remaining_ttl(self, key: str, default: float) -> float:
+        """Seconds left on the Redis entry (default when Redis cannot tell)"""
+        try:
+            remaining_ms = self.redis.pttl(self._redis_key(key))
+        except Exception:
+            return default
+        if remaining_ms is None or remaining_ms == -1:  # -1: no expiry set
+            return default
+        return max(0, remaining_ms) / 1000  # -2: already gone
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value (including negative entries) or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    if entry[3]:
+                        self._stats["negative_hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+                self._bytes -= entry[2]
+
+        if self.redis is not None:
+            try:
+                # Only the Redis round trip is timed; local hits are cheaper than a histogram update
+                with CACHE_OP_SECONDS.time(self.namespace, "get"):
+                    payload = self.redis.get(self._redis_key(key))
+            except Exception as e:
+                with self._lock:
+                    self._stats["redis_errors"] += 1
+                logger.debug(f"Redis get failed for {self.namespace}: {e}")
+                payload = None
+            record = self._decode(key, payload) if payload else None
+            if record is not None:
+                negative = record.get("negative", False)
+                ttl = self.negative_ttl if negative else self.ttl
+                # The local copy must not outlive the Redis entry it came from
+                self._store_local(key, record["value"], payload, min(ttl, self._remaining_ttl(key, ttl)), negative)
+                with self._lock:
+                    self._stats["redis_hits"] += 1
+                    if negative:
+                        self._stats["negative_hits"] += 1
+                return record["value"]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any, negative: bool = False):
+        """Cache a result; negative=True marks a failure cached for negative_ttl only"""
+        ttl = self.negative_ttl if negative else self.ttl
+        payload = json.dumps({"value": value, "negative": negative}, ensure_ascii=False)
+        self._store_local(key, value, payload, ttl, negative)
+        with self._lock:
+            self._stats["sets"] += 1
+        if self.redis is not None:
+            try:
+                with CACHE_OP_SECONDS.time(self.namespace, "set"):
+                    self.redis.setex(self._redis_key(key), ttl, payload)
+            except Exception as e:
+                with self._lock:
+                    self._stats["redis_errors"] += 1
+                logger.debug(f"Redis set failed for {self.namespace}: {e}")
+
+    def clear(self):
+        """Drop the in-process tier (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus hit rate across both tiers"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
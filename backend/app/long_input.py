@@ -0,0 +1,86 @@
+"""
+long_input.py
+
+Token-budgeted preprocessing for long articles. Each article is tokenized once and the ids
+are cached per content fingerprint, so summarization and scoring share one tokenization.
+Articles longer than the model window are either truncated or split into overlapping
+chunks for map-reduce summarization (summarize the chunks in one batch, then summarize
+the joined chunk summaries).
+"""
+import os
+from typing import List, Optional
+
+from .fingerprint import content_fingerprint
+from .inference_cache import InferenceCache
+from .metrics import TOKENIZE_SECONDS
+
+# "map_reduce" summarizes every chunk of a long article; "truncate" keeps only the head
+LONG_ARTICLE_MODE = os.getenv("LONG_ARTICLE_MODE", "map_reduce").lower()
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "0"))  # 0 derives it from the model
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "64"))
+MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "8"))
+SCORE_ARTICLE_TOKENS = int(os.getenv("SCORE_ARTICLE_TOKENS", "128"))  # Article head used for scoring
+GENERATION_TOKENS = 256  # Window reserved for the summary on decoder-only models
+
+# In-process only: token ids are cheap to recompute and too bulky for Redis
+token_cache = InferenceCache(
+    "tokens",
+    int(os.getenv("TOKEN_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=86400,
+    redis_client=None
+)
+
+
+def article_token_ids(tokenizer, article: str, fingerprint: Optional[str] = None) -> List[int]:
+    """Untruncated token ids of an article (no special tokens), cached per tokenizer and fingerprint"""
+    key = f"{getattr(tokenizer, 'name_or_path', '')}:{fingerprint or content_fingerprint(article)}"
+    ids = token_cache.get(key)
+    if ids is None:
+        with TOKENIZE_SECONDS.time():
+            ids = tokenizer.encode(article, add_special_tokens=False)
+        token_cache.set(key, ids)
+    return ids
+
+
+def max_input_tokens(tokenizer, model) -> int:
+    """Largest article the model can take in one pass, leaving room for the summary on decoder-only models"""
+    if SUMMARY_MAX_INPUT_TOKENS > 0:
+        return SUMMARY_MAX_INPUT_TOKENS
+    config = getattr(model, "config", None)
+    limits = [getattr(config, "max_position_embeddings", None) or getattr(config, "n_positions", None),
+              getattr(tokenizer, "model_max_length", None)]
+    limits = [limit for limit in limits if limit and limit < 1_000_000]  # tokenizers use 1e30 for "unset"
+    window = min(limits) if limits else 1024
+    if not getattr(config, "is_encoder_decoder", False):
+        window -= GENERATION_TOKENS
+    return max(window - 8, 64)  # headroom for special tokens
+
+
+def chunk_token_ids(ids: List[int], chunk_tokens: int, overlap: int = CHUNK_OVERLAP_TOKENS,
+                    max_chunks: int = MAX_CHUNKS) -> List[List[int]]:
+    """
+    Split ids into chunks of at most chunk_tokens, consecutive chunks sharing overlap tokens.
+    Beyond max_chunks the tail is dropped.
+    """
+    if len(ids) <= chunk_tokens:
+        return [ids]
+    step = max(chunk_tokens - overlap, 1)
+    chunks = []
+    for start in range(0, len(ids), step):
+        chunks.append(ids[start:start + chunk_tokens])
+        if start + chunk_tokens >= len(ids) or len(chunks) == max_chunks:
+            break
+    return chunks
+
+
+def with_special_tokens(tokenizer, ids: List[int]) -> List[int]:
+    return tokenizer.build_inputs_with_special_tokens(ids)
+
+
+def article_head(tokenizer, article: str, fingerprint: Optional[str] = None,
+                 max_tokens: int = SCORE_ARTICLE_TOKENS) -> str:
+    """First max_tokens tokens of an article as text (token-level replacement for article[:500])"""
+    ids = article_token_ids(tokenizer, article, fingerprint)
+    if len(ids) <= max_tokens:
+        return article
+    return tokenizer.decode(ids[:max_tokens], skip_special_tokens=True)
@@ -0,0 +1,236 @@
+"""
+metrics.py
+
+Lightweight in-process metrics exported in the Prometheus text format (served at /metrics
+by main.py and app/api.py). A histogram keeps per-label-set bucket counts under one lock,
+so timing a block costs two perf_counter calls, a bisect and a dict lookup; with
+METRICS_ENABLED=false timers are no-ops. No prometheus_client dependency.
+
+    with DB_QUERY_SECONDS.time("get_news"):
+        ...
+
+    @SCORE_SECONDS.timed("logits")
+    def score(...):
+        ...
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)  # cache, tokenizer
+
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{int(value)}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            if name in _registry:
+                raise ValueError(f"Metric {name!r} is already registered")
+            _registry[name] = self
+
+    def _key(self, labels: Sequence) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels!r}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (queue depth, cache size, ...)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            return [f"{self.name} {_format_value(self.fn())}"]
+        except Exception:
+            return []  # a broken callback must not fail the whole scrape
+
+
+class _Timer:
+    __slots__ = ("histogram", "key", "start")
+
+    def __init__(self, histogram: "Histogram", key: Tuple[str, ...]):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram._observe(self.key, time.perf_counter() - self.start)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram of durations (seconds) per label set.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names; values are passed positionally to observe/time/timed
+        buckets: Upper bounds in seconds (+Inf is implicit)
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def _observe(self, key: Tuple[str, ...], value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def observe(self, value: float, *labels):
+        if METRICS_ENABLED:
+            self._observe(self._key(labels), value)
+
+    def time(self, *labels):
+        """Context manager observing the block's wall time"""
+        if not METRICS_ENABLED:
+            return _NOOP_TIMER
+        return _Timer(self, self._key(labels))
+
+    def timed(self, *labels) -> Callable:
+        """Decorator observing each call's wall time"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(*labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[:-1]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {series[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def get_metric(name: str) -> Optional[_Metric]:
+    with _registry_lock:
+        return _registry.get(name)
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Pipeline stages, shared by the news service, workers and the inference API
+RSS_FETCH_SECONDS = Histogram("simplenews_rss_fetch_seconds", "RSS feed download and parse time", ["feed"])
+SCRAPE_SECONDS = Histogram("simplenews_scrape_seconds", "Article page scrape time", ["domain"])
+DB_QUERY_SECONDS = Histogram("simplenews_db_query_seconds", "PostgresService call time", ["method"])
+CACHE_OP_SECONDS = Histogram("simplenews_cache_op_seconds", "Cache get/set time", ["cache", "op"],
+                             buckets=FAST_BUCKETS)
+TOKENIZE_SECONDS = Histogram("simplenews_tokenize_seconds", "Article tokenization time", buckets=FAST_BUCKETS)
+GENERATE_SECONDS = Histogram("simplenews_generate_seconds", "Summary generation time per model call", ["path"])
+SCORE_SECONDS = Histogram("simplenews_score_seconds", "Importance scoring time per model call", ["mode"])
+PIPELINE_STAGE_SECONDS = Histogram("simplenews_pipeline_stage_seconds", "Ingest pipeline time per stage call", ["stage"])
+PIPELINE_ITEMS = Counter("simplenews_pipeline_items_total", "Ingest pipeline items by stage and outcome",
+                         ["stage", "outcome"])
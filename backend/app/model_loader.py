@@ -0,0 +1,91 @@
+"""
+model_loader.py
+
+Thread-safe, single-initialization model loading. The first caller for a model starts the
+load; concurrent callers wait on the same Future instead of loading their own copy, so a
+burst of first requests loads a 7B model once. A failed load is forgotten and retried by
+the next caller. Several variants can be pre-loaded in the background (warm pool).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """
+    Single-flight loader keyed by model name.
+
+    Args:
+        load_fn: Takes a model name, returns the loaded model (any object)
+        name: Used for warm-pool thread names and logs
+    """
+
+    def __init__(self, load_fn: Callable[[str], Any], name: str = "model-loader"):
+        self.load_fn = load_fn
+        self.name = name
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"loads": 0, "failures": 0, "waiters": 0}
+
+    def get(self, key: str) -> Any:
+        """Return the loaded model, loading it at most once across threads"""
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self._meta[key] = {"status": "loading", "load_seconds": None, "error": None}
+            elif not future.done():
+                self._stats["waiters"] += 1
+        if not owner:
+            return future.result()
+
+        start = time.monotonic()
+        try:
+            value = self.load_fn(key)
+        except Exception as e:
+            with self._lock:
+                # Forget the failed attempt so the next caller retries
+                del self._futures[key]
+                self._meta[key].update(status="failed", error=str(e))
+                self._stats["failures"] += 1
+            logger.error(f"{self.name}: loading {key} failed: {e}")
+            future.set_exception(e)
+            raise
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._meta[key].update(status="ready", load_seconds=round(elapsed, 2))
+            self._stats["loads"] += 1
+        logger.info(f"{self.name}: loaded {key} in {elapsed:.1f}s")
+        future.set_result(value)
+        return value
+
+    def is_loaded(self, key: str) -> bool:
+        future = self._futures.get(key)
+        return future is not None and future.done() and future.exception() is None
+
+    def warm(self, keys: Iterable[str]) -> List[threading.Thread]:
+        """Load models in background threads; failures are logged, not raised"""
+        threads = []
+        for key in keys:
+            def _load(key=key):
+                try:
+                    self.get(key)
+                except Exception:
+                    pass  # already logged by get()
+            thread = threading.Thread(target=_load, name=f"{self.name}-warm", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["models"] = {key: dict(meta) for key, meta in self._meta.items()}
+        return stats
@@ -4,33 +4,40 @@ from app.models import News, Vote, SavedArticle, User
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy import func
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dateutil import parser as dateparser
 from dateutil import tz
 from app import redis_client
 import json
 from uuid import UUID
 from sqlalchemy.sql import text
+from app.metrics import CACHE_OP_SECONDS, DB_QUERY_SECONDS
+from app.structured_log import get_logger
 import re
+import time
 import uuid
 
+log = get_logger(__name__)
+
 class PostgresService:
     def __init__(self, db: Session):
         self.db = db
 
     # Get news
+    @DB_QUERY_SECONDS.timed("get_news")
     def get_news(self, offset=0, limit=20, sort_by="time", source_filter=None) -> List[Dict]:
         """Get news, only supports time sorting"""
+        start = time.perf_counter()
         try:
             use_cache = (offset == 0)
             cache_key = f"news:{sort_by}:{offset}:{limit}:{source_filter or 'all'}"
             if use_cache:
-                cached = redis_client.get(cache_key)
+                with CACHE_OP_SECONDS.time("news", "get"):
+                    cached = redis_client.get(cache_key)
                 if cached:
+                    log.sampled("get_news", cache="hit", offset=offset, limit=limit, source=source_filter)
                     return json.loads(cached)
             
-            print(f"🔍 DEBUG: Querying news with offset={offset}, limit={limit}, sort_by={sort_by}")
-            
             query = self.db.query(News)
             
             # Apply source filter
@@ -43,10 +50,9 @@ class PostgresService:
             # Apply pagination
             news_items = query.offset(offset).limit(limit).all()
             
-            print(f"🔍 DEBUG: Found {len(news_items)} news items in database")
-            
             # Convert to dictionary format
             results = []
+            failed = 0
             for item in news_items:
                 try:
                     # Ensure date format is correct
@@ -64,7 +70,7 @@ class PostgresService:
                                 utc_date = published_at.astimezone(timezone.utc)
                                 date_str = utc_date.isoformat()
                         except Exception as e:
-                            print(f"Error formatting date: {e}")
+                            log.warning("news_date_format_failed", id=item.id, error=e)
                             date_str = datetime.utcnow().isoformat() + 'Z'
                     else:
                         date_str = datetime.utcnow().isoformat() + 'Z'
@@ -80,48 +86,54 @@ class PostgresService:
                         "keywords": self._ensure_keywords_array(item.keywords)
                     }
                     results.append(result_item)
-                    print(f"🔍 DEBUG: Added item: {item.title[:50]}...")
+                    log.sampled("news_row", id=item.id, title=item.title[:50])
                 except Exception as e:
-                    print(f"❌ Error processing news item: {e}")
+                    failed += 1
+                    log.warning("news_row_failed", id=item.id, error=e)
                     continue
             
-            print(f"🔍 DEBUG: Returning {len(results)} processed items")
-            
             if use_cache:
                 try:
-                    redis_client.setex(cache_key, 600, json.dumps(results, ensure_ascii=False))
+                    with CACHE_OP_SECONDS.time("news", "set"):
+                        redis_client.setex(cache_key, 600, json.dumps(results, ensure_ascii=False))
                 except Exception as e:
-                    print(f"⚠️ Cache save failed: {e}")
+                    log.warning("news_cache_set_failed", key=cache_key, error=e)
             
+            log.info("get_news", cache="miss" if use_cache else "skip", offset=offset, limit=limit,
+                     source=source_filter, rows=len(news_items), returned=len(results), failed=failed,
+                     duration_ms=round((time.perf_counter() - start) * 1000, 2))
             return results
-        except Exception as e:
-            print(f"❌ Error getting news: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            log.exception("get_news_failed", offset=offset, limit=limit, source=source_filter)
             return []
 
     # Save news
+    @DB_QUERY_SECONDS.timed("save_news")
     def save_news(self, news_items: List[Dict]) -> bool:
         """Save news to database"""
+        return self.insert_news(news_items) is not None
+
+    def insert_news(self, news_items: List[Dict]) -> Optional[List[Dict]]:
+        """Save news to database; returns the items actually inserted (not already stored), None on failure"""
+        start = time.perf_counter()
         try:
-            print(f"🔍 DEBUG: Saving {len(news_items)} news items to database")
-            
             if not news_items:
-                print("⚠️ No news items to save")
-                return True
+                log.info("save_news", items=0, saved=0)
+                return []
             
-            saved_count = 0
+            inserted = []
+            counts = {"existing": 0, "invalid": 0, "failed": 0}
             for i, item in enumerate(news_items):
                 try:
                     # Basic validation
                     if not item.get("title") or not item.get("content") or not item.get("link"):
-                        print(f"⚠️ Skipping item {i}: missing required fields")
+                        counts["invalid"] += 1
                         continue
                     
                     # Check if already exists (only check title)
                     existing = self.db.query(News).filter(News.title == item["title"]).first()
                     if existing:
-                        print(f"🔍 DEBUG: Skipping existing article: {item['title'][:50]}...")
+                        counts["existing"] += 1
                         continue
                     
                     # Normalize date handling
@@ -142,13 +154,13 @@ class PostgresService:
                         else:
                             normalized_date = raw_date
                     except Exception as e:
-                        print(f"⚠️ Date parsing failed for item {i}: {e}")
+                        log.warning("news_date_parse_failed", item=i, date=raw_date, error=e)
                         from datetime import datetime
                         normalized_date = datetime.utcnow()
                     
                     # Create news item
                     news_item = News(
-                        id=uuid.uuid4(),
+                        id=item.get("id") or uuid.uuid4(),  # The ingest pipeline assigns ids up front
                         title=item["title"],
                         content=item["content"],
                         link=item["link"],
@@ -160,33 +172,81 @@ class PostgresService:
                     )
                     
                     self.db.add(news_item)
-                    saved_count += 1
-                    print(f"✅ Saved: {item['title'][:50]}...")
+                    inserted.append(item)
+                    log.sampled("news_saved", title=item["title"][:50])
                     
                 except Exception as e:
-                    print(f"❌ Error saving item {i}: {e}")
+                    counts["failed"] += 1
+                    log.warning("news_save_item_failed", item=i, error=e)
                     continue
             
             self.db.commit()
-            print(f"✅ Successfully saved {saved_count} news items")
-            return True
+            log.info("save_news", items=len(news_items), saved=len(inserted), **counts,
+                     duration_ms=round((time.perf_counter() - start) * 1000, 2))
+            return inserted
             
+        except Exception:
+            log.exception("save_news_failed", items=len(news_items))
+            self.db.rollback()
+            return None
+
+    # Get news that still need an AI summary
+    @DB_QUERY_SECONDS.timed("get_news_without_summary")
+    def get_news_without_summary(self, limit: int = 50) -> List[News]:
+        """Get the newest news rows whose summary has not been generated yet"""
+        try:
+            return (
+                self.db.query(News)
+                .filter(News.summary.is_(None))
+                .order_by(desc(News.published_at))
+                .limit(limit)
+                .all()
+            )
+        except Exception as e:
+            log.error("get_news_without_summary_failed", error=e)
+            return []
+
+    # Store AI summary on the news row
+    @DB_QUERY_SECONDS.timed("update_news_summary")
+    def update_news_summary(self, news_id: UUID, summary: Dict[str, Any]) -> bool:
+        """Persist {"brief", "detailed", "structure_score"} on a news row"""
+        try:
+            updated = self.db.query(News).filter(News.id == news_id).update(
+                {News.summary: summary}, synchronize_session=False
+            )
+            self.db.commit()
+            return updated > 0
         except Exception as e:
-            print(f"❌ Error saving news: {e}")
+            log.error("update_news_summary_failed", id=news_id, error=e)
             self.db.rollback()
             return False
 
+    # Get stored AI summary by article id
+    @DB_QUERY_SECONDS.timed("get_news_summary")
+    def get_news_summary(self, news_id: UUID) -> Dict[str, Any]:
+        """Get the stored AI summary with a single primary-key lookup, None if not generated yet"""
+        try:
+            row = self.db.query(News.summary).filter(News.id == news_id).first()
+            if row is None:
+                return {"error": "Article not found"}
+            return {"summary": row.summary}
+        except Exception as e:
+            log.error("get_news_summary_failed", id=news_id, error=e)
+            return {"error": "Failed to get summary"}
+
     # Get vote count
+    @DB_QUERY_SECONDS.timed("get_vote_count")
     def get_vote_count(self, title: str) -> int:
         """Get news vote count"""
         try:
             vote = self.db.query(Vote).filter(Vote.title == title).first()
             return vote.count if vote else 0
         except Exception as e:
-            print(f"Error getting vote count: {e}")
+            log.error("get_vote_count_failed", error=e)
             return 0
 
     # Update vote
+    @DB_QUERY_SECONDS.timed("update_vote")
     def update_vote(self, title: str, delta: int) -> int:
         """Update news vote count"""
         try:
@@ -200,11 +260,12 @@ class PostgresService:
             self.db.commit()
             return vote.count
         except Exception as e:
-            print(f"Error updating vote: {e}")
+            log.error("update_vote_failed", error=e)
             self.db.rollback()
             return 0
 
     # Get article details
+    @DB_QUERY_SECONDS.timed("get_article_by_title")
     def get_article_by_title(self, title: str) -> Dict:
         """Get article details by title"""
         try:
@@ -222,7 +283,7 @@ class PostgresService:
                 "vote_count": self.get_vote_count(news.title)
             }
         except Exception as e:
-            print(f"Error getting article: {e}")
+            log.error("get_article_by_title_failed", error=e)
             return {"error": "Failed to get article"}
 
     # Ensure keywords are in array format
@@ -247,10 +308,11 @@ class PostgresService:
             
             return []
         except Exception as e:
-            print(f"Error ensuring keywords array: {e}")
+            log.warning("keywords_parse_failed", error=e)
             return []
 
     # User saved article related methods
+    @DB_QUERY_SECONDS.timed("save_article_for_user")
     def save_article_for_user(self, user_id: UUID, news_id: UUID) -> bool:
         """Save article for user"""
         try:
@@ -263,13 +325,14 @@ class PostgresService:
             saved_article = SavedArticle(user_id=user_id, news_id=news_id)
             self.db.add(saved_article)
             self.db.commit()
-            print(f"✅ Saved article {news_id} for user {user_id}")
+            log.info("save_article_for_user", user=user_id, id=news_id)
             return True
         except Exception as e:
-            print(f"❌ Error saving article for user: {e}")
+            log.error("save_article_for_user_failed", user=user_id, id=news_id, error=e)
             self.db.rollback()
             return False
 
+    @DB_QUERY_SECONDS.timed("remove_article_from_user")
     def remove_article_from_user(self, user_id: UUID, news_id: UUID) -> bool:
         """Remove article from user's saved articles"""
         try:
@@ -280,15 +343,16 @@ class PostgresService:
             if saved_article:
                 self.db.delete(saved_article)
                 self.db.commit()
-                print(f"✅ Removed article {news_id} from user {user_id}")
+                log.info("remove_article_from_user", user=user_id, id=news_id)
                 return True
             else:
                 return True
         except Exception as e:
-            print(f"❌ Error removing article from user: {e}")
+            log.error("remove_article_from_user_failed", user=user_id, id=news_id, error=e)
             self.db.rollback()
             return False
 
+    @DB_QUERY_SECONDS.timed("get_saved_articles_for_user")
     def get_saved_articles_for_user(self, user_id: UUID) -> list:
         """Get user's saved articles list"""
         try:
@@ -315,12 +379,13 @@ class PostgresService:
                         "keywords": article.keywords,
                         "score": article.score
                     })
-            print(f"✅ Retrieved {len(articles)} saved articles for user {user_id}")
+            log.info("get_saved_articles_for_user", user=user_id, rows=len(articles))
             return articles
         except Exception as e:
-            print(f"❌ Error getting saved articles for user: {e}")
+            log.error("get_saved_articles_for_user_failed", user=user_id, error=e)
             return []
 
+    @DB_QUERY_SECONDS.timed("is_article_saved_by_user")
     def is_article_saved_by_user(self, user_id: UUID, news_id: UUID) -> bool:
         """Check if article is saved by user"""
         try:
@@ -330,9 +395,10 @@ class PostgresService:
             ).first()
             return saved_article is not None
         except Exception as e:
-            print(f"❌ Error checking if article is saved by user: {e}")
+            log.error("is_article_saved_by_user_failed", user=user_id, id=news_id, error=e)
             return False
 
+    @DB_QUERY_SECONDS.timed("save_user")
     def save_user(self, user_id: str, email: str, name: str) -> bool:
         """Save user information to database"""
         try:
@@ -364,11 +430,11 @@ class PostgresService:
                 )
             
             self.db.commit()
-            print(f"✅ Saved user {user_id} to database")
+            log.info("save_user", user=user_id)
             return True
             
         except Exception as e:
-            print(f"❌ Error saving user: {e}")
+            log.error("save_user_failed", user=user_id, error=e)
             self.db.rollback()
             return False
 
@@ -384,6 +450,7 @@ class PostgresService:
         normalized = normalized.strip()
         return normalized
 
+    @DB_QUERY_SECONDS.timed("_is_duplicate_title")
     def _is_duplicate_title(self, new_title: str) -> bool:
         """Check if title is duplicate (simplified version)"""
         try:
@@ -391,5 +458,5 @@ class PostgresService:
             existing = self.db.query(News).filter(News.title == new_title).first()
             return existing is not None
         except Exception as e:
-            print(f"Error checking duplicate title: {e}")
+            log.error("is_duplicate_title_failed", error=e)
             return False 
\ No newline at end of file
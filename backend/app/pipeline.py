@@ -0,0 +1,332 @@
+"""
+pipeline.py
+
+Staged ingestion pipeline: fetch -> scrape -> dedup -> persist -> summarize -> score. Each
+stage is a pool of asyncio workers reading its own bounded queue, so stages overlap (the
+first articles are summarized while later feeds are still downloading) and a slow stage
+fills its inbox and blocks the stage before it instead of buffering the whole run. A failing
+item is counted and dropped without stopping the others.
+
+Blocking stage functions (HTTP, database, LLM calls) run on a thread pool sized to the total
+worker count. Every dependency of the ingest stages is injectable, so tests drive the whole
+pipeline offline with fixture feeds and an in-memory store. An exception listed in abort_on
+(LockLost from the refresh coordinator's fence) stops the whole run instead.
+
+The score stage runs the importance model in-process, so it is off unless PIPELINE_MODEL_SCORING
+is set or a score function is passed; the refresh job runs in web workers, which must not load
+the 7B model. Unscored rows keep their summary and are scored on demand.
+
+Configured by PIPELINE_WORKERS ("stage=n,..." overrides), PIPELINE_QUEUE_SIZE,
+PIPELINE_PERSIST_BATCH and PIPELINE_MODEL_SCORING.
+"""
+import asyncio
+import inspect
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .fingerprint import content_fingerprint
+from .metrics import PIPELINE_ITEMS, PIPELINE_STAGE_SECONDS
+from .refresh_coordinator import LockLost
+from .structured_log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_WORKERS = {"fetch": 8, "scrape": 8, "dedup": 1, "persist": 1, "summarize": 4, "score": 2}
+PIPELINE_WORKERS = os.getenv("PIPELINE_WORKERS", "")  # e.g. "scrape=16,summarize=8"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))  # Inbox bound per stage
+PIPELINE_PERSIST_BATCH = int(os.getenv("PIPELINE_PERSIST_BATCH", "20"))  # Rows per save_news call
+PIPELINE_MODEL_SCORING = os.getenv("PIPELINE_MODEL_SCORING", "false").lower() == "true"  # Load the model in-process
+PROGRESS_INTERVAL = 10.0  # Seconds between queue-depth log lines during a run
+SUMMARY_FAILED = "Summary generation failed"  # generate_both_summaries' failure marker
+
+
+def parse_workers(spec: str) -> Dict[str, int]:
+    """Parse PIPELINE_WORKERS into stage -> worker count"""
+    workers = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, count = entry.partition("=")
+        if not sep or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid pipeline worker entry {entry!r}, expected stage=n")
+        workers[name.strip()] = int(count)
+    return workers
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    Args:
+        name: Stage name in stats, logs and metrics
+        fn: item -> item, list of items (fan-out) or None (drop); gets a list when batch_size > 1.
+            Coroutine functions are awaited, plain functions run on the pipeline's thread pool
+        workers: Concurrent workers reading the inbox
+        maxsize: Inbox bound; a full inbox blocks the stage feeding it
+        batch_size: Up to this many already-queued items are handed to fn at once
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1, maxsize: int = PIPELINE_QUEUE_SIZE,
+                 batch_size: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.inbox: Optional[asyncio.Queue] = None
+        self.busy = 0
+        self._stats = {"processed": 0, "emitted": 0, "failed": 0, "busy_seconds": 0.0, "max_depth": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        stats["queue_depth"] = self.inbox.qsize() if self.inbox is not None else 0
+        stats["busy"] = self.busy
+        stats["workers"] = self.workers
+        stats["maxsize"] = self.maxsize
+        return stats
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Args:
+        stages: Stages in order; the last stage's outputs are returned by run()
+        queue_factory: Inbox constructor taking maxsize (asyncio.Queue, in memory)
+        abort_on: Exception types that cancel the run and are raised from run()
+    """
+
+    def __init__(self, stages: List[Stage], queue_factory: Callable[..., asyncio.Queue] = asyncio.Queue,
+                 abort_on: Tuple[type, ...] = ()):
+        self.stages = stages
+        self.queue_factory = queue_factory
+        self.abort_on = abort_on
+        self.elapsed = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._results: List[Any] = []
+        self._abort: Optional[asyncio.Future] = None
+
+    async def run(self, sources: Iterable[Any]) -> List[Any]:
+        """Feed sources into the first stage and wait until every stage has drained"""
+        for stage in self.stages:
+            stage.inbox = self.queue_factory(maxsize=stage.maxsize)
+        self._results = []
+        self._executor = ThreadPoolExecutor(max_workers=sum(stage.workers for stage in self.stages),
+                                            thread_name_prefix="pipeline")
+        tasks = [asyncio.create_task(self._worker(index))
+                 for index, stage in enumerate(self.stages) for _ in range(stage.workers)]
+        progress = asyncio.create_task(self._report_progress())
+        self._abort = asyncio.get_running_loop().create_future()
+        drain = asyncio.create_task(self._drain(sources))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait([drain, self._abort], return_when=asyncio.FIRST_COMPLETED)
+            if self._abort.done():
+                log.warning("pipeline_aborted", error=self._abort.result())
+                raise self._abort.result()
+            drain.result()
+        finally:
+            for task in tasks + [progress, drain]:
+                task.cancel()
+            await asyncio.gather(*tasks, progress, drain, return_exceptions=True)
+            self._executor.shutdown(wait=False)
+            self.elapsed = time.perf_counter() - start
+        log.info("pipeline_run", seconds=round(self.elapsed, 3), results=len(self._results),
+                 **{stage.name: "{processed}/{emitted}/{failed}".format(**stage._stats)
+                    for stage in self.stages})
+        return self._results
+
+    async def _drain(self, sources: Iterable[Any]):
+        for item in sources:
+            await self._put(0, item)
+        # Each stage is drained only once everything upstream has been forwarded into it
+        for stage in self.stages:
+            await stage.inbox.join()
+
+    async def _put(self, index: int, item: Any):
+        stage = self.stages[index]
+        await stage.inbox.put(item)  # Blocks while the stage is full: backpressure
+        stage._stats["max_depth"] = max(stage._stats["max_depth"], stage.inbox.qsize())
+
+    async def _worker(self, index: int):
+        stage = self.stages[index]
+        while True:
+            items = [await stage.inbox.get()]
+            while len(items) < stage.batch_size and not stage.inbox.empty():
+                items.append(stage.inbox.get_nowait())
+            try:
+                await self._process(index, items)
+            finally:
+                for _ in items:
+                    stage.inbox.task_done()
+
+    async def _process(self, index: int, items: List[Any]):
+        stage = self.stages[index]
+        arg = items if stage.batch_size > 1 else items[0]
+        stage.busy += 1
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(stage.fn):
+                out = await stage.fn(arg)
+            else:
+                out = await asyncio.get_running_loop().run_in_executor(self._executor, stage.fn, arg)
+        except Exception as e:
+            stage._stats["failed"] += len(items)
+            PIPELINE_ITEMS.inc(stage.name, "failed", amount=len(items))
+            log.warning("pipeline_item_failed", stage=stage.name, items=len(items), error=e)
+            if isinstance(e, self.abort_on) and not self._abort.done():
+                self._abort.set_result(e)
+            return
+        finally:
+            elapsed = time.perf_counter() - start
+            stage.busy -= 1
+            stage._stats["busy_seconds"] += elapsed
+            PIPELINE_STAGE_SECONDS.observe(elapsed, stage.name)
+        outputs = [] if out is None else out if isinstance(out, list) else [out]
+        stage._stats["processed"] += len(items)
+        stage._stats["emitted"] += len(outputs)
+        PIPELINE_ITEMS.inc(stage.name, "processed", amount=len(items))
+        if index + 1 < len(self.stages):
+            for output in outputs:
+                await self._put(index + 1, output)
+        else:
+            self._results.extend(outputs)
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            log.info("pipeline_progress", **{f"{stage.name}_depth": stage.inbox.qsize() for stage in self.stages})
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage counters, queue depth (current and high-water) and throughput over the run"""
+        stages = {}
+        for stage in self.stages:
+            stats = stage.stats()
+            stats["items_per_sec"] = round(stats["processed"] / self.elapsed, 2) if self.elapsed else 0.0
+            stages[stage.name] = stats
+        return {"seconds": round(self.elapsed, 3), "results": len(self._results), "stages": stages}
+
+
+class PostgresIngestStore:
+    """Ingest store on PostgresService; one session per call since stages run in threads"""
+
+    def _call(self, method: str, *args):
+        from app.db import SessionLocal
+        from app.news.postgres_service import PostgresService
+        db = SessionLocal()
+        try:
+            return getattr(PostgresService(db), method)(*args)
+        finally:
+            db.close()
+
+    def exists(self, title: str) -> bool:
+        return self._call("_is_duplicate_title", title)
+
+    def save(self, items: List[Dict]) -> List[Dict]:
+        inserted = self._call("insert_news", items)
+        if inserted is None:
+            raise RuntimeError(f"save_news failed for {len(items)} items")
+        return inserted
+
+    def update_summary(self, news_id, summary: Dict[str, Any]) -> bool:
+        return self._call("update_news_summary", news_id, summary)
+
+
+def feed_sources() -> List[tuple]:
+    """(source name, feed url) pairs of every configured RSS feed"""
+    from news.fetch_news import RSS_FEEDS
+    return list(RSS_FEEDS.items())
+
+
+def build_ingest_pipeline(fetch: Optional[Callable] = None, scrape: Optional[Callable] = None, store=None,
+                          summarize: Optional[Callable] = None, score: Optional[Callable] = None,
+                          workers: Optional[Dict[str, int]] = None, maxsize: int = PIPELINE_QUEUE_SIZE,
+                          fence: Optional[Callable[[], None]] = None) -> Pipeline:
+    """
+    The news ingest pipeline; sources are (source name, feed url) pairs.
+
+    Args:
+        fetch: (source_name, feed_url) -> entry dicts (news.fetch_news.fetch_feed)
+        scrape: (url, fallback) -> article text (news.fetch_news.scrape_content)
+        store: exists(title), save(items) -> inserted items, update_summary(id, summary) (PostgresIngestStore)
+        summarize: (content, fingerprint) -> {"brief", "detailed", "structure_score"} (generate_both_summaries)
+        score: (content, brief, fingerprint) -> float; without one the score stage is left out
+            unless PIPELINE_MODEL_SCORING selects model_inference.importance_score
+        workers: Per-stage worker counts, over PIPELINE_WORKERS and the defaults
+        maxsize: Inbox bound of every stage
+        fence: Called before every database write; raising LockLost aborts the run (Lease.check)
+    """
+    if fetch is None or scrape is None:
+        from news.fetch_news import fetch_feed, scrape_content
+        fetch, scrape = fetch or fetch_feed, scrape or scrape_content
+    if summarize is None:
+        from news.summarize import generate_both_summaries as summarize
+    if score is None and PIPELINE_MODEL_SCORING:
+        def score(content, brief, fingerprint):
+            from app.model_inference import importance_score
+            return importance_score(content, brief, fingerprint)
+    store = store or PostgresIngestStore()
+    fence = fence or (lambda: None)
+    counts = {**DEFAULT_WORKERS, **parse_workers(PIPELINE_WORKERS), **(workers or {})}
+    seen = set()
+    seen_lock = threading.Lock()
+
+    def fetch_stage(source):
+        source_name, feed_url = source
+        return fetch(source_name, feed_url)
+
+    def scrape_stage(item):
+        content = scrape(item["link"], item.get("summary", ""))
+        if not content:
+            return None
+        return {**item, "content": content, "fingerprint": content_fingerprint(content)}
+
+    def dedup_stage(item):
+        keys = (item["title"], item["fingerprint"])
+        with seen_lock:
+            if any(key in seen for key in keys):
+                return None
+            seen.update(keys)
+        return None if store.exists(item["title"]) else item
+
+    def persist_stage(items):
+        for item in items:
+            item.setdefault("id", uuid.uuid4())
+        fence()
+        return store.save(items)  # Rows stored by an earlier run are not summarized again
+
+    def summarize_stage(item):
+        summary = summarize(item["content"], item["fingerprint"])
+        if SUMMARY_FAILED in (summary["brief"], summary["detailed"]):
+            return None  # Row stays pending; cache_worker.summarize_pending_news retries it
+        fence()
+        store.update_summary(item["id"], summary)  # Kept even if scoring fails
+        return {**item, "ai_summary": summary}
+
+    def score_stage(item):
+        importance = score(item["content"], item["ai_summary"]["brief"], item["fingerprint"])
+        summary = {**item["ai_summary"], "importance_score": importance}
+        fence()
+        store.update_summary(item["id"], summary)
+        return {**item, "ai_summary": summary}
+
+    stages = [
+        Stage("fetch", fetch_stage, counts["fetch"], maxsize),
+        Stage("scrape", scrape_stage, counts["scrape"], maxsize),
+        Stage("dedup", dedup_stage, counts["dedup"], maxsize),
+        Stage("persist", persist_stage, counts["persist"], maxsize, batch_size=PIPELINE_PERSIST_BATCH),
+        Stage("summarize", summarize_stage, counts["summarize"], maxsize),
+    ]
+    if score is not None:
+        stages.append(Stage("score", score_stage, counts["score"], maxsize))
+    return Pipeline(stages, abort_on=(LockLost,))
+
+
+def run_ingest(sources: Optional[Iterable[tuple]] = None, **kwargs) -> Dict[str, Any]:
+    """Run one ingest pass to completion from synchronous code; returns the pipeline stats"""
+    pipeline = build_ingest_pipeline(**kwargs)
+    asyncio.run(pipeline.run(feed_sources() if sources is None else sources))
+    return pipeline.stats()
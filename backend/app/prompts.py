@@ -0,0 +1,43 @@
+"""
+prompts.py
+
+Prompt templates shared by inference and fine-tuning. Every template starts with a
+fixed instruction prefix followed by the per-article text.
+"""
+
+# Instruction format used for fine-tuning (train_finetune.py) and joint inference
+INSTRUCTION_PREFIX = "### Instruction:\nSummarize the following news article concisely and accurately.\n\n### Article:\n"
+SUMMARY_CUE = "\n\n### Summary:\n"
+# Appended after the generated summary to read an importance digit from the same context
+JOINT_SCORE_SUFFIX = "\n\n### Importance (0-9):"
+
+# Importance scoring, free-form generation (0.0-1.0)
+SCORE_PREFIX = "Rate the importance of this news article on a scale of 0.0 to 1.0.\n        \n"
+
+# Importance scoring from a single forward pass: the next token is read as a digit 0-9
+DIGIT_SCORE_PREFIX = (
+    "Rate the importance of this news article on a scale of 0 to 9, "
+    "where 0 is trivial and 9 is major breaking news.\n\n"
+)
+
+
+def format_score_prompt(article: str, summary: str) -> str:
+    return f"""{SCORE_PREFIX}Article: {article}
+Summary: {summary}
+
+Importance score (0.0-1.0):"""
+
+
+def format_digit_score_prompt(article: str, summary: str) -> str:
+    return f"""{DIGIT_SCORE_PREFIX}Article: {article}
+Summary: {summary}
+
+Importance score (0-9):"""
+
+
+def format_instruction_prompt(article: str, summary: str = None) -> str:
+    """
+    Format training data as instruction-following prompts.
+    Without a summary the prompt ends at the summary cue, ready for generation.
+    """
+    return f"{INSTRUCTION_PREFIX}{article}{SUMMARY_CUE}{summary or ''}"
@@ -0,0 +1,403 @@
+"""
+refresh_coordinator.py
+
+Single scheduler for the news refresh job. Every process that used to run its own loop (the
+APScheduler job and refresh thread in main.py, railway_start.py, run_cron.py, each gunicorn
+worker) starts the same coordinator; a distributed lock lets exactly one of them refresh at a
+time cluster-wide and the others skip that tick.
+
+Locks:
+    redis    - SET key token NX PX ttl, renewed while the job runs; the token is a fencing
+               token from INCR, so a holder whose lock expired cannot release or renew the
+               next holder's lock or record its run over a newer one
+    postgres - pg_try_advisory_lock on a dedicated connection; held until that connection
+               closes, so no expiry is needed; fencing tokens come from a database sequence
+    local    - in-process lock (single instance without Redis or Postgres)
+
+The job is handed a Lease and calls lease.check() before every write. check() re-validates
+the token against the lock (and fails once the heartbeat could not renew it), raising
+LockLost, so a holder that stalled past its lock aborts instead of overlapping the next
+refresh.
+
+The schedule adds jitter to every interval so instances do not tick in lockstep, and backs
+off exponentially while the job keeps failing. Every instance ticks on its own timer, so the
+lock holder also skips the tick when the last successful run (recorded by whichever instance
+did it) finished less than an interval ago: N instances refresh once per interval, not N times.
+
+Configured by REFRESH_INTERVAL_SECONDS, REFRESH_JITTER, REFRESH_RETRY_SECONDS,
+REFRESH_BACKOFF_MAX_SECONDS, REFRESH_LOCK_TTL_SECONDS and REFRESH_LOCK_BACKEND=auto|redis|postgres|local.
+"""
+import hashlib
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import Counter
+from .structured_log import get_logger
+
+log = get_logger(__name__)
+
+REFRESH_INTERVAL_SECONDS = float(os.getenv("REFRESH_INTERVAL_SECONDS", str(15 * 60)))
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))  # +-10% of every delay
+REFRESH_RETRY_SECONDS = float(os.getenv("REFRESH_RETRY_SECONDS", "60"))  # First retry after a failure
+REFRESH_BACKOFF_MAX_SECONDS = float(os.getenv("REFRESH_BACKOFF_MAX_SECONDS", str(60 * 60)))
+REFRESH_LOCK_TTL_SECONDS = float(os.getenv("REFRESH_LOCK_TTL_SECONDS", "120"))  # Renewed every ttl/3
+REFRESH_LOCK_BACKEND = os.getenv("REFRESH_LOCK_BACKEND", "auto").lower()
+REFRESH_LOCK_NAME = "news:refresh"
+
+REFRESH_RUNS = Counter("simplenews_refresh_runs_total", "News refresh ticks by outcome", ["outcome"])
+
+
+class LockLost(Exception):
+    """The refresh lock expired or passed to another holder while the job was running"""
+
+    def __init__(self, token: int):
+        super().__init__(f"refresh lock lost (token {token})")
+        self.token = token
+
+# Compare-and-delete / compare-and-expire, so only the holder of the token touches the lock
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+return 0
+"""
+# Record a finished run unless a newer fencing token already did
+_RECORD_SCRIPT = """
+local last = tonumber(redis.call('hget', KEYS[1], 'token') or '0')
+if tonumber(ARGV[1]) <= last then return 0 end
+redis.call('hset', KEYS[1], 'token', ARGV[1], 'finished_at', ARGV[2], 'status', ARGV[3])
+if ARGV[3] == 'ok' then redis.call('hset', KEYS[1], 'succeeded_at', ARGV[2]) end
+return 1
+"""
+
+
+class RedisLock:
+    """SET NX PX lock with INCR fencing tokens"""
+
+    def __init__(self, redis_client, name: str = REFRESH_LOCK_NAME, ttl: float = REFRESH_LOCK_TTL_SECONDS):
+        self.redis = redis_client
+        self.key = f"{name}:lock"
+        self.fence_key = f"{name}:fence"
+        self.runs_key = f"{name}:last_run"
+        self.ttl_ms = int(ttl * 1000)
+
+    def acquire(self) -> Optional[int]:
+        token = int(self.redis.incr(self.fence_key))
+        if self.redis.set(self.key, str(token), nx=True, px=self.ttl_ms):
+            return token
+        return None
+
+    def renew(self, token: int) -> bool:
+        return bool(self.redis.eval(_RENEW_SCRIPT, 1, self.key, str(token), str(self.ttl_ms)))
+
+    def release(self, token: int):
+        self.redis.eval(_RELEASE_SCRIPT, 1, self.key, str(token))
+
+    def record(self, token: int, status: str) -> bool:
+        return bool(self.redis.eval(_RECORD_SCRIPT, 1, self.runs_key, str(token), str(time.time()), status))
+
+    def last_success(self) -> Optional[float]:
+        value = self.redis.hget(self.runs_key, "succeeded_at")
+        return float(value) if value is not None else None
+
+
+_CREATE_RUNS_TABLE = """
+CREATE TABLE IF NOT EXISTS refresh_runs (
+    name TEXT PRIMARY KEY, token BIGINT NOT NULL, status TEXT NOT NULL,
+    finished_at DOUBLE PRECISION NOT NULL, succeeded_at DOUBLE PRECISION
+)
+"""
+# Same rules as _RECORD_SCRIPT: a stale token never overwrites a newer run
+_RECORD_RUN = """
+INSERT INTO refresh_runs (name, token, status, finished_at, succeeded_at)
+VALUES (:name, :token, :status, :now, CASE WHEN :status = 'ok' THEN :now END)
+ON CONFLICT (name) DO UPDATE SET token = EXCLUDED.token, status = EXCLUDED.status,
+    finished_at = EXCLUDED.finished_at,
+    succeeded_at = COALESCE(EXCLUDED.succeeded_at, refresh_runs.succeeded_at)
+WHERE refresh_runs.token < EXCLUDED.token
+RETURNING token
+"""
+
+
+class PostgresAdvisoryLock:
+    """
+    Session-level pg_try_advisory_lock held on its own connection for the whole run. The
+    heartbeat and the job's write threads (Lease.check) share that connection, so every use
+    of it is serialized.
+    """
+
+    def __init__(self, engine, name: str = REFRESH_LOCK_NAME):
+        self.engine = engine
+        self.name = name
+        self.lock_id = int.from_bytes(hashlib.sha1(name.encode()).digest()[:8], "big", signed=True)
+        self.sequence = "".join(c if c.isalnum() else "_" for c in name) + "_fence"
+        self._conn = None
+        self._conn_lock = threading.Lock()
+
+    def acquire(self) -> Optional[int]:
+        from sqlalchemy import text
+        conn = self.engine.connect()
+        try:
+            locked = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id}).scalar()
+            if locked:
+                # Shared by every process, so tokens increase cluster-wide
+                conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {self.sequence}"))
+                conn.execute(text(_CREATE_RUNS_TABLE))
+                token = int(conn.execute(text(f"SELECT nextval('{self.sequence}')")).scalar())
+                conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not locked:
+            conn.close()
+            return None
+        with self._conn_lock:
+            self._conn = conn
+        return token
+
+    def renew(self, token: int) -> bool:
+        """The advisory lock lives as long as its connection; a dropped connection released it"""
+        from sqlalchemy import text
+        with self._conn_lock:
+            if self._conn is None or self._conn.closed:
+                return False
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+                return True
+            except Exception:
+                return False
+
+    def release(self, token: int):
+        from sqlalchemy import text
+        with self._conn_lock:
+            conn, self._conn = self._conn, None
+            if conn is None:
+                return
+            try:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id})
+            finally:
+                conn.close()
+
+    def record(self, token: int, status: str) -> bool:
+        from sqlalchemy import text
+        with self._conn_lock:
+            recorded = self._conn.execute(text(_RECORD_RUN), {
+                "name": self.name, "token": token, "status": status, "now": time.time(),
+            }).first()
+            self._conn.commit()
+        return recorded is not None
+
+    def last_success(self) -> Optional[float]:
+        from sqlalchemy import text
+        with self._conn_lock:
+            return self._conn.execute(text("SELECT succeeded_at FROM refresh_runs WHERE name = :name"),
+                                      {"name": self.name}).scalar()
+
+
+class LocalLock:
+    """In-process lock for a single instance"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = itertools.count(1)
+        self._succeeded_at: Optional[float] = None
+
+    def acquire(self) -> Optional[int]:
+        return next(self._tokens) if self._lock.acquire(blocking=False) else None
+
+    def renew(self, token: int) -> bool:
+        return self._lock.locked()
+
+    def release(self, token: int):
+        self._lock.release()
+
+    def record(self, token: int, status: str) -> bool:
+        if status == "ok":
+            self._succeeded_at = time.time()
+        return True
+
+    def last_success(self) -> Optional[float]:
+        return self._succeeded_at
+
+
+class Lease:
+    """A held refresh lock as seen by the job: check() before every write"""
+
+    def __init__(self, lock, token: int):
+        self.lock = lock
+        self.token = token
+        self._lost = threading.Event()
+
+    @property
+    def lost(self) -> bool:
+        return self._lost.is_set()
+
+    def revoke(self):
+        self._lost.set()
+
+    def check(self):
+        """Raise LockLost unless this token still holds the lock"""
+        if self._lost.is_set() or not self.lock.renew(self.token):
+            self._lost.set()
+            raise LockLost(self.token)
+
+
+def default_lock(backend: str = REFRESH_LOCK_BACKEND):
+    """Redis when a real client is configured, else a Postgres advisory lock, else local"""
+    from app import redis_client
+    if backend == "redis" or (backend == "auto" and hasattr(redis_client, "eval")):
+        return RedisLock(redis_client)
+    from app.db import DATABASE_URL, engine
+    if backend == "postgres" or (backend == "auto" and DATABASE_URL.startswith("postgres")):
+        return PostgresAdvisoryLock(engine)
+    if backend not in ("auto", "local"):
+        raise ValueError(f"Unknown REFRESH_LOCK_BACKEND {backend!r}, expected auto, redis, postgres or local")
+    return LocalLock()
+
+
+class RefreshCoordinator:
+    """
+    Runs job on a jittered interval while holding a cluster-wide lock.
+
+    Args:
+        job: The refresh to run, called with a Lease (cache_worker.refresh_news_cache); an
+            exception counts as a failure, LockLost aborts the run without recording it
+        lock: RedisLock, PostgresAdvisoryLock or LocalLock
+        interval: Seconds between refreshes
+        jitter: Fraction of each delay added or removed at random
+        retry: Delay after the first consecutive failure, doubled per further failure
+        backoff_max: Cap on the failure backoff
+    """
+
+    def __init__(self, job: Callable[[Lease], Any], lock, interval: float = REFRESH_INTERVAL_SECONDS,
+                 jitter: float = REFRESH_JITTER, retry: float = REFRESH_RETRY_SECONDS,
+                 backoff_max: float = REFRESH_BACKOFF_MAX_SECONDS):
+        self.job = job
+        self.lock = lock
+        self.interval = interval
+        self.jitter = jitter
+        self.retry = retry
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"runs": 0, "skipped": 0, "failed": 0, "lost_lock": 0, "last_token": None,
+                       "last_duration_s": None}
+
+    def run_once(self) -> bool:
+        """One tick: run the job if the lock is free and no run succeeded this interval; returns whether it ran"""
+        token = self.lock.acquire()
+        if token is None:
+            self._stats["skipped"] += 1
+            REFRESH_RUNS.inc("skipped")
+            log.info("refresh_skipped", reason="lock_held")
+            return False
+        try:
+            last_success = self.lock.last_success()
+        except Exception:
+            self.lock.release(token)
+            raise
+        if last_success is not None and time.time() - last_success < self.interval:
+            # Another instance refreshed during this interval already
+            self.lock.release(token)
+            self._stats["skipped"] += 1
+            REFRESH_RUNS.inc("skipped")
+            log.info("refresh_skipped", reason="recent_run", age_s=round(time.time() - last_success, 1))
+            return False
+        lease = Lease(self.lock, token)
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease, heartbeat_stop), daemon=True)
+        heartbeat.start()
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            self.job(lease)
+            self.failures = 0
+        except LockLost:
+            lease.revoke()
+        except Exception as e:
+            status = "failed"
+            self.failures += 1
+            self._stats["failed"] += 1
+            log.error("refresh_failed", token=token, failures=self.failures, error=e)
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+            duration = time.perf_counter() - start
+            try:
+                if lease.lost:
+                    # Another holder may be refreshing already: record nothing over its run
+                    status = "lost_lock"
+                    self._stats["lost_lock"] += 1
+                    log.warning("refresh_lock_lost", token=token)
+                elif not self.lock.record(token, status):
+                    log.warning("refresh_superseded", token=token)
+            finally:
+                self.lock.release(token)
+        self._stats["runs"] += 1
+        self._stats["last_token"] = token
+        self._stats["last_duration_s"] = round(duration, 3)
+        REFRESH_RUNS.inc(status)
+        log.info("refresh_run", token=token, status=status, duration_ms=round(duration * 1000, 2))
+        return True
+
+    def _heartbeat(self, lease: Lease, stop: threading.Event):
+        period = getattr(self.lock, "ttl_ms", REFRESH_LOCK_TTL_SECONDS * 1000) / 3000
+        while not stop.wait(period):
+            if not self.lock.renew(lease.token):
+                lease.revoke()  # The job's next lease.check() raises LockLost
+                return
+
+    def next_delay(self) -> float:
+        """Seconds until the next tick: the interval, or the failure backoff, with jitter"""
+        if self.failures:
+            delay = min(self.backoff_max, self.retry * 2 ** (self.failures - 1))
+        else:
+            delay = self.interval
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run_forever(self, initial_delay: Optional[float] = None):
+        """Tick until stop(); the first tick is spread over a jittered startup delay"""
+        delay = random.uniform(0, self.interval * self.jitter) if initial_delay is None else initial_delay
+        while not self._stop.wait(delay):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Lock backend unavailable: treat like a failed run and back off
+                self.failures += 1
+                log.error("refresh_lock_error", failures=self.failures, error=e)
+            delay = self.next_delay()
+
+    def start(self) -> "RefreshCoordinator":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="refresh-coordinator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "failures": self.failures, "lock": type(self.lock).__name__}
+
+
+_coordinator: Optional[RefreshCoordinator] = None
+_coordinator_lock = threading.Lock()
+
+
+def get_refresh_coordinator() -> RefreshCoordinator:
+    """Process-wide coordinator for cache_worker.refresh_news_cache"""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            from cache_worker import refresh_news_cache
+            _coordinator = RefreshCoordinator(refresh_news_cache, default_lock())
+        return _coordinator
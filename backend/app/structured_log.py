@@ -0,0 +1,114 @@
+"""
+structured_log.py
+
+Structured, level-gated logging shared by the news service, routes and workers. Events are
+a name plus key=value fields instead of pre-formatted strings, so a disabled level costs a
+single isEnabledFor check and no formatting. High-volume per-row events go through
+sampled(), which emits only LOG_SAMPLE_RATE of them; request() replaces per-row prints with
+one summary line per call carrying counts and the duration.
+
+    log = get_logger(__name__)
+    with log.request("get_news", offset=offset) as summary:
+        rows = query.all()
+        summary["rows"] = len(rows)
+        for row in rows:
+            log.sampled("news_row", title=row.title[:50])
+"""
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text (event key=value ...) | json (one object per line)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))  # Fraction of sampled() events emitted
+
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Root logging setup for the app, the cron jobs and the workers"""
+    logging.basicConfig(level=getattr(logging, level, logging.INFO),
+                        format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+
+def _format_value(value: Any) -> str:
+    text = value if isinstance(value, str) else str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+def format_event(event: str, fields: Dict[str, Any], fmt: str = LOG_FORMAT) -> str:
+    if fmt == "json":
+        return json.dumps({"event": event, **fields}, ensure_ascii=False, default=str)
+    return " ".join([event] + [f"{key}={_format_value(value)}" for key, value in fields.items()])
+
+
+class StructuredLogger:
+    """
+    Thin wrapper over a stdlib logger emitting "event key=value ..." records.
+
+    Args:
+        name: Logger name (usually the module's __name__)
+        sample_rate: Fraction of sampled() events emitted
+    """
+
+    def __init__(self, name: str, sample_rate: float = LOG_SAMPLE_RATE):
+        self.logger = logging.getLogger(name)
+        self.sample_rate = sample_rate
+
+    def enabled(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, exc_info: bool = False, **fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, format_event(event, fields), exc_info=exc_info)
+
+    def debug(self, event: str, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event: str, **fields):
+        """Error with the current traceback"""
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+    def sampled(self, event: str, level: int = logging.DEBUG, rate: Optional[float] = None, **fields):
+        """Emit roughly rate of these events (per-row detail in hot loops)"""
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = self.sample_rate if rate is None else rate
+        if rate < 1.0 and random.random() >= rate:
+            return
+        self.logger.log(level, format_event(event, dict(fields, sample_rate=rate)))
+
+    @contextmanager
+    def request(self, event: str, level: int = logging.INFO, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        One summary line for a whole call: yields a dict the caller fills with counts,
+        duration_ms is added on exit and an escaping exception is logged as an error.
+        """
+        summary = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield summary
+        except Exception as e:
+            summary["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            summary["error"] = str(e)
+            self.log(logging.ERROR, event, **summary)
+            raise
+        summary["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.log(level, event, **summary)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
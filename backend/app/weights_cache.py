@@ -0,0 +1,63 @@
+"""
+weights_cache.py
+
+Local safetensors copy of the model weights for fast cold starts. The first start after a
+model change converts the checkpoint once (Hub download, .bin or sharded weights) into
+WEIGHTS_CACHE_DIR with save_pretrained(safe_serialization=True); every later start loads
+from there. safetensors files are memory-mapped on load, so the weights are paged in from
+the OS page cache instead of being unpickled and copied.
+"""
+import logging
+import os
+import re
+import shutil
+import time
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_CACHE_DIR = os.getenv("WEIGHTS_CACHE_DIR", "/tmp/model_weights")
+WEIGHTS_CACHE = os.getenv("WEIGHTS_CACHE", "true").lower() == "true"
+
+_SAFETENSORS_FILES = ("model.safetensors", "model.safetensors.index.json")
+
+
+def local_weights_path(model_name: str) -> str:
+    """Cache directory for a model id or path"""
+    return os.path.join(WEIGHTS_CACHE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name.strip("/")))
+
+
+def has_safetensors(path: str) -> bool:
+    return any(os.path.exists(os.path.join(path, name)) for name in _SAFETENSORS_FILES)
+
+
+def ensure_safetensors(model_name: str, model_cls, tokenizer_cls) -> str:
+    """
+    Return a local directory holding the model as safetensors, converting it on first use.
+    Falls back to model_name if caching is disabled or the conversion fails.
+    """
+    if not WEIGHTS_CACHE:
+        return model_name
+    if os.path.isdir(model_name) and has_safetensors(model_name):
+        return model_name
+    path = local_weights_path(model_name)
+    if has_safetensors(path):
+        return path
+
+    logger.info(f"Converting {model_name} to safetensors in {path} (one-time)")
+    start = time.time()
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        model = model_cls.from_pretrained(model_name, torch_dtype="auto", low_cpu_mem_usage=True, trust_remote_code=True)
+        model.save_pretrained(tmp_path, safe_serialization=True)
+        tokenizer_cls.from_pretrained(model_name).save_pretrained(tmp_path)
+        del model
+        # Rename last so a crashed conversion never looks complete
+        os.replace(tmp_path, path)
+    except Exception as e:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if has_safetensors(path):
+            return path  # another worker finished the conversion first
+        logger.warning(f"Safetensors conversion of {model_name} failed, loading from source: {e}")
+        return model_name
+    logger.info(f"Converted {model_name} in {time.time() - start:.1f}s")
+    return path
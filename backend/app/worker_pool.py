@@ -0,0 +1,410 @@
+"""
+worker_pool.py
+
+Multi-process inference workers behind a shared job queue. The web processes stay thin:
+they push jobs and wait for replies, while M model processes, each pinned to its own
+subset of cores with torch.set_num_threads matching, pull jobs, batch them together and
+run process_article_batch. One model copy per worker process, none per HTTP worker.
+
+Transports:
+    redis - jobs on a Redis list, replies on a per-client list; workers run as a separate
+            service (python -m app.worker_pool --processes 4) shared by every web worker
+    local - multiprocessing queues; the pool is started by the API process itself, so it is
+            for a single web worker only and refuses to start in a second one on the host
+
+Submissions are bounded like the in-process executor: past INFERENCE_WORKER_MAX_PENDING jobs
+awaiting replies in this process, or INFERENCE_WORKER_MAX_QUEUE jobs queued for the workers,
+the client raises InferenceBusy (429 with Retry-After); a job with no reply within
+INFERENCE_WORKER_TIMEOUT raises WorkerTimeout (504).
+
+Configured by INFERENCE_QUEUE=none|redis|local (none keeps inference in-process).
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from .executor import InferenceBusy
+from .structured_log import configure_logging, get_logger
+
+logger = logging.getLogger(__name__)
+log = get_logger(__name__)
+
+INFERENCE_QUEUE = os.getenv("INFERENCE_QUEUE", "none").lower()
+WORKER_PROCESSES = int(os.getenv("INFERENCE_WORKER_PROCESSES", "2"))
+WORKER_TIMEOUT = float(os.getenv("INFERENCE_WORKER_TIMEOUT", "300"))
+WORKER_MAX_PENDING = int(os.getenv("INFERENCE_WORKER_MAX_PENDING", "64"))  # Awaiting replies, per process
+WORKER_MAX_QUEUE = int(os.getenv("INFERENCE_WORKER_MAX_QUEUE", "256"))  # Queued for the workers, shared
+WORKER_RETRY_AFTER = int(os.getenv("INFERENCE_WORKER_RETRY_AFTER", "5"))
+REPLY_TTL = 300  # Seconds an unread reply list is kept in Redis
+LOCAL_POOL_LOCK = os.path.join(tempfile.gettempdir(), "simplenews-local-inference.lock")
+
+
+class WorkerTimeout(Exception):
+    """No inference worker replied within the timeout"""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"No inference worker replied within {timeout:g}s")
+        self.timeout = timeout
+
+
+class RedisTransport:
+    """Jobs on one Redis list, replies on a list per client"""
+
+    def __init__(self, redis_client, prefix: str = "inference"):
+        self.redis = redis_client
+        self.jobs_key = f"{prefix}:jobs"
+        self.prefix = prefix
+
+    def reply_key(self, reply_to: str) -> str:
+        return f"{self.prefix}:replies:{reply_to}"
+
+    def put_job(self, job: Dict[str, Any]):
+        self.redis.rpush(self.jobs_key, json.dumps(job))
+
+    def depth(self) -> int:
+        """Jobs queued for the workers, across every client"""
+        return int(self.redis.llen(self.jobs_key))
+
+    def get_jobs(self, max_jobs: int, timeout: float) -> List[Dict[str, Any]]:
+        """Block for the first job, then take whatever else is already queued"""
+        first = self.redis.blpop(self.jobs_key, timeout=max(1, int(timeout)))
+        if first is None:
+            return []
+        jobs = [json.loads(first[1])]
+        while len(jobs) < max_jobs:
+            raw = self.redis.lpop(self.jobs_key)
+            if raw is None:
+                break
+            jobs.append(json.loads(raw))
+        return jobs
+
+    def put_result(self, reply_to: str, result: Dict[str, Any]):
+        key = self.reply_key(reply_to)
+        self.redis.rpush(key, json.dumps(result))
+        self.redis.expire(key, REPLY_TTL)
+
+    def get_result(self, reply_to: str, timeout: float) -> Optional[Dict[str, Any]]:
+        item = self.redis.blpop(self.reply_key(reply_to), timeout=max(1, int(timeout)))
+        return json.loads(item[1]) if item else None
+
+
+class LocalTransport:
+    """multiprocessing queues shared between the API process and its worker children"""
+
+    def __init__(self, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.jobs = ctx.Queue()
+        self.results = ctx.Queue()
+
+    def put_job(self, job: Optional[Dict[str, Any]]):
+        self.jobs.put(job)
+
+    def depth(self) -> int:
+        try:
+            return self.jobs.qsize()
+        except NotImplementedError:  # macOS
+            return 0
+
+    def get_jobs(self, max_jobs: int, timeout: float) -> List[Optional[Dict[str, Any]]]:
+        try:
+            jobs = [self.jobs.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(jobs) < max_jobs and jobs[-1] is not None:
+            try:
+                jobs.append(self.jobs.get_nowait())
+            except queue.Empty:
+                break
+        return jobs
+
+    def put_result(self, reply_to: str, result: Dict[str, Any]):
+        self.results.put(result)
+
+    def get_result(self, reply_to: str, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class WorkerClient:
+    """
+    Submit article batches to the worker pool and get Futures back.
+    A listener thread reads this client's replies and resolves the matching Futures.
+
+    Args:
+        transport: RedisTransport or LocalTransport
+        name: Listener thread name, used in logs
+        max_pending: Jobs awaiting replies in this client before submissions raise InferenceBusy
+        max_queue: Jobs queued for the workers (all clients) before submissions raise InferenceBusy
+        retry_after: Seconds suggested to rejected clients
+    """
+
+    def __init__(self, transport, name: str = "worker-client", max_pending: int = WORKER_MAX_PENDING,
+                 max_queue: int = WORKER_MAX_QUEUE, retry_after: int = WORKER_RETRY_AFTER):
+        self.transport = transport
+        self.name = name
+        self.max_pending = max_pending
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.client_id = uuid.uuid4().hex
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self._closed = threading.Event()
+        self._listener = threading.Thread(target=self._listen, name=name, daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while not self._closed.is_set():
+            try:
+                result = self.transport.get_result(self.client_id, timeout=1.0)
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                logger.error(f"{self.name}: reading replies failed: {e}")
+                time.sleep(1.0)
+                continue
+            if result is None:
+                continue
+            with self._lock:
+                future = self._pending.pop(result["id"], None)
+                self._stats["failed" if "error" in result else "completed"] += 1
+            if future is None or future.done():
+                continue  # timed out or cancelled meanwhile
+            if "error" in result:
+                future.set_exception(RuntimeError(result["error"]))
+            else:
+                future.set_result(result["results"])
+
+    def _submit(self, articles: List[str], profile: Optional[str] = None, adapter: Optional[str] = None,
+                use_cache: bool = True) -> tuple:
+        job_id = uuid.uuid4().hex
+        future = Future()
+        with self._lock:
+            self._check_capacity(1)
+            self._pending[job_id] = future
+            self._stats["submitted"] += 1
+        self.transport.put_job({"id": job_id, "reply_to": self.client_id, "articles": articles,
+                                "profile": profile, "adapter": adapter, "use_cache": use_cache})
+        return job_id, future
+
+    def _check_capacity(self, jobs: int):
+        if len(self._pending) + jobs > self.max_pending or self.transport.depth() + jobs > self.max_queue:
+            self._stats["rejected"] += 1
+            raise InferenceBusy(self.retry_after, "Inference worker queue is full")
+
+    def check_capacity(self, jobs: int = 1):
+        """Raise InferenceBusy unless jobs more submissions would be admitted right now"""
+        with self._lock:
+            self._check_capacity(jobs)
+
+    def submit(self, articles: List[str], profile: Optional[str] = None, adapter: Optional[str] = None,
+               use_cache: bool = True) -> Future:
+        """Queue a job; the Future resolves with process_article_batch output for these articles.
+        Raises InferenceBusy when the queue is full."""
+        return self._submit(articles, profile, adapter, use_cache)[1]
+
+    async def process_async(self, articles: List[str], profile: Optional[str] = None,
+                            timeout: float = WORKER_TIMEOUT, adapter: Optional[str] = None,
+                            use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Awaitable submit; raises InferenceBusy when full, WorkerTimeout if no worker replies in time"""
+        job_id, future = self._submit(articles, profile, adapter, use_cache)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise WorkerTimeout(timeout) from None
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+
+    def close(self):
+        """Stop the reply listener"""
+        self._closed.set()
+        self._listener.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        return stats
+
+
+def serve(transport, handler: Callable[[List[str]], List[Dict[str, Any]]], max_jobs: int,
+          poll_timeout: float = 1.0, stop: Optional[threading.Event] = None):
+    """
+    Worker loop: take up to max_jobs queued jobs, run the articles of jobs sharing a decoding
+    profile, LoRA adapter and cache setting through handler as one batch and reply to each job
+    with its own slice.
+    Returns on a None job (local shutdown) or stop.
+    """
+    while stop is None or not stop.is_set():
+        jobs = transport.get_jobs(max_jobs, poll_timeout)
+        if not jobs:
+            continue
+        shutdown = jobs[-1] is None
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            if job is not None:
+                groups.setdefault((job.get("profile"), job.get("adapter"), job.get("use_cache", True)), []).append(job)
+        for (profile, adapter, use_cache), group in groups.items():
+            _run_jobs(transport, handler, group, profile, adapter, use_cache)
+        if shutdown:
+            return
+
+
+def _run_jobs(transport, handler, jobs: List[Dict[str, Any]], profile: Optional[str],
+              adapter: Optional[str] = None, use_cache: bool = True):
+    articles = [article for job in jobs for article in job["articles"]]
+    # Only pass what was requested, so simple handlers (articles only) keep working
+    kwargs = {key: value for key, value in (("profile", profile), ("adapter", adapter)) if value}
+    if not use_cache:
+        kwargs["use_cache"] = False
+    start = time.perf_counter()
+    try:
+        results = handler(articles, **kwargs)
+    except Exception as e:
+        log.error("worker_batch_failed", jobs=len(jobs), articles=len(articles), profile=profile,
+                  adapter=adapter, error=e)
+        for job in jobs:
+            transport.put_result(job["reply_to"], {"id": job["id"], "error": str(e)})
+        return
+    offset = 0
+    for job in jobs:
+        count = len(job["articles"])
+        transport.put_result(job["reply_to"], {"id": job["id"], "results": results[offset:offset + count]})
+        offset += count
+    log.debug("worker_batch", jobs=len(jobs), articles=len(articles), profile=profile, adapter=adapter,
+              duration_ms=round((time.perf_counter() - start) * 1000, 2))
+
+
+def partition_cores(processes: int, cores: Optional[List[int]] = None) -> List[List[int]]:
+    """Split the available cores into contiguous, near-equal groups, one per process"""
+    if cores is None:
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    processes = max(1, min(processes, len(cores)))
+    size, extra = divmod(len(cores), processes)
+    groups, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def _make_transport(spec):
+    if isinstance(spec, LocalTransport):
+        return spec
+    import redis
+    return RedisTransport(redis.from_url(spec))
+
+
+def worker_main(index: int, cores: List[int], transport_spec):
+    """Entry point of one model process: pin to cores, load the model once, serve jobs"""
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    # Thread pools (OpenMP/MKL and torch intra-op) sized to this process's cores
+    os.environ["CPU_THREADS"] = os.environ["OMP_NUM_THREADS"] = str(len(cores))
+    import torch
+    torch.set_num_threads(len(cores))
+
+    from app import model_inference
+    model_inference.get_model()
+    logger.info(f"Inference worker {index} ready on cores {cores}")
+    serve(_make_transport(transport_spec), model_inference.process_article_batch,
+          model_inference.INFERENCE_BATCH_SIZE)
+
+
+def start_worker_pool(processes: int, transport_spec, cores: Optional[List[int]] = None) -> List[multiprocessing.Process]:
+    """Spawn one model process per core group; transport_spec is a LocalTransport or a Redis URL"""
+    ctx = multiprocessing.get_context("spawn")
+    workers = []
+    for index, group in enumerate(partition_cores(processes, cores)):
+        process = ctx.Process(target=worker_main, args=(index, group, transport_spec),
+                              name=f"inference-worker-{index}", daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def stop_worker_pool(transport: LocalTransport, workers: List[multiprocessing.Process]):
+    for _ in workers:
+        transport.put_job(None)
+    for process in workers:
+        process.join(timeout=30)
+
+
+_client: Optional[WorkerClient] = None
+_client_lock = threading.Lock()
+_local_pool_lock = None
+
+
+def _claim_local_pool():
+    """
+    INFERENCE_QUEUE=local starts the model processes inside this API process, so a second web
+    worker on the host would start a second pool (N x M model copies). Held until exit.
+    """
+    global _local_pool_lock
+    import fcntl
+    lock_file = open(LOCAL_POOL_LOCK, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        raise RuntimeError(
+            "INFERENCE_QUEUE=local is single-process only and another web worker on this host already "
+            "runs a local pool; run one web worker or use INFERENCE_QUEUE=redis with python -m app.worker_pool"
+        ) from None
+    _local_pool_lock = lock_file
+
+
+def get_worker_client() -> Optional[WorkerClient]:
+    """Client for the configured queue, or None when inference runs in-process; raises
+    RuntimeError when the queue cannot work in this process (called at API startup)"""
+    global _client
+    if INFERENCE_QUEUE == "none":
+        return None
+    with _client_lock:
+        if _client is None:
+            if INFERENCE_QUEUE == "redis":
+                from app import REDIS_URL, redis_client
+                if not hasattr(redis_client, "blpop"):
+                    # app.redis_client falls back to a mock without list commands
+                    raise RuntimeError(f"INFERENCE_QUEUE=redis but Redis at {REDIS_URL} is unavailable")
+                _client = WorkerClient(RedisTransport(redis_client))
+            elif INFERENCE_QUEUE == "local":
+                _claim_local_pool()
+                transport = LocalTransport()
+                start_worker_pool(WORKER_PROCESSES, transport)
+                _client = WorkerClient(transport)
+            else:
+                raise ValueError(f"Unknown INFERENCE_QUEUE {INFERENCE_QUEUE!r}, expected none, redis or local")
+    return _client
+
+
+if __name__ == "__main__":
+    import argparse
+    from app import REDIS_URL
+    parser = argparse.ArgumentParser(description="Inference worker service (Redis job queue)")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES)
+    parser.add_argument("--redis-url", type=str, default=REDIS_URL)
+    args = parser.parse_args()
+    configure_logging()
+    workers = start_worker_pool(args.processes, args.redis_url)
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
@@ -0,0 +1,62 @@
+"""
+bench_cpu_backend.py
+
+Compare the CPU backends from app/cpu_backend.py (fp32, bf16, int8, onnx): next-token logit
+parity against the fp32 reference and throughput of the logit scoring pass.
+
+Usage (from backend/):
+    python -m bench.bench_cpu_backend --backends fp32 bf16 int8 onnx --articles 32
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+import app.model_inference as mi
+from app.cpu_backend import CPU_BACKENDS, load_cpu_model, logit_parity
+from bench.common import Timer, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU inference backend benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--backends", type=str, nargs="+", default=list(CPU_BACKENDS), choices=CPU_BACKENDS)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, reference = load_tiny_causal_model(args.model)
+    articles = make_corpus(args.articles)
+    summaries = [article[:200] for article in articles]
+    parity_prompts = [mi.format_digit_score_prompt(a[:500], s) for a, s in zip(articles[:8], summaries[:8])]
+    # The prefix cache is benchmarked separately; keep the comparison to plain forward passes
+    mi.PREFIX_CACHE = False
+
+    results = {}
+    for backend in args.backends:
+        model = reference if backend == "fp32" else load_cpu_model(args.model, backend)
+        mi._score_with_logits(tokenizer, model, articles[:1], summaries[:1])  # warmup
+        with Timer() as timer:
+            for i in range(0, len(articles), args.batch_size):
+                mi._score_with_logits(tokenizer, model, articles[i:i + args.batch_size], summaries[i:i + args.batch_size])
+        row = {
+            "ms_per_article": round(timer.elapsed * 1000 / len(articles), 2),
+            "articles_per_sec": round(len(articles) / timer.elapsed, 1),
+        }
+        row.update(logit_parity(tokenizer, reference, model, parity_prompts))
+        results[backend] = row
+
+    print_report(f"CPU backends ({args.model}, bs={args.batch_size})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "cpu_backend", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+bench_health_latency.py
+
+Load test for the inference execution layer: measure /health latency on an idle API and
+while concurrent /batch_summarize traffic is running. With blocking inference moved onto
+the bounded executor, /health should stay flat; requests beyond the queue limit get 429.
+
+By default inference is simulated by a blocking sleep (--inference-ms) so the test needs no
+model; pass --model to run the tiny causal model instead.
+
+Usage (from backend/):
+    python -m bench.bench_health_latency --clients 16 --inference-ms 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import app.model_inference as mi
+from app.api import app
+from bench.common import install_model, load_tiny_causal_model, make_corpus, percentile, print_report
+
+
+async def _probe_health(client, duration, interval=0.02):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _batch_traffic(client, articles, clients, rounds):
+    statuses = []
+
+    async def worker():
+        for _ in range(rounds):
+            response = await client.post("/batch_summarize", json={"articles": articles})
+            statuses.append(response.status_code)
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return statuses
+
+
+def _summarize(latencies):
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle = await _probe_health(client, args.probe_seconds)
+
+        traffic = asyncio.create_task(_batch_traffic(client, make_corpus(args.articles), args.clients, args.rounds))
+        loaded = []
+        while not traffic.done():
+            loaded.extend(await _probe_health(client, 0.5))
+        statuses = await traffic
+
+    results = {"idle": _summarize(idle), "under_load": _summarize(loaded)}
+    results["under_load"]["batch_ok"] = statuses.count(200)
+    results["under_load"]["batch_429"] = statuses.count(429)
+    results["under_load"]["max_inflight"] = mi.inference_executor.stats()["max_inflight_seen"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/health latency under batch load")
+    parser.add_argument("--model", type=str, default=None, help="Run a real (tiny) model instead of simulated inference")
+    parser.add_argument("--inference-ms", type=float, default=500, help="Simulated blocking inference time per batch")
+    parser.add_argument("--articles", type=int, default=8, help="Articles per batch request")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--probe-seconds", type=float, default=2.0)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.model:
+        install_model(mi, *load_tiny_causal_model(args.model))
+        mi.JOINT_INFERENCE = True  # generate() directly, no summarization pipeline for a causal LM
+    else:
+        def fake_process_article_batch(articles, fingerprints=None, profile=None, adapter=None, use_cache=True):
+            time.sleep(args.inference_ms / 1000)  # blocks like a model call would
+            return [{"summary": "s", "score": 0.5, "timestamp": "", "article_length": len(a), "summary_length": 1,
+                     "model_version": mi.adapter_manager.model_version(adapter)}
+                    for a in articles]
+        mi.process_article_batch = fake_process_article_batch
+
+    results = asyncio.run(run(args))
+    print_report("/health latency", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "health_latency", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
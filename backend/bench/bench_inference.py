@@ -0,0 +1,162 @@
+"""
+bench_inference.py
+
+End-to-end inference benchmark: drives summarize_article, batch_summarize, importance_score
+and the HTTP endpoints (/summarize, /batch_summarize through the ASGI app) with a replayable
+corpus at several concurrency levels on a tiny CPU model. Every run is done cold (caches
+cleared) and warm (same corpus replayed) and reports articles/sec, the implied articles/day,
+p50/p95/p99 request latency, cache hit rate and peak RSS. Use --json to keep runs comparable.
+
+Usage (from backend/):
+    python -m bench.bench_inference --articles 64 --concurrency 1,4,8 --corpus /tmp/corpus.jsonl --json run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import torch
+
+import app.model_inference as mi
+from app.api import app
+from bench.common import (
+    install_model, latency_stats, load_corpus, load_tiny_seq2seq_model, make_corpus, peak_rss_mb,
+    print_report, save_corpus, TINY_SEQ2SEQ_MODEL
+)
+
+TARGETS = ("summarize", "batch", "score", "http_summarize", "http_batch")
+
+
+def _requests(target, articles, batch_size):
+    """Split the corpus into the unit of work of each target (one article or one batch)"""
+    if target in ("batch", "http_batch"):
+        return [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+    return [[article] for article in articles]
+
+
+def _call(target, request, summaries):
+    if target == "summarize":
+        mi.summarize_article(request[0])
+    elif target == "batch":
+        mi.batch_summarize(request)
+    elif target == "score":
+        mi.importance_score(request[0], summaries[request[0]])
+
+
+def _run_threads(target, requests, concurrency, summaries):
+    def timed(request):
+        start = time.perf_counter()
+        _call(target, request, summaries)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, requests))
+
+
+async def _run_http(target, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def timed(request):
+            async with semaphore:
+                start = time.perf_counter()
+                if target == "http_batch":
+                    response = await client.post("/batch_summarize", json={"articles": request})
+                else:
+                    response = await client.post("/summarize", json={"article": request[0]})
+                response.raise_for_status()
+                return (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(timed(request) for request in requests))
+
+
+def _cache_lookups():
+    stats = [mi.summary_cache.stats(), mi.score_cache.stats()]
+    return sum(s["hits"] + s["redis_hits"] for s in stats), sum(s["misses"] for s in stats)
+
+
+def run(target, articles, concurrency, batch_size, summaries):
+    requests = _requests(target, articles, batch_size)
+    hits_before, misses_before = _cache_lookups()
+    start = time.perf_counter()
+    if target.startswith("http"):
+        latencies = asyncio.run(_run_http(target, requests, concurrency))
+    else:
+        latencies = _run_threads(target, requests, concurrency, summaries)
+    elapsed = time.perf_counter() - start
+    hits, misses = _cache_lookups()
+    lookups = (hits - hits_before) + (misses - misses_before)
+    return {
+        "articles": len(articles),
+        "requests": len(requests),
+        "seconds": round(elapsed, 3),
+        "articles_per_sec": round(len(articles) / elapsed, 2),
+        "articles_per_day": int(len(articles) / elapsed * 86400),
+        **latency_stats(latencies),
+        "cache_hit_rate": round((hits - hits_before) / lookups, 4) if lookups else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference throughput/latency benchmark")
+    parser.add_argument("--model", type=str, default=TINY_SEQ2SEQ_MODEL)
+    parser.add_argument("--articles", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", type=str, default=None,
+                        help="JSONL corpus to replay; written from the synthetic corpus if it does not exist")
+    parser.add_argument("--concurrency", type=str, default="1,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--batch-size", type=int, default=8, help="Articles per batch_summarize call")
+    parser.add_argument("--targets", type=str, default=",".join(TARGETS))
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.corpus and os.path.exists(args.corpus):
+        articles = load_corpus(args.corpus)
+    else:
+        articles = make_corpus(args.articles, seed=args.seed)
+        if args.corpus:
+            save_corpus(articles, args.corpus)
+
+    torch.manual_seed(0)
+    install_model(mi, *load_tiny_seq2seq_model(args.model))
+    # Local cache tier only, so hit rates depend on this run alone
+    mi.summary_cache.redis = mi.score_cache.redis = None
+    # Scoring input: one summary per article, computed once outside the timed runs
+    summaries = dict(zip(articles, mi.batch_summarize(articles)))
+
+    results = {}
+    for target in args.targets.split(","):
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            mi.summary_cache.clear()
+            mi.score_cache.clear()
+            for phase in ("cold", "warm"):
+                results[f"{target}@c{concurrency}/{phase}"] = run(
+                    target, articles, concurrency, args.batch_size, summaries
+                )
+
+    print_report(f"Inference ({args.model}, {len(articles)} articles)", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "benchmark": "inference",
+                "args": vars(args),
+                "environment": {
+                    "python": platform.python_version(),
+                    "torch": torch.__version__,
+                    "torch_threads": torch.get_num_threads(),
+                    "cpus": os.cpu_count(),
+                },
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
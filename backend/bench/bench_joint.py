@@ -0,0 +1,75 @@
+"""
+bench_joint.py
+
+Compare separate summarize-then-score passes (article encoded twice) with
+model_inference's joint path (article encoded once, score read off the KV cache).
+
+Usage (from backend/):
+    python -m bench.bench_joint --articles 16 --batch-size 4
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+import app.model_inference as mi
+from bench.common import Timer, install_model, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def separate_passes(tokenizer, model, articles, max_new_tokens):
+    inputs = tokenizer.pad({"input_ids": [mi._instruction_input_ids(tokenizer, a) for a in articles]},
+                           return_tensors="pt")
+    with torch.no_grad():
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, min_new_tokens=max_new_tokens,
+                                 do_sample=False, pad_token_id=tokenizer.pad_token_id)
+    summaries = tokenizer.batch_decode(outputs[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+    return mi._score_with_logits(tokenizer, model, articles, summaries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Joint summarize+score benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, model = load_tiny_causal_model(args.model)
+    install_model(mi, tokenizer, model)
+    articles = make_corpus(args.articles)
+
+    original_generate = model.generate
+
+    def fixed_length_generate(*a, **kw):
+        # Same number of new tokens in both modes so only the encoding work differs
+        kw["max_new_tokens"] = kw["min_new_tokens"] = args.max_new_tokens
+        return original_generate(*a, **kw)
+
+    model.generate = fixed_length_generate
+
+    results = {}
+    with Timer() as timer:
+        for i in range(0, len(articles), args.batch_size):
+            separate_passes(tokenizer, model, articles[i:i + args.batch_size], args.max_new_tokens)
+    results["separate"] = {"ms_per_article": round(timer.elapsed * 1000 / len(articles), 2)}
+
+    with Timer() as timer:
+        for i in range(0, len(articles), args.batch_size):
+            mi._joint_generate(tokenizer, model, articles[i:i + args.batch_size])
+    results["joint"] = {"ms_per_article": round(timer.elapsed * 1000 / len(articles), 2)}
+    results["joint"]["speedup"] = round(results["separate"]["ms_per_article"] / results["joint"]["ms_per_article"], 2)
+
+    print_report(f"Joint summarize+score ({args.model})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "joint", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+bench_length_bucketing.py
+
+Compare fixed-count batching (arrival order) with length-bucketed batching under a
+token budget, as used by model_inference.batch_summarize. Reports tokens/sec and
+padding ratio for each mode on a tiny CPU model.
+
+Usage (from backend/):
+    python -m bench.bench_length_bucketing --articles 64 --batch-size 8 --max-batch-tokens 4096
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.batching import plan_length_batches, padding_stats
+from bench.common import Timer, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def run_plan(tokenizer, model, token_ids, plan, max_new_tokens):
+    generated = 0
+    with Timer() as timer:
+        for batch in plan:
+            inputs = tokenizer.pad({"input_ids": [token_ids[i] for i in batch]}, return_tensors="pt")
+            with torch.no_grad():
+                outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, min_new_tokens=max_new_tokens,
+                                         do_sample=False, pad_token_id=tokenizer.pad_token_id)
+            generated += (outputs.shape[1] - inputs["input_ids"].shape[1]) * len(batch)
+    real_tokens = sum(len(ids) for ids in token_ids)
+    return {
+        "seconds": round(timer.elapsed, 3),
+        "input_tokens_per_sec": round(real_tokens / timer.elapsed, 1),
+        "generated_tokens_per_sec": round(generated / timer.elapsed, 1),
+        **padding_stats([len(ids) for ids in token_ids], plan),
+        "batches": len(plan),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Length-bucketed batching benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-batch-tokens", type=int, default=4096)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, model = load_tiny_causal_model(args.model)
+    articles = make_corpus(args.articles)
+    # Tokenize once, shared by both modes
+    token_ids = tokenizer(articles, truncation=True, max_length=1024)["input_ids"]
+
+    fixed_plan = [list(range(i, min(i + args.batch_size, len(articles))))
+                  for i in range(0, len(articles), args.batch_size)]
+    bucketed_plan = plan_length_batches([len(ids) for ids in token_ids], args.max_batch_tokens, args.batch_size)
+
+    results = {
+        "fixed": run_plan(tokenizer, model, token_ids, fixed_plan, args.max_new_tokens),
+        "length_bucketed": run_plan(tokenizer, model, token_ids, bucketed_plan, args.max_new_tokens),
+    }
+    print_report(f"Length bucketing ({args.model}, {args.articles} articles)", results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "length_bucketing", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+bench_logging.py
+
+Request-time cost of logging in PostgresService.get_news/save_news. The service runs
+against an in-memory fake session (no database), so the measured time is row conversion
+plus logging. Modes:
+    per_row  - DEBUG with every sampled event emitted: one synchronous line per row, the
+               volume of the old per-row debug prints
+    summary  - default INFO: one summary line per call, per-row events gated off
+    quiet    - WARNING: no lines on the success path
+
+Usage (from backend/):
+    python -m bench.bench_logging --rows 50 --requests 500 --sink stdout --json run.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.news.postgres_service as postgres_service
+from app.news.postgres_service import PostgresService
+from app.structured_log import LOG_SAMPLE_RATE
+from bench.common import latency_stats, make_corpus, print_report
+
+MODES = {
+    "per_row": (logging.DEBUG, 1.0),
+    "summary": (logging.INFO, LOG_SAMPLE_RATE),
+    "quiet": (logging.WARNING, LOG_SAMPLE_RATE),
+}
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def offset(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return None
+
+
+class FakeSession:
+    """Just enough of a SQLAlchemy session for get_news/save_news"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, *args):
+        return FakeQuery(self.rows)
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class NullRedis:
+    def get(self, key):
+        return None
+
+    def setex(self, key, ttl, value):
+        pass
+
+
+def make_rows(n):
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(id=uuid.uuid4(), title=article[:80], content=article, link=f"https://example.com/{i}",
+                        published_at=now - timedelta(minutes=i), source="Bench", keywords=[])
+        for i, article in enumerate(make_corpus(n))
+    ]
+
+
+def run(mode, rows, requests, stream):
+    level, rate = MODES[mode]
+    logging.getLogger(postgres_service.__name__).setLevel(level)
+    postgres_service.log.sample_rate = rate
+    service = PostgresService(FakeSession(rows))
+    items = [{"title": row.title, "content": row.content, "link": row.link, "date": row.published_at.isoformat()}
+             for row in rows]
+    position = stream.tell() if stream.seekable() else 0
+
+    get_ms, save_ms = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        service.get_news(offset=20, limit=len(rows))  # offset > 0 skips the Redis cache
+        get_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        service.save_news(items)
+        save_ms.append((time.perf_counter() - start) * 1000)
+    stream.flush()
+    return {
+        "get_news_mean_ms": round(sum(get_ms) / len(get_ms), 3),
+        **{f"get_news_{k}": v for k, v in latency_stats(get_ms).items()},
+        "save_news_mean_ms": round(sum(save_ms) / len(save_ms), 3),
+        "log_bytes_per_request": (stream.tell() - position) // requests if stream.seekable() else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark for the news service")
+    parser.add_argument("--rows", type=int, default=50, help="Rows returned/saved per request")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--sink", choices=("file", "stdout"), default="file",
+                        help="Where log lines go; stdout matches a container log pipe")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    stream = sys.stdout if args.sink == "stdout" else tempfile.TemporaryFile("w+")
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logging.getLogger().addHandler(handler)
+    postgres_service.redis_client = NullRedis()
+
+    rows = make_rows(args.rows)
+    results = {mode: run(mode, rows, args.requests, stream) for mode in MODES}
+    logging.getLogger().removeHandler(handler)
+
+    baseline = results["per_row"]["get_news_mean_ms"]
+    for row in results.values():
+        row["get_news_speedup"] = round(baseline / row["get_news_mean_ms"], 2)
+    print_report(f"Logging ({args.rows} rows/request, sink={args.sink})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "logging", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_prefix_cache.py
+
+Measure the effect of the prompt-prefix KV cache in model_inference: logit scoring with the
+static instruction prefix encoded on every call vs reused from the cached past_key_values.
+Also reports the largest score difference between the two paths as a parity check.
+
+Usage (from backend/):
+    python -m bench.bench_prefix_cache --batch-sizes 1 8 --articles 32
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+import app.model_inference as mi
+from bench.common import Timer, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def _run(tokenizer, model, articles, summaries, batch_size, prefix_cache):
+    mi.PREFIX_CACHE = prefix_cache
+    scores = []
+    with Timer() as timer:
+        for i in range(0, len(articles), batch_size):
+            scores.extend(mi._score_with_logits(tokenizer, model, articles[i:i + batch_size], summaries[i:i + batch_size]))
+    return scores, timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-prefix KV cache benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, model = load_tiny_causal_model(args.model)
+    articles = make_corpus(args.articles)
+    summaries = [article[:200] for article in articles]
+
+    results = {}
+    for batch_size in args.batch_sizes:
+        mi._PREFIX_KV.clear()
+        # Warm the prefix cache so the timed run measures steady state
+        _run(tokenizer, model, articles[:1], summaries[:1], 1, True)
+        baseline, full_time = _run(tokenizer, model, articles, summaries, batch_size, False)
+        cached, cached_time = _run(tokenizer, model, articles, summaries, batch_size, True)
+        results[f"full_prompt@bs{batch_size}"] = {
+            "ms_per_article": round(full_time * 1000 / len(articles), 2),
+        }
+        results[f"prefix_cache@bs{batch_size}"] = {
+            "ms_per_article": round(cached_time * 1000 / len(articles), 2),
+            "speedup": round(full_time / cached_time, 2),
+            "max_score_diff": round(max(abs(a - b) for a, b in zip(baseline, cached)), 6),
+        }
+
+    print_report(f"Prompt-prefix KV cache ({args.model})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "prefix_cache", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
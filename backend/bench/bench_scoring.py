@@ -0,0 +1,56 @@
+"""
+bench_scoring.py
+
+Compare importance-scoring latency of the two SCORING_MODEs in model_inference:
+"generate" (autoregressive decode + parse) vs "logits" (one forward pass over digit tokens).
+
+Usage (from backend/):
+    python -m bench.bench_scoring --batch-sizes 1 8 --articles 32
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+import app.model_inference as mi
+from bench.common import Timer, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importance scoring latency benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, model = load_tiny_causal_model(args.model)
+    articles = make_corpus(args.articles)
+    summaries = [article[:200] for article in articles]
+
+    results = {}
+    for batch_size in args.batch_sizes:
+        for mode, score_fn in (("generate", mi._score_with_generate), ("logits", mi._score_with_logits)):
+            with Timer() as timer:
+                for i in range(0, len(articles), batch_size):
+                    score_fn(tokenizer, model, articles[i:i + batch_size], summaries[i:i + batch_size])
+            results[f"{mode}@bs{batch_size}"] = {
+                "ms_per_article": round(timer.elapsed * 1000 / len(articles), 2),
+                "articles_per_sec": round(len(articles) / timer.elapsed, 1),
+            }
+        speedup = results[f"generate@bs{batch_size}"]["ms_per_article"] / results[f"logits@bs{batch_size}"]["ms_per_article"]
+        results[f"logits@bs{batch_size}"]["speedup_vs_generate"] = round(speedup, 2)
+
+    print_report(f"Importance scoring ({args.model})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "scoring", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
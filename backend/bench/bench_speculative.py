@@ -0,0 +1,89 @@
+"""
+bench_speculative.py
+
+Speculative (assisted) summary decoding vs the default 4-beam search and plain greedy decoding,
+on CPU with small models from the same tokenizer family. Reports generated tokens/sec and a
+quality-parity check: greedy assisted decoding must reproduce plain greedy output exactly
+(the main model verifies every drafted token), and token-overlap F1 against the beam output.
+
+Usage (from backend/):
+    python -m bench.bench_speculative --model distilgpt2 --draft sshleifer/tiny-gpt2 --articles 8
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+import app.model_inference as mi
+from app.decoding import DECODING_PROFILES
+from bench.common import Timer, install_model, load_tiny_causal_model, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def _overlap_f1(a: str, b: str) -> float:
+    ta, tb = Counter(a.split()), Counter(b.split())
+    common = sum((ta & tb).values())
+    if not common:
+        return 0.0
+    precision, recall = common / sum(ta.values()), common / sum(tb.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _run(tokenizer, id_lists, assistant, profile):
+    mi.ASSISTANT_MODEL_NAME = "draft" if assistant is not None else ""
+    mi._assistant_model = lambda: assistant
+    summaries = []
+    with Timer() as timer:
+        for ids in id_lists:
+            summaries.extend(mi._generate_from_ids([ids], profile))
+    tokens = sum(len(tokenizer.encode(summary)) for summary in summaries)
+    return summaries, tokens / timer.elapsed, timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speculative decoding benchmark")
+    parser.add_argument("--model", type=str, default="distilgpt2")
+    parser.add_argument("--draft", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--articles", type=int, default=8)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer, model = load_tiny_causal_model(args.model)
+    _, draft = load_tiny_causal_model(args.draft)
+    install_model(mi, tokenizer, model)
+    articles = make_corpus(args.articles, max_sentences=20)
+    id_lists = [tokenizer.encode(article, truncation=True, max_length=512) for article in articles]
+
+    # Plain greedy with the quality profile's lengths: what assisted decoding must reproduce
+    DECODING_PROFILES["greedy"] = dict(DECODING_PROFILES["quality"], num_beams=1)
+    DECODING_PROFILES["greedy"].pop("early_stopping")
+
+    beam, beam_tps, beam_s = _run(tokenizer, id_lists, None, "quality")
+    greedy, greedy_tps, greedy_s = _run(tokenizer, id_lists, None, "greedy")
+    assisted, assisted_tps, assisted_s = _run(tokenizer, id_lists, draft, "quality")
+
+    results = {
+        "beam4": {"tokens_per_sec": round(beam_tps, 1), "wall_s": round(beam_s, 2)},
+        "greedy": {"tokens_per_sec": round(greedy_tps, 1), "wall_s": round(greedy_s, 2)},
+        "assisted": {
+            "tokens_per_sec": round(assisted_tps, 1),
+            "wall_s": round(assisted_s, 2),
+            "speedup_vs_beam4": round(beam_s / assisted_s, 2),
+            "exact_match_vs_greedy": round(sum(a == g for a, g in zip(assisted, greedy)) / len(articles), 3),
+            "overlap_f1_vs_beam4": round(sum(_overlap_f1(a, b) for a, b in zip(assisted, beam)) / len(articles), 3),
+        },
+    }
+
+    print_report(f"Speculative decoding ({args.model} + draft {args.draft})", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "speculative", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
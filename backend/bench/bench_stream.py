@@ -0,0 +1,90 @@
+"""
+bench_stream.py
+
+Time-to-first-result and total wall time of /process_stream: the previous sequential loop
+(one article at a time through summarize_and_score_async, the call the endpoint makes per
+article) vs the current endpoint, which runs every article on the inference executor at once
+and emits results in completion order.
+
+Usage (from backend/):
+    python -m bench.bench_stream --articles 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import torch
+
+import app.model_inference as mi
+from app.api import app
+from bench.common import install_model, load_tiny_seq2seq_model, make_corpus, print_report, TINY_SEQ2SEQ_MODEL
+
+
+async def _sequential(articles):
+    """The old /process_stream loop"""
+    start = time.perf_counter()
+    first = None
+    for article in articles:
+        await mi.summarize_and_score_async(article, use_cache=False)
+        first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def _endpoint(articles, stream_tokens):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        first = None
+        order = []
+        async with client.stream("POST", f"/process_stream?stream_tokens={str(stream_tokens).lower()}",
+                                 json=articles) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event["type"] == "token":
+                    continue
+                first = first or time.perf_counter() - start
+                order.append(event["index"])
+        return first, time.perf_counter() - start, order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/process_stream latency benchmark")
+    parser.add_argument("--model", type=str, default=TINY_SEQ2SEQ_MODEL)
+    parser.add_argument("--articles", type=int, default=16)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    install_model(mi, *load_tiny_seq2seq_model(args.model))
+    articles = make_corpus(args.articles)
+
+    results = {}
+    for name, run in (
+        ("sequential", lambda: _sequential(articles)),
+        ("concurrent", lambda: _endpoint(articles, False)),
+        ("tokens", lambda: _endpoint(articles, True)),
+    ):
+        # Every variant starts cold
+        mi.summary_cache.clear()
+        mi.score_cache.clear()
+        first, total, *rest = asyncio.run(run())
+        results[name] = {"first_result_ms": round(first * 1000, 1), "total_ms": round(total * 1000, 1)}
+        if rest:
+            results[name]["out_of_order"] = rest[0] != sorted(rest[0])
+
+    print_report(f"/process_stream ({args.model}, {args.articles} articles)", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "stream", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+bench_worker_pool.py
+
+Throughput of the multi-process inference worker pool (app/worker_pool.py) as the number
+of model processes grows, each pinned to its own share of the cores. Uses the local
+multiprocessing transport and the tiny causal model, so it runs on any CPU box.
+
+Usage (from backend/):
+    python -m bench.bench_worker_pool --processes 1 2 4 --articles 64
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import Timer, make_corpus, print_report, TINY_CAUSAL_MODEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference worker pool scaling benchmark")
+    parser.add_argument("--model", type=str, default=TINY_CAUSAL_MODEL)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--articles", type=int, default=64)
+    parser.add_argument("--job-size", type=int, default=1, help="Articles per queued job")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Inherited by the spawned workers
+    os.environ.update({
+        "MODEL_NAME": args.model,
+        "CPU_BACKEND": "fp32",
+        "JOINT_INFERENCE": "true",
+        "INFERENCE_CACHE_REDIS": "false",
+        "WEIGHTS_CACHE": "false",
+    })
+    from app.worker_pool import LocalTransport, WorkerClient, start_worker_pool, stop_worker_pool
+
+    articles = make_corpus(args.articles)
+    jobs = [articles[i:i + args.job_size] for i in range(0, len(articles), args.job_size)]
+
+    results = {}
+    for processes in args.processes:
+        transport = LocalTransport()
+        workers = start_worker_pool(processes, transport)
+        client = WorkerClient(transport)
+        # Warm every worker (model load) before timing
+        for future in [client.submit([f"warmup {i} " + articles[0]]) for i in range(processes * 2)]:
+            future.result(timeout=600)
+
+        with Timer() as timer:
+            # Distinct text per run so no worker answers from its cache
+            futures = [client.submit([f"run {processes}. " + a for a in job]) for job in jobs]
+            for future in futures:
+                future.result(timeout=600)
+        client.close()
+        stop_worker_pool(transport, workers)
+
+        results[f"{processes}_proc"] = {
+            "articles_per_sec": round(len(articles) / timer.elapsed, 2),
+            "wall_s": round(timer.elapsed, 2),
+        }
+    base = results[f"{args.processes[0]}_proc"]["articles_per_sec"]
+    for row in results.values():
+        row["scaling"] = round(row["articles_per_sec"] / base, 2)
+
+    print_report(f"Worker pool ({args.model}, {os.cpu_count()} cores)", results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "worker_pool", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+common.py
+
+Shared helpers for the CPU benchmarks: a replayable synthetic news corpus and tiny
+HuggingFace models so every benchmark runs on a laptop without a GPU.
+"""
+import json
+import random
+import resource
+import sys
+import time
+from typing import Dict, List
+
+# Tiny random-weight checkpoints: fast on CPU, same code paths as the 7B model
+TINY_CAUSAL_MODEL = "sshleifer/tiny-gpt2"
+TINY_SEQ2SEQ_MODEL = "sshleifer/bart-tiny-random"
+
+_SENTENCES = [
+    "The government announced a new policy on renewable energy subsidies.",
+    "Officials said the measure would take effect early next year.",
+    "Markets reacted cautiously as investors weighed the economic impact.",
+    "Opposition leaders criticized the plan as too little, too late.",
+    "Analysts expect the decision to influence trade negotiations in the region.",
+    "Emergency crews worked through the night to restore power to thousands of homes.",
+    "The company reported quarterly earnings above expectations.",
+    "Researchers published findings suggesting a breakthrough in battery technology.",
+]
+
+
+def make_corpus(n: int = 64, seed: int = 0, min_sentences: int = 2, max_sentences: int = 60) -> List[str]:
+    """Deterministic corpus of articles with a wide, skewed length distribution"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n):
+        # Mostly short wire stories with a long tail of long-form pieces
+        count = min(max_sentences, max(min_sentences, int(rng.expovariate(1 / 10))))
+        articles.append(f"Story {i}. " + " ".join(rng.choice(_SENTENCES) for _ in range(count)))
+    return articles
+
+
+def save_corpus(articles: List[str], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for article in articles:
+            f.write(json.dumps({"article": article}) + "\n")
+
+
+def load_corpus(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["article"] for line in f if line.strip()]
+
+
+def load_tiny_causal_model(name: str = TINY_CAUSAL_MODEL):
+    """Tokenizer + causal LM on CPU in fp32, left-padded for batched generation"""
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    model = AutoModelForCausalLM.from_pretrained(name)
+    model.eval()
+    return tokenizer, model
+
+
+def load_tiny_seq2seq_model(name: str = TINY_SEQ2SEQ_MODEL):
+    """Tokenizer, seq2seq model and summarization pipeline on CPU (the pipeline path of model_inference)"""
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(name).eval()
+    return tokenizer, model, pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def latency_stats(latencies_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Timer:
+    """Context manager measuring wall time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def print_report(title: str, rows: Dict[str, Dict]):
+    print(f"\n=== {title} ===")
+    for name, row in rows.items():
+        print(f"{name:>16}: " + ", ".join(f"{k}={v}" for k, v in row.items()))
+
+
+def install_model(model_inference, tokenizer, model, summarizer=None):
+    """Point model_inference's lazy-loaded globals at an already-loaded (tiny) model"""
+    model_inference.TOKENIZER = tokenizer
+    model_inference.MODEL = model
+    model_inference.SUMMARIZER = summarizer
+    model_inference._model_loaded = True
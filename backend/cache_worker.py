@@ -1,41 +1,72 @@
 import logging
 from app.news.postgres_service import PostgresService
 from app.db import SessionLocal
-from news.fetch_news import get_tech_news
+from news.summarize import generate_both_summaries, summaries_failed
+from app.pipeline import run_ingest
+from app.refresh_coordinator import LockLost
 import time
 from app import redis_client
 import json
+import os
+from app.structured_log import configure_logging, get_logger
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
+log = get_logger(__name__)
 
-def refresh_news_cache():
-    """Refresh news cache"""
-    try:
-        logger.info("🔄 Starting news cache refresh...")
-        
-        # Get new news data
-        news_items = get_tech_news(force_refresh=True)
-        logger.info(f"📰 Fetched {len(news_items)} news items")
-        
-        if not news_items:
-            logger.warning("⚠️ No news data fetched")
-            return
+# Max articles summarized per ingest run
+INGEST_SUMMARY_LIMIT = int(os.getenv("INGEST_SUMMARY_LIMIT", "50"))
+
+def refresh_news_cache(lease=None):
+    """
+    Refresh news: run the staged ingest pipeline, then retry rows still lacking a summary.
+    Scheduled by app.refresh_coordinator, which holds the cluster-wide lock and backs off
+    when this raises; every database write first checks the coordinator's lease, so a run
+    that lost the lock stops with LockLost instead of overlapping the next one.
+    """
+    fence = lease.check if lease is not None else None
+    with log.request("refresh_news_cache") as summary:
+        # fetch -> scrape -> dedup -> persist -> summarize -> score, stages overlapping
+        stages = run_ingest(fence=fence)["stages"]
+        summary["fetched"] = stages["fetch"]["emitted"]
+        summary["saved"] = stages["persist"]["emitted"]
+        summary["scored"] = stages["score"]["emitted"] if "score" in stages else 0
         
-        # Save to database
-        db = SessionLocal()
-        try:
-            pg_service = PostgresService(db)
-            success = pg_service.save_news(news_items)
-            if success:
-                logger.info("✅ News cache refresh successful")
-            else:
-                logger.error("❌ News cache refresh failed")
-        finally:
-            db.close()
-            
-    except Exception as e:
-        logger.error(f"❌ Error refreshing news cache: {e}")
+        # Summaries that failed during the run are retried on rows left pending
+        summary["summarized"] = summarize_pending_news(fence=fence)
+
+def summarize_pending_news(limit: int = INGEST_SUMMARY_LIMIT, fence=None) -> int:
+    """
+    Ingest-time summarization: store brief/detailed summaries on news rows that lack one.
+    fence is called before each write and raising from it stops the loop (Lease.check).
+    """
+    db = SessionLocal()
+    summarized = 0
+    try:
+        pg_service = PostgresService(db)
+        pending = pg_service.get_news_without_summary(limit)
+        start = time.perf_counter()
+        for news in pending:
+            try:
+                if not news.content:
+                    continue
+                summary = generate_both_summaries(news.content)
+                if summaries_failed(summary):
+                    # Leave the row pending so the next run retries it
+                    continue
+                if fence is not None:
+                    fence()
+                if pg_service.update_news_summary(news.id, summary):
+                    summarized += 1
+            except LockLost:
+                raise
+            except Exception as e:
+                log.error("summarize_article_failed", id=news.id, error=e)
+        log.info("summarize_pending_news", pending=len(pending), stored=summarized,
+                 duration_ms=round((time.perf_counter() - start) * 1000, 2))
+    finally:
+        db.close()
+    return summarized
 
 def prewarm_homepage_cache():
     db = SessionLocal()
@@ -49,6 +80,6 @@ def prewarm_homepage_cache():
 
 if __name__ == "__main__":
     while True:
-        print("[CacheWorker] Prewarming homepage news cache...")
+        log.info("prewarm_homepage_cache")
         prewarm_homepage_cache()
         time.sleep(300)  # 5 minutes 
\ No newline at end of file
@@ -9,19 +9,23 @@ import os
 from typing import List, Dict
 from news.fetch_news import fetch_from_rss
 from news.summarize import summarize_news
+from news.batch_summarize import run_batch_summarization
+from app.fingerprint import content_fingerprint
 import logging
 from tqdm import tqdm
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def generate_training_pairs(num_pairs: int = 24000, output_path: str = "./data/article_summary_pairs.jsonl"):
+def generate_training_pairs(num_pairs: int = 24000, output_path: str = "./data/article_summary_pairs.jsonl",
+                            use_batch: bool = False):
     """
     Generate article-summary pairs from RSS feeds.
     
     Args:
         num_pairs: Target number of pairs to generate (~24K)
         output_path: Output file path for JSONL format
+        use_batch: Summarize through the provider Batch API instead of one request per article
     """
     logger.info(f"Generating {num_pairs} article-summary pairs...")
     
@@ -42,16 +46,32 @@ def generate_training_pairs(num_pairs: int = 24000, output_path: str = "./data/a
             logger.error(f"Error fetching articles: {e}")
             continue
     
+    # Keep articles with enough text, fingerprinted once
+    candidates = []
+    for article in fetched_articles[:num_pairs]:
+        article_text = article.get("content", article.get("summary", ""))
+        if not article_text or len(article_text) < 100:
+            continue
+        fingerprint = article.get("fingerprint") if article.get("content") else None
+        candidates.append((article, article_text, fingerprint or content_fingerprint(article_text)))
+    
+    batch_results = {}
+    if use_batch:
+        logger.info(f"Submitting {len(candidates)} articles to the batch summarization job...")
+        batch_results = run_batch_summarization(
+            [text for _, text, _ in candidates],
+            summary_type="detailed",
+            fingerprints=[fingerprint for _, _, fingerprint in candidates]
+        )
+    
     # Generate summaries for each article
     logger.info("Generating summaries...")
-    for article in tqdm(fetched_articles[:num_pairs], desc="Generating summaries"):
+    for article, article_text, fingerprint in tqdm(candidates, desc="Generating summaries"):
         try:
-            article_text = article.get("content", article.get("summary", ""))
-            if not article_text or len(article_text) < 100:
-                continue
-            
-            # Generate both brief and detailed summaries
-            result = summarize_news(article_text, summary_type="detailed")
+            if use_batch:
+                result = batch_results.get(fingerprint, {})
+            else:
+                result = summarize_news(article_text, summary_type="detailed", fingerprint=fingerprint)
             summary = result.get("summary", "")
             
             if summary and len(summary) > 50:
@@ -79,7 +99,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate training data for fine-tuning")
     parser.add_argument("--num-pairs", type=int, default=24000, help="Number of pairs to generate")
     parser.add_argument("--output", type=str, default="./data/article_summary_pairs.jsonl", help="Output file path")
+    parser.add_argument("--batch", action="store_true", help="Summarize via the Batch API (for large backfills)")
     args = parser.parse_args()
     
-    generate_training_pairs(args.num_pairs, args.output)
+    generate_training_pairs(args.num_pairs, args.output, use_batch=args.batch)
 
@@ -5,27 +5,25 @@ This file starts the original OneMinNews backend API. For the scalable news summ
     uvicorn backend.app.api:app --reload
 or see backend/start_api.sh
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
-import threading
-import time
 from routes.news import router as news_router
 from routes.pay import router as pay_router
 from app.db import SessionLocal
 from app.models import Vote
 from app.db import init_db
-from cache_worker import refresh_news_cache
-from apscheduler.schedulers.background import BackgroundScheduler
-from news.fetch_news import fetch_from_rss
-import logging
+from app.refresh_coordinator import get_refresh_coordinator
+from app.metrics import CONTENT_TYPE, render as render_metrics
+from app.structured_log import configure_logging
 
 init_db()
 
 app = FastAPI()
 
-scheduler = BackgroundScheduler()
-logging.basicConfig(level=logging.INFO)
+configure_logging()
+# Web processes schedule the news refresh unless a dedicated run_cron.py process does
+REFRESH_SCHEDULER = os.getenv("REFRESH_SCHEDULER", "true").lower() == "true"
 
 # CORS configuration, allow all domains to access (can specify frontend domain as needed)
 app.add_middleware(
@@ -42,48 +40,22 @@ app.include_router(pay_router)
 
 cached_news = []
 
-def fetch_and_cache_news():
-    global cached_news
-    logging.info('scheduled rss fetching...')
-    try:
-        # Actually execute news fetching and cache refresh
-        refresh_news_cache()
-        logging.info('scheduled rss fetching completed successfully')
-    except Exception as e:
-        logging.error(f'scheduled rss fetching failed: {e}')
-
-# Run it every 10 minutes
-scheduler.add_job(fetch_and_cache_news, 
-                  'interval',
-                  minutes=5)
-scheduler.start()
-
-# Background scheduled task
-def background_news_refresh():
-    """Background news refresh task"""
-    while True:
-        try:
-            print("🔄 Background task: Starting news refresh...")
-            refresh_news_cache()
-            print("✅ Background task: News refresh completed")
-        except Exception as e:
-            print(f"❌ Background task: News refresh failed - {e}")
-        
-        # Wait 15 minutes
-        time.sleep(15 * 60)
-
-# Start background task
+# Start the refresh coordinator: every worker runs one, the distributed lock lets a single
+# refresh run cluster-wide at a time
 @app.on_event("startup")
 async def startup_event():
-    """Start background task when application starts"""
-    print("🚀 Starting background news refresh task...")
-    thread = threading.Thread(target=background_news_refresh, daemon=True)
-    thread.start()
+    """Start the news refresh schedule when the application starts"""
+    if REFRESH_SCHEDULER:
+        get_refresh_coordinator().start()
 
 @app.get("/")
 def root():
     return {"message": "OneMinNews backend is running"}
 
+@app.get("/metrics")
+def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.get("/votes/")
 def get_votes():
     db = SessionLocal()
@@ -0,0 +1,171 @@
+"""
+batch_stub_server.py
+
+Minimal local stand-in for the OpenAI Files + Batches API, used to test batch_summarize
+without network access or spend. Batches complete immediately with a deterministic
+summary built from the first sentences of each article.
+
+Usage:
+    python -m news.batch_stub_server --port 8765
+    OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_BATCH_API_KEY=stub python generate_training_data.py --batch
+"""
+import email
+import email.policy
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+_NEWS_CONTENT_RE = re.compile(r"News content:\s*(.*?)\s*Please return only", re.S)
+
+
+def _stub_summary(prompt: str) -> str:
+    match = _NEWS_CONTENT_RE.search(prompt)
+    text = " ".join((match.group(1) if match else prompt).split())
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    return " ".join(sentences[:3]) or "Stub summary."
+
+
+class _StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    state: _StubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: Dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _file_object(self, file_id: str) -> Dict:
+        f = self.state.files[file_id]
+        return {"id": file_id, "object": "file", "bytes": len(f["content"]),
+                "created_at": f["created_at"], "filename": f["filename"],
+                "purpose": f["purpose"], "status": "processed"}
+
+    def do_POST(self):
+        if self.path.endswith("/files"):
+            return self._create_file()
+        if self.path.endswith("/batches"):
+            return self._create_batch()
+        self._send_json({"error": {"message": "not found"}}, 404)
+
+    def do_GET(self):
+        match = re.search(r"/files/([^/]+)/content$", self.path)
+        if match and match.group(1) in self.state.files:
+            content = self.state.files[match.group(1)]["content"]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        match = re.search(r"/batches/([^/]+)$", self.path)
+        if match and match.group(1) in self.state.batches:
+            return self._send_json(self.state.batches[match.group(1)])
+        self._send_json({"error": {"message": "not found"}}, 404)
+
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self.state.lock:
+            self.state.files[file_id] = {"content": content, "filename": filename,
+                                         "purpose": purpose, "created_at": int(time.time())}
+        return file_id
+
+    def _create_file(self):
+        # Parse the multipart upload with the stdlib email parser
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = email.message_from_bytes(header + self._read_body(), policy=email.policy.HTTP)
+        content, filename, purpose = b"", "batch.jsonl", "batch"
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                content = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+            elif name == "purpose":
+                purpose = part.get_content().strip()
+        self._send_json(self._file_object(self._store_file(content, filename, purpose)))
+
+    def _create_batch(self):
+        request = json.loads(self._read_body() or b"{}")
+        input_file = self.state.files.get(request.get("input_file_id"))
+        if input_file is None:
+            return self._send_json({"error": {"message": "input file not found"}}, 404)
+
+        output_lines = []
+        for line in input_file["content"].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            req = json.loads(line)
+            prompt = req["body"]["messages"][-1]["content"]
+            output_lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": req["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "id": f"chatcmpl-{uuid.uuid4().hex}",
+                        "object": "chat.completion",
+                        "model": req["body"].get("model"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": _stub_summary(prompt)}}],
+                    },
+                },
+                "error": None,
+            }))
+        output_file_id = self._store_file(("\n".join(output_lines) + "\n").encode("utf-8"),
+                                          "batch_output.jsonl", "batch_output")
+
+        now = int(time.time())
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch = {
+            "id": batch_id, "object": "batch", "endpoint": request.get("endpoint"),
+            "input_file_id": request["input_file_id"],
+            "completion_window": request.get("completion_window", "24h"),
+            "status": "completed", "output_file_id": output_file_id, "error_file_id": None,
+            "created_at": now, "completed_at": now,
+            "request_counts": {"total": len(output_lines), "completed": len(output_lines), "failed": 0},
+        }
+        with self.state.lock:
+            self.state.batches[batch_id] = batch
+        self._send_json(batch)
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub server in a daemon thread; the bound port is server.server_address[1]"""
+    handler = type("StubHandler", (_Handler,), {"state": _StubState()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Local stub for the OpenAI Batch API")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = start_stub_server(args.host, args.port)
+    print(f"Batch stub server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,182 @@
+"""
+batch_summarize.py
+
+Bulk summarization through the OpenAI Batch API for backfills and training data generation.
+Requests are written to JSONL files, submitted in large batches, polled until completion and
+merged back into the same file cache used by summarize_news. Batch jobs run against the
+provider's separate batch quota (optionally with their own key via OPENAI_BATCH_API_KEY),
+so backfills never compete with live /news/summary traffic for rate limit.
+
+For local testing point OPENAI_BATCH_BASE_URL at news/batch_stub_server.py.
+"""
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import openai
+
+from app.fingerprint import content_fingerprint
+from news.summarize import (
+    SUMMARY_MODEL,
+    SUMMARY_TEMPERATURE,
+    build_summary_prompt,
+    load_cached_summary,
+    store_summary,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_DIR = os.getenv("SUMMARY_BATCH_DIR", "/tmp/news_summary_batches")
+# Provider limit is 50,000 requests per batch file
+BATCH_MAX_REQUESTS = int(os.getenv("SUMMARY_BATCH_MAX_REQUESTS", "50000"))
+BATCH_POLL_INTERVAL = float(os.getenv("SUMMARY_BATCH_POLL_INTERVAL", "30"))
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def get_batch_client() -> openai.OpenAI:
+    """OpenAI client for batch jobs, kept separate from the live summary client"""
+    return openai.OpenAI(
+        api_key=os.getenv("OPENAI_BATCH_API_KEY") or os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BATCH_BASE_URL") or None,
+    )
+
+
+def _custom_id(fingerprint: str, summary_type: str) -> str:
+    return f"{fingerprint}_{summary_type}"
+
+
+def _parse_custom_id(custom_id: str) -> Tuple[str, str]:
+    fingerprint, summary_type = custom_id.rsplit("_", 1)
+    return fingerprint, summary_type
+
+
+def write_batch_requests(texts: Iterable[Tuple[str, str]], summary_type: str, path: str) -> List[str]:
+    """
+    Write one chat completion request per (fingerprint, text) to a JSONL batch file.
+    Returns the custom ids written.
+    """
+    custom_ids = []
+    with open(path, "w", encoding="utf-8") as f:
+        for fingerprint, text in texts:
+            prompt, max_tokens = build_summary_prompt(text, summary_type)
+            custom_id = _custom_id(fingerprint, summary_type)
+            f.write(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": SUMMARY_MODEL,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": max_tokens,
+                    "temperature": SUMMARY_TEMPERATURE,
+                },
+            }, ensure_ascii=False) + "\n")
+            custom_ids.append(custom_id)
+    return custom_ids
+
+
+def submit_batch(client: openai.OpenAI, path: str) -> str:
+    """Upload a JSONL request file and create a batch job, returns the batch id"""
+    with open(path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    logger.info(f"Submitted batch {batch.id} from {path}")
+    return batch.id
+
+
+def wait_for_batch(client: openai.OpenAI, batch_id: str, poll_interval: float = BATCH_POLL_INTERVAL,
+                   timeout: Optional[float] = None):
+    """Poll a batch until it reaches a terminal status"""
+    deadline = time.time() + timeout if timeout else None
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            logger.info(f"Batch {batch_id} finished with status {batch.status}")
+            return batch
+        if deadline and time.time() > deadline:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def merge_batch_results(client: openai.OpenAI, batch) -> Dict[str, Dict]:
+    """
+    Download a finished batch's output file and store each summary in the summary cache.
+    Returns {custom_id: result} for the successful requests.
+    """
+    merged = {}
+    if not batch.output_file_id:
+        logger.warning(f"Batch {batch.id} has no output file (status {batch.status})")
+        return merged
+
+    content = client.files.content(batch.output_file_id).text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+            continue
+        message = response["body"]["choices"][0]["message"].get("content") or ""
+        if not message.strip():
+            continue
+        fingerprint, summary_type = _parse_custom_id(record["custom_id"])
+        merged[record["custom_id"]] = store_summary(fingerprint, summary_type, message.strip())
+    return merged
+
+
+def run_batch_summarization(texts: List[str], summary_type: str = "detailed",
+                            fingerprints: Optional[List[Optional[str]]] = None,
+                            client: Optional[openai.OpenAI] = None,
+                            poll_interval: float = BATCH_POLL_INTERVAL,
+                            timeout: Optional[float] = None) -> Dict[str, Dict]:
+    """
+    Summarize many articles through the Batch API.
+    Already-cached articles are skipped; the rest are split into files of at most
+    BATCH_MAX_REQUESTS requests, submitted together and merged as they complete.
+
+    Returns:
+        {fingerprint: {"summary", "structure_score"}} for every article that has a summary
+    """
+    client = client or get_batch_client()
+    fingerprints = fingerprints or [None] * len(texts)
+    os.makedirs(BATCH_DIR, exist_ok=True)
+
+    results = {}
+    pending = {}
+    for text, fingerprint in zip(texts, fingerprints):
+        fingerprint = fingerprint or content_fingerprint(text)
+        cached = load_cached_summary(fingerprint, summary_type)
+        if cached is not None:
+            results[fingerprint] = cached
+        else:
+            pending[fingerprint] = text  # also dedupes identical articles
+
+    logger.info(f"Batch summarization: {len(results)} cached, {len(pending)} to submit")
+    if not pending:
+        return results
+
+    items = list(pending.items())
+    batch_ids = []
+    for start in range(0, len(items), BATCH_MAX_REQUESTS):
+        chunk = items[start:start + BATCH_MAX_REQUESTS]
+        path = os.path.join(BATCH_DIR, f"{summary_type}_{int(time.time())}_{start}.jsonl")
+        write_batch_requests(chunk, summary_type, path)
+        batch_ids.append(submit_batch(client, path))
+
+    for batch_id in batch_ids:
+        batch = wait_for_batch(client, batch_id, poll_interval, timeout)
+        for custom_id, result in merge_batch_results(client, batch).items():
+            results[_parse_custom_id(custom_id)[0]] = result
+
+    logger.info(f"Batch summarization finished: {len(results)} summaries available")
+    return results
@@ -18,7 +18,7 @@
 import feedparser
 # List and Dict helps specify List and Dict expected
 #  data types 
-from typing import List, Dict
+from typing import List, Dict, Optional
 # datetime is for current time and timedelta is
 #  for time differences
 from datetime import datetime, timedelta
@@ -30,7 +30,10 @@ from dateutil import tz
 import logging
 from bs4 import BeautifulSoup
 import requests
-from news_readers import nyc
+from urllib.parse import urlparse
+from news_readers import bbc, nyc
+from app.fingerprint import content_fingerprint
+from app.metrics import RSS_FETCH_SECONDS, SCRAPE_SECONDS
 
 # create a logger
 # write .getLogger(__name__) to let logs show their origins
@@ -75,6 +78,54 @@ RSS_FEEDS = {
     "Al Jazeera": "https://www.aljazeera.com/xml/rss/all.xml",
 }
 
+def entry_published_utc(entry) -> Optional[datetime]:
+    """UTC publish time of a feed entry, None when it has no parseable date"""
+    raw_date = (getattr(entry, "published", "") or
+                getattr(entry, "updated", ""))
+    try:
+        published_dt = dateparser.parse(raw_date)
+    except Exception:
+        return None
+    if published_dt.tzinfo:
+        # convert to utc if there is tz
+        return published_dt.astimezone(tz.tzutc())
+    # assume to be utc if no tz info
+    return published_dt.replace(tzinfo=tz.tzutc())
+
+
+def fetch_feed(source_name: str, feed_url: str, since: Optional[datetime] = None) -> List[Dict]:
+    """
+    Entries of one feed published after since (default 24 hrs ago), without page content.
+    The ingest pipeline scrapes each entry in its own stage.
+    """
+    since = since or dateparser.parse("24 hrs ago")
+    with RSS_FETCH_SECONDS.time(source_name):
+        feed = feedparser.parse(feed_url)
+    items = []
+    for entry in feed.entries:
+        published_dt_utc = entry_published_utc(entry)
+        if published_dt_utc is None or published_dt_utc.replace(tzinfo=None) < since:
+            continue
+        items.append({
+            "title": entry.title,
+            "summary": getattr(entry, "summary", ""),  # RSS description, content fallback
+            "link": entry.link,
+            "date": published_dt_utc.isoformat(),
+            "source": source_name,
+        })
+    return items
+
+
+def scrape_content(news_url: str, fallback: str = "") -> str:
+    """Full article text from the site reader for news_url, fallback when there is none"""
+    readers = {"https://www.bbc.com/news/articles/": bbc, "https://www.nytimes.com/": nyc}
+    for prefix, reader in readers.items():
+        if news_url.startswith(prefix):
+            with SCRAPE_SECONDS.time(urlparse(news_url).netloc):
+                return reader.fetch_news(news_url) or fallback
+    return fallback
+
+
 # define fetch_from_rss() which returns a list of news
 def fetch_from_rss() -> List[Dict]:
     """
@@ -92,25 +143,14 @@ def fetch_from_rss() -> List[Dict]:
     for source_name, feed_url in RSS_FEEDS.items():
         try:
             # parse feed URL
-            feed = feedparser.parse(feed_url)
+            with RSS_FETCH_SECONDS.time(source_name):
+                feed = feedparser.parse(feed_url)
             for entry in feed.entries:
-                # parse raw date
-                raw_date = (getattr(entry, "published", "") or 
-                            getattr(entry, "updated", ""))
-                try:
-                    # define pubslished_at through parsing raw_date
-                    published_dt = dateparser.parse(raw_date)
-                except Exception:
+                # parse raw date, converted to utc
+                published_dt_utc = entry_published_utc(entry)
+                if published_dt_utc is None:
                     # skip news that cannot be parsed
-                    continue  
-
-                # convert date to utc and make comparisons
-                if published_dt.tzinfo:
-                    # convert to utc if there is tz
-                    published_dt_utc = published_dt.astimezone(tz.tzutc())
-                else:
-                    # assume to be utc if no tz info
-                    published_dt_utc = published_dt.replace(tzinfo=tz.tzutc())
+                    continue
                 
                 # keep only news within 24 hrs
                 if published_dt_utc.replace(tzinfo=None) < twenty_four_hours_ago:
@@ -128,7 +168,8 @@ def fetch_from_rss() -> List[Dict]:
                         content += text
                 # news is from nyc
                 elif news_url.startswith('https://www.nytimes.com/'):
-                    content = nyc.fetch_news(news_url)  
+                    with SCRAPE_SECONDS.time(urlparse(news_url).netloc):
+                        content = nyc.fetch_news(news_url)
             
                 # format date to ISO
                 formatted_date = published_dt_utc.isoformat()
@@ -136,6 +177,7 @@ def fetch_from_rss() -> List[Dict]:
                 items.append({
                     "title": entry.title,
                     "content": content,  # Full content for AI summary
+                    "fingerprint": content_fingerprint(content),  # Carried through summarize/score caches
                     "summary": summary,  # Brief summary for display
                     "link": entry.link,
                     "date": formatted_date,  # Use formatted ISO date string
@@ -1,27 +1,47 @@
-import hashlib
 import os
 import json
 import openai
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from app.fingerprint import content_fingerprint
 
 CACHE_DIR = "/tmp/news_summary_cache"
 os.makedirs(CACHE_DIR, exist_ok=True)
 
-def summarize_news(text: str, summary_type: str = "brief") -> Dict[str, Any]:
-    """
-    Generate news summary, supports brief and detailed types
-    Returns a dictionary containing summary and structure score
-    """
-    # Use content and type for hash
-    cache_key = f"{text}_{summary_type}"
-    key = hashlib.md5(cache_key.encode("utf-8")).hexdigest()
-    cache_path = os.path.join(CACHE_DIR, key + ".json")
-    
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_TEMPERATURE = 0.3
+SUMMARY_FAILED = "Summary generation failed"  # Returned in place of a summary, never cached
+
+def summaries_failed(summaries: Dict[str, Any]) -> bool:
+    """Whether either summary of a generate_both_summaries result failed"""
+    return SUMMARY_FAILED in (summaries.get("brief"), summaries.get("detailed"))
+
+def summary_cache_path(fingerprint: str, summary_type: str) -> str:
+    """Cache file for one article fingerprint and summary type"""
+    return os.path.join(CACHE_DIR, f"{fingerprint}_{summary_type}.json")
+
+def load_cached_summary(fingerprint: str, summary_type: str) -> Optional[Dict[str, Any]]:
+    """Return the cached summary result, or None on a cache miss"""
+    cache_path = summary_cache_path(fingerprint, summary_type)
     if os.path.exists(cache_path):
         with open(cache_path, "r") as f:
             return json.load(f)
+    return None
 
-    # Set different prompts based on type
+def store_summary(fingerprint: str, summary_type: str, summary: str) -> Dict[str, Any]:
+    """Score a generated summary and write it to the summary cache"""
+    result = {
+        "summary": summary,
+        "structure_score": calculate_structure_score(summary, summary_type)
+    }
+    with open(summary_cache_path(fingerprint, summary_type), "w") as f:
+        json.dump(result, f)
+    return result
+
+def build_summary_prompt(text: str, summary_type: str = "brief") -> Tuple[str, int]:
+    """
+    Build the chat prompt and max_tokens for a summary type
+    Shared by the live path and the batch backfill job
+    """
     if summary_type == "brief":
         prompt = f"""
         Please generate a concise summary for the following news article in English. Requirements:
@@ -52,38 +72,45 @@ def summarize_news(text: str, summary_type: str = "brief") -> Dict[str, Any]:
         Please return only the summary content in English, no other explanations.
         """
         max_tokens = 300
+    return prompt, max_tokens
+
+def summarize_news(text: str, summary_type: str = "brief", fingerprint: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate news summary, supports brief and detailed types
+    Returns a dictionary containing summary and structure score
+    Pass the article's precomputed fingerprint to skip re-hashing the text
+    """
+    # Use normalized content fingerprint and type for the cache file name
+    fingerprint = fingerprint or content_fingerprint(text)
+    cached = load_cached_summary(fingerprint, summary_type)
+    if cached is not None:
+        return cached
+
+    prompt, max_tokens = build_summary_prompt(text, summary_type)
 
     try:
         # Call OpenAI API
         client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=SUMMARY_MODEL,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=max_tokens,
-            temperature=0.3
+            temperature=SUMMARY_TEMPERATURE
         )
         
-        summary = response.choices[0].message.content.strip() if response.choices[0].message.content else "Summary generation failed"
-        
-        # Calculate structure score (simplified version)
-        structure_score = calculate_structure_score(summary, summary_type)
-        
-        result = {
-            "summary": summary,
-            "structure_score": structure_score
-        }
-        
-        # Cache result
-        with open(cache_path, "w") as f:
-            json.dump(result, f)
+        content = response.choices[0].message.content
+        if not content or not content.strip():
+            # Not cached, so the next call retries
+            return {"summary": SUMMARY_FAILED, "structure_score": 3.0}
         
-        return result
+        # Score and cache result
+        return store_summary(fingerprint, summary_type, content.strip())
         
     except Exception as e:
         print(f"Error generating summary: {e}")
         # Return default result
         return {
-            "summary": "Summary generation failed",
+            "summary": SUMMARY_FAILED,
             "structure_score": 3.0
         }
 
@@ -120,12 +147,13 @@ def calculate_structure_score(summary: str, summary_type: str) -> float:
     
     return min(5.0, max(1.0, score))
 
-def generate_both_summaries(text: str) -> Dict[str, Any]:
+def generate_both_summaries(text: str, fingerprint: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate both brief and detailed summaries
     """
-    brief_result = summarize_news(text, "brief")
-    detailed_result = summarize_news(text, "detailed")
+    fingerprint = fingerprint or content_fingerprint(text)
+    brief_result = summarize_news(text, "brief", fingerprint)
+    detailed_result = summarize_news(text, "detailed", fingerprint)
     
     return {
         "brief": brief_result["summary"],
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
-from app.model_inference import summarize_article, batch_summarize, importance_score
+from app.model_inference import summarize_article, batch_summarize, importance_score, batch_importance_score
 
 router = APIRouter()
 
@@ -33,7 +33,7 @@ def summarize(req: ArticleRequest):
 def batch(req: BatchRequest):
     try:
         summaries = batch_summarize(req.articles)
-        scores = [importance_score(a, s) for a, s in zip(req.articles, summaries)]
+        scores = batch_importance_score(req.articles, summaries)
         return {"summaries": summaries, "scores": scores}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -49,17 +49,19 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import time
 import random
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime, timedelta
 from app.models import SavedArticle, User, News, Vote
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import UUID
 from sqlalchemy import func, desc
+from app.structured_log import get_logger
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 router = APIRouter()
+log = get_logger(__name__)
 
 # Rate limit configuration
 RATE_LIMIT_DELAY = 2.0  # Base delay time (seconds)
@@ -77,11 +79,11 @@ def handle_openai_rate_limit(func):
                     if attempt < MAX_RETRIES - 1:
                         # Calculate delay time: base delay + random jitter
                         delay = RATE_LIMIT_DELAY + random.uniform(0, 1)
-                        print(f"⚠️ [RATE_LIMIT] Attempt {attempt + 1} failed, retrying in {delay:.2f}s...")
+                        log.warning("openai_rate_limited", attempt=attempt + 1, retry_in_s=round(delay, 2))
                         time.sleep(delay)
                         continue
                     else:
-                        print(f"❌ [RATE_LIMIT] Max retries reached, returning default value")
+                        log.error("openai_rate_limit_exhausted", attempts=MAX_RETRIES)
                         return None
                 else:
                     # Non-rate limit error, raise directly
@@ -119,7 +121,7 @@ def get_news(
         return {"news": news_items}
         
     except Exception as e:
-        print(f"Error fetching news: {e}")
+        log.exception("get_news_route_failed", offset=offset, limit=limit, source=source)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/news/vote")
@@ -156,6 +158,31 @@ def news_summary(data: dict = Body(...)):
         result = summarize_news(content, summary_type)
         return {"summary": result["summary"], "structure_score": result["structure_score"]}
 
+@router.get("/news/summary/{article_id}")
+def get_stored_summary(
+    article_id: str,
+    type: Literal["brief", "detailed", "both"] = Query("detailed"),
+    pg_service: PostgresService = Depends(get_pg_service)
+):
+    """Get the AI summary generated at ingest time (no LLM call on this path)"""
+    try:
+        news_id = UUID(article_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid article id")
+    
+    result = pg_service.get_news_summary(news_id)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    
+    summary = result["summary"]
+    if not summary:
+        # Not summarized yet; clients fall back to POST /news/summary
+        raise HTTPException(status_code=404, detail="Summary not ready")
+    
+    if type == "both":
+        return summary
+    return {"summary": summary.get(type), "structure_score": summary.get("structure_score")}
+
 @router.get("/news/article")
 def get_article_by_title(
     title: str = Query(...),
@@ -241,7 +268,7 @@ async def save_article(request: Request, pg_service: PostgresService = Depends(g
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error saving article: {e}")
+        log.exception("save_article_route_failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/api/save")
@@ -261,7 +288,7 @@ async def unsave_article(request: Request, pg_service: PostgresService = Depends
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error unsaving article: {e}")
+        log.exception("unsave_article_route_failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/api/saved")
@@ -275,7 +302,7 @@ async def get_saved_articles(
         return {"saved_articles": saved_articles}
         
     except Exception as e:
-        print(f"Error getting saved articles: {e}")
+        log.exception("get_saved_articles_route_failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/api/saved/check")
@@ -290,7 +317,7 @@ async def check_article_saved(
         return {"is_saved": is_saved}
         
     except Exception as e:
-        print(f"Error checking saved article: {e}")
+        log.exception("check_article_saved_route_failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/api/auth/save-user")
@@ -311,7 +338,7 @@ async def save_user(request: Request, pg_service: PostgresService = Depends(get_
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error saving user: {e}")
+        log.exception("save_user_route_failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/news/clean-duplicates")
@@ -345,7 +372,7 @@ def clean_duplicate_news(pg_service: PostgresService = Depends(get_pg_service)):
         return {"message": f"Cleaned {deleted_count} duplicate news articles"}
         
     except Exception as e:
-        print(f"Error cleaning duplicates: {e}")
+        log.exception("clean_duplicate_news_failed")
         raise HTTPException(status_code=500, detail=f"Failed to clean duplicates: {str(e)}")
 
 @router.post("/news/clean-duplicates-direct")
@@ -357,7 +384,7 @@ def clean_duplicate_news_direct(pg_service: PostgresService = Depends(get_pg_ser
         return {"message": f"Cleaned {deleted_count} duplicate news articles"}
         
     except Exception as e:
-        print(f"Error cleaning duplicates directly: {e}")
+        log.exception("clean_duplicate_news_direct_failed")
         raise HTTPException(status_code=500, detail=f"Failed to clean duplicates: {str(e)}")
 
 @router.post("/news/clean-old")
@@ -395,5 +422,5 @@ def clean_old_news(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error cleaning old news: {e}")
+        log.exception("clean_old_news_failed")
         raise HTTPException(status_code=500, detail=f"Failed to clean old news: {str(e)}")
\ No newline at end of file
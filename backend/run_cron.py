@@ -1,13 +1,11 @@
-import schedule
-import time
-from cache_worker import refresh_news_cache
+"""
+Standalone news refresh scheduler. Runs the same lock-protected coordinator as the web
+processes (app/refresh_coordinator.py), so it can run next to them without overlapping
+refreshes; set REFRESH_SCHEDULER=false on the web processes to leave scheduling to it.
+"""
+from app.refresh_coordinator import get_refresh_coordinator
+from app.structured_log import configure_logging
 
-def job():
-    print("Refreshing news cache...")
-    refresh_news_cache()
-
-schedule.every(15).minutes.do(job)
-
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+if __name__ == "__main__":
+    configure_logging()
+    get_refresh_coordinator().run_forever(initial_delay=0)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test LoRA adapter registration, switching and merge handling
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.adapters import AdapterManager, parse_adapter_spec
+
+
+class FakePeftModel:
+    """Records adapter calls the way a PeftModel would receive them"""
+
+    def __init__(self):
+        self.calls = []
+        self.active = None
+
+    def set_adapter(self, name):
+        self.calls.append(("set", name))
+        self.active = name
+
+    def merge_adapter(self):
+        self.calls.append(("merge", self.active))
+
+    def unmerge_adapter(self):
+        self.calls.append(("unmerge", self.active))
+
+
+def _manager(merge=False):
+    manager = AdapterManager({"news": "/adapters/news", "finance": "/adapters/finance"}, merge=merge)
+    model = FakePeftModel()
+    manager.bind(model)
+    return manager, model
+
+
+def test_parse_adapter_spec():
+    spec = parse_adapter_spec("news=/models/news_lora, /models/finance_lora/")
+    assert list(spec.items()) == [("news", "/models/news_lora"), ("finance_lora", "/models/finance_lora/")]
+    assert parse_adapter_spec("") == {}
+    with pytest.raises(ValueError):
+        parse_adapter_spec("news=/a,news=/b")
+
+
+def test_default_and_model_version():
+    manager, model = _manager()
+    assert manager.default == "news"
+    assert model.active == "news"
+    assert manager.model_version("finance") == "7b-instruction-tuned+finance"
+    assert AdapterManager({}).model_version(None) == "7b-instruction-tuned"
+    with pytest.raises(ValueError):
+        AdapterManager({"news": "/a"}, default="missing")
+
+
+def test_use_switches_and_nested_calls_inherit():
+    manager, model = _manager()
+    with manager.use("finance") as adapter:
+        assert adapter == "finance" and model.active == "finance"
+        # Nested calls without a name run on the held adapter
+        assert manager.resolve() == "finance"
+        with manager.use() as inner:
+            assert inner == "finance"
+        with pytest.raises(RuntimeError):
+            with manager.use("news"):
+                pass
+    assert manager.resolve() == "news"
+    with pytest.raises(ValueError):
+        with manager.use("unknown"):
+            pass
+    assert manager.stats()["switches"] == 1
+
+
+def test_merged_default_is_unmerged_only_for_other_adapters():
+    manager, model = _manager(merge=True)
+    assert model.calls == [("set", "news"), ("merge", "news")]
+    with manager.use():
+        pass
+    assert len(model.calls) == 2  # default requests need no switch
+    with manager.use("finance"):
+        pass
+    with manager.use("news"):
+        pass
+    assert model.calls[2:] == [("unmerge", "news"), ("set", "finance"), ("set", "news"), ("merge", "news")]
+
+
+def test_switch_waits_for_running_jobs():
+    manager, model = _manager()
+    events = []
+    entered = threading.Event()
+
+    def default_job():
+        with manager.use():
+            entered.set()
+            time.sleep(0.1)
+            events.append(("news done", model.active))
+
+    def finance_job():
+        entered.wait()
+        with manager.use("finance"):
+            events.append(("finance start", model.active))
+
+    threads = [threading.Thread(target=default_job), threading.Thread(target=finance_job)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    # The default job finished on its own adapter before the switch happened
+    assert events == [("news done", "news"), ("finance start", "finance")]
+
+
+def test_first_jobs_load_and_bind_before_taking_the_adapter():
+    manager = AdapterManager({"news": "/adapters/news", "finance": "/adapters/finance"})
+    model = FakePeftModel()
+    loads = []
+    load_lock = threading.Lock()
+
+    def loader():
+        with load_lock:  # ModelLoader: concurrent first callers share one load
+            if not loads:
+                time.sleep(0.05)
+                manager.bind(model)
+            loads.append(1)
+
+    manager.set_loader(loader)
+    seen = []
+
+    def job(name):
+        with manager.use(name) as adapter:
+            seen.append((adapter, model.active))
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=job, args=(name,)) for name in ("news", "finance", "news", "finance")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    # Every job ran with its own adapter active, none on an unbound model
+    assert sorted(seen) == [("finance", "finance")] * 2 + [("news", "news")] * 2
+    assert manager.stats()["running"] == 0
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test the batch summarization job end-to-end against the local Batch API stub
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+
+import news.summarize as summarize
+import news.batch_summarize as batch_summarize
+from news.batch_stub_server import start_stub_server
+from app.fingerprint import content_fingerprint
+
+ARTICLES = [
+    "The central bank raised interest rates by a quarter point on Wednesday. Officials cited persistent inflation. Markets had expected the move.",
+    "A magnitude 6.1 earthquake struck off the coast early on Friday. No tsunami warning was issued. Local officials reported minor damage.",
+]
+
+
+def test_batch_job_merges_into_summary_cache():
+    server = start_stub_server()
+    original = (summarize.CACHE_DIR, batch_summarize.BATCH_DIR, batch_summarize.submit_batch)
+    with tempfile.TemporaryDirectory() as tmp:
+        summarize.CACHE_DIR = os.path.join(tmp, "cache")
+        batch_summarize.BATCH_DIR = os.path.join(tmp, "batches")
+        os.makedirs(summarize.CACHE_DIR)
+        client = openai.OpenAI(api_key="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+        try:
+            # Duplicate article is only submitted once
+            results = batch_summarize.run_batch_summarization(
+                ARTICLES + ARTICLES[:1], summary_type="brief", client=client, poll_interval=0.01
+            )
+            assert set(results) == {content_fingerprint(a) for a in ARTICLES}
+
+            for article in ARTICLES:
+                cached = summarize.summarize_news(article, "brief")
+                assert cached["summary"] == results[content_fingerprint(article)]["summary"]
+                assert 1.0 <= cached["structure_score"] <= 5.0
+
+            # Second run is served entirely from the cache, no batch submitted
+            batch_summarize.submit_batch = None
+            assert batch_summarize.run_batch_summarization(ARTICLES, summary_type="brief", client=client) == results
+        finally:
+            summarize.CACHE_DIR, batch_summarize.BATCH_DIR, batch_summarize.submit_batch = original
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_batch_job_merges_into_summary_cache()
+    print("✅ Batch summarization tests passed")
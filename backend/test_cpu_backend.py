@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test the CPU inference backends: int8 dynamic quantization and logit parity
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+torch = pytest.importorskip("torch")
+
+from app.cpu_backend import load_cpu_model, logit_parity, quantize_model
+
+TINY_CAUSAL_MODEL = os.getenv("TINY_CAUSAL_MODEL", "sshleifer/tiny-gpt2")
+
+
+def test_quantize_model_replaces_linear_layers():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 8)).eval()
+    quantized = quantize_model(model)
+
+    assert not any(type(m) is torch.nn.Linear for m in quantized.modules())
+    x = torch.randn(4, 64)
+    # int8 weights stay close to the fp32 reference
+    assert torch.allclose(model(x), quantized(x), atol=0.05)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_cpu_model(TINY_CAUSAL_MODEL, "fp16")
+
+
+def test_int8_backend_matches_fp32_reference():
+    transformers = pytest.importorskip("transformers")
+    tokenizer = transformers.AutoTokenizer.from_pretrained(TINY_CAUSAL_MODEL)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    reference = load_cpu_model(TINY_CAUSAL_MODEL, "fp32")
+    quantized = load_cpu_model(TINY_CAUSAL_MODEL, "int8")
+
+    parity = logit_parity(tokenizer, reference, quantized, ["Markets rallied on Monday.", "Storm hits the coast."])
+    assert parity["top1_agreement"] >= 0.5
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test decoding profile selection and the deadline-aware downgrade
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.decoding import DECODING_PROFILES, decoding_stats, profile_kwargs, resolve_profile
+
+
+def test_profiles_trade_beams_for_speed():
+    assert DECODING_PROFILES["fast"]["num_beams"] == 1
+    assert DECODING_PROFILES["quality"]["num_beams"] == 4
+    # Callers may mutate the kwargs they get
+    kwargs = profile_kwargs("quality")
+    kwargs.pop("early_stopping")
+    assert "early_stopping" in DECODING_PROFILES["quality"]
+
+
+def test_requested_profile_is_kept_within_budget():
+    assert resolve_profile("balanced", queue_wait_ms=50, budget_ms=100) == "balanced"
+    assert resolve_profile("quality", queue_wait_ms=500, budget_ms=0) == "quality"
+
+
+def test_downgrade_when_queue_wait_exceeds_budget():
+    before = decoding_stats()["downgrades"]
+    assert resolve_profile("quality", queue_wait_ms=150, budget_ms=100) == "balanced"
+    assert resolve_profile("quality", queue_wait_ms=250, budget_ms=100) == "fast"
+    assert resolve_profile("fast", queue_wait_ms=1000, budget_ms=100) == "fast"
+    # Sampling is already greedy-cost and is never downgraded
+    assert resolve_profile("sampled", queue_wait_ms=1000, budget_ms=100) == "sampled"
+    assert decoding_stats()["downgrades"] == before + 2
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_profile("turbo")
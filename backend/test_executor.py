@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the bounded inference executor: backpressure and a free event loop
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.executor import InferenceBusy, InferenceExecutor
+
+
+def _wait_until_idle(executor, timeout=5.0):
+    """Futures resolve before the done callback releases their slot; wait for the release"""
+    deadline = time.monotonic() + timeout
+    while executor.stats()["inflight"] and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert executor.stats()["inflight"] == 0
+
+
+def test_rejects_when_queue_is_full():
+    release = threading.Event()
+    executor = InferenceExecutor(max_workers=1, max_queue=1, retry_after=7)
+    running = executor.submit(release.wait)
+    queued = executor.submit(release.wait)
+
+    with pytest.raises(InferenceBusy) as exc_info:
+        executor.submit(release.wait)
+    assert exc_info.value.retry_after == 7
+    assert executor.stats()["rejected"] == 1
+
+    with pytest.raises(InferenceBusy):
+        executor.check_capacity()
+    release.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+    _wait_until_idle(executor)
+    executor.check_capacity(2)
+    # Capacity is released once jobs finish
+    assert executor.submit(lambda: "ok").result(timeout=5) == "ok"
+    executor.shutdown()
+    assert executor.stats()["inflight"] == 0
+
+
+def test_event_loop_stays_responsive_during_blocking_work():
+    executor = InferenceExecutor(max_workers=2, max_queue=4)
+
+    async def main():
+        work = asyncio.gather(*(executor.run(time.sleep, 0.2) for _ in range(4)))
+        # Ticks of the loop while the pool is busy measure how long it is blocked
+        gaps = []
+        last = time.perf_counter()
+        while not work.done():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+        await work
+        return gaps
+
+    gaps = asyncio.run(main())
+    executor.shutdown()
+    assert max(gaps) < 0.1
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test content fingerprint normalization and cache keys
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.fingerprint import normalize_content, content_fingerprint, cache_key
+
+
+def test_normalization_ignores_trivial_differences():
+    base = "Markets rallied on Monday.  Investors cheered the news."
+    variants = [
+        "  Markets rallied on Monday.\n\nInvestors cheered the news.  ",
+        "<p>Markets rallied on Monday.</p> <p>Investors cheered the news.</p>",
+        "Markets rallied on Monday.&nbsp;Investors cheered the news.",
+    ]
+    for variant in variants:
+        assert normalize_content(variant) == normalize_content(base)
+        assert content_fingerprint(variant) == content_fingerprint(base)
+
+
+def test_different_content_different_fingerprint():
+    assert content_fingerprint("Markets rallied.") != content_fingerprint("Markets fell.")
+
+
+def test_cache_key_reuses_fingerprint():
+    text = "Parliament passed the budget bill late on Tuesday."
+    fingerprint = content_fingerprint(text)
+    assert cache_key("summary", text) == f"summary:{fingerprint}"
+    assert cache_key("summary", fingerprint=fingerprint) == cache_key("summary", text)
+    assert cache_key("summary", text) != cache_key("score", text)
+
+
+if __name__ == "__main__":
+    test_normalization_ignores_trivial_differences()
+    test_different_content_different_fingerprint()
+    test_cache_key_reuses_fingerprint()
+    print("✅ Fingerprint tests passed")
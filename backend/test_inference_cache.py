@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test the two-tier inference cache (byte-bounded LRU + Redis, negative caching, metrics)
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.inference_cache import InferenceCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis client"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value and value[1] > time.time():
+            return value[0].encode("utf-8")
+        return None
+
+    def setex(self, key, ttl, value):
+        self.data[key] = (value, time.time() + ttl)
+
+    def pttl(self, key):
+        value = self.data.get(key)
+        if not value or value[1] <= time.time():
+            return -2
+        return int((value[1] - time.time()) * 1000)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_lru_is_bounded_in_bytes():
+    cache = InferenceCache("summary", max_bytes=1000, ttl=60)
+    for i in range(50):
+        cache.set(f"summary:{i}", "x" * 100)
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evictions"] > 0
+    # Most recent entry survives, oldest was evicted
+    assert cache.get("summary:49") == "x" * 100
+    assert cache.get("summary:0") is None
+
+
+def test_negative_entries_expire_quickly():
+    cache = InferenceCache("summary", max_bytes=10000, ttl=60, negative_ttl=0.05)
+    cache.set("summary:bad", "Summary generation failed.", negative=True)
+    assert cache.get("summary:bad") == "Summary generation failed."
+    time.sleep(0.1)
+    assert cache.get("summary:bad") is None
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    worker_a = InferenceCache("score", max_bytes=10000, ttl=60, redis_client=redis)
+    worker_b = InferenceCache("score", max_bytes=10000, ttl=60, redis_client=redis)
+    worker_a.set("score:abc", 0.75)
+    assert worker_b.get("score:abc") == 0.75
+    assert worker_b.get("score:abc") == 0.75  # now served from worker_b's LRU
+    stats = worker_b.stats()
+    assert stats["redis_hits"] == 1 and stats["hits"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_redis_hit_keeps_the_remaining_ttl():
+    redis = FakeRedis()
+    InferenceCache("score", max_bytes=10000, ttl=0.1, redis_client=redis).set("score:abc", 0.75)
+    time.sleep(0.06)
+    # A fresh worker copies the entry with the ~0.04s left, not another full ttl
+    worker = InferenceCache("score", max_bytes=10000, ttl=0.1, redis_client=redis)
+    assert worker.get("score:abc") == 0.75
+    time.sleep(0.06)
+    assert worker.get("score:abc") is None
+
+
+def test_corrupt_redis_entry_is_a_miss_and_deleted():
+    redis = FakeRedis()
+    redis.setex("inference:summary:summary:bad", 60, "{not json")
+    cache = InferenceCache("summary", max_bytes=10000, ttl=60, redis_client=redis)
+    assert cache.get("summary:bad") is None
+    assert "inference:summary:summary:bad" not in redis.data
+    assert cache.stats()["misses"] == 1
+
+
+def test_hit_rate():
+    cache = InferenceCache("summary", max_bytes=10000, ttl=60)
+    cache.set("summary:a", "A")
+    cache.get("summary:a")
+    cache.get("summary:missing")
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+if __name__ == "__main__":
+    test_lru_is_bounded_in_bytes()
+    test_negative_entries_expire_quickly()
+    test_redis_tier_is_shared_between_workers()
+    test_redis_hit_keeps_the_remaining_ttl()
+    test_corrupt_redis_entry_is_a_miss_and_deleted()
+    test_hit_rate()
+    print("✅ Inference cache tests passed")
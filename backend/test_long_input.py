@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted chunking and the per-fingerprint token cache
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.long_input import article_head, article_token_ids, chunk_token_ids, max_input_tokens
+
+
+class WordTokenizer:
+    """One token per word, enough to exercise the budgeting logic without transformers"""
+
+    name_or_path = "words"
+    model_max_length = int(1e30)
+
+    def __init__(self):
+        self.encode_calls = 0
+
+    def encode(self, text, add_special_tokens=True):
+        self.encode_calls += 1
+        return [len(word) for word in text.split()]
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join("x" * n for n in ids)
+
+
+def test_short_input_is_a_single_chunk():
+    assert chunk_token_ids(list(range(10)), chunk_tokens=10) == [list(range(10))]
+
+
+def test_chunks_overlap_and_cover_the_input():
+    ids = list(range(100))
+    chunks = chunk_token_ids(ids, chunk_tokens=40, overlap=10)
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert chunks[0][-10:] == chunks[1][:10]
+    assert chunks[-1][-1] == 99
+    assert sorted(set(i for chunk in chunks for i in chunk)) == ids
+
+
+def test_chunk_count_is_capped():
+    chunks = chunk_token_ids(list(range(1000)), chunk_tokens=50, overlap=0, max_chunks=3)
+    assert len(chunks) == 3
+    assert chunks[-1][-1] == 149
+
+
+def test_token_ids_are_cached_per_fingerprint():
+    tokenizer = WordTokenizer()
+    article = "alpha beta gamma delta " * 50
+    first = article_token_ids(tokenizer, article, "fp-cached")
+    assert article_token_ids(tokenizer, article, "fp-cached") == first
+    assert tokenizer.encode_calls == 1
+    # Scoring reads the same cached ids
+    assert article_head(tokenizer, article, "fp-cached", max_tokens=4) == "xxxxx xxxx xxxxx xxxxx"
+    assert tokenizer.encode_calls == 1
+
+
+def test_head_keeps_short_articles_verbatim():
+    tokenizer = WordTokenizer()
+    assert article_head(tokenizer, "Short  article.", max_tokens=10) == "Short  article."
+
+
+def test_window_leaves_room_for_generation_on_decoder_only_models():
+    tokenizer = WordTokenizer()
+    seq2seq = SimpleNamespace(config=SimpleNamespace(max_position_embeddings=1024, is_encoder_decoder=True))
+    causal = SimpleNamespace(config=SimpleNamespace(max_position_embeddings=1024, is_encoder_decoder=False))
+    assert max_input_tokens(tokenizer, seq2seq) > max_input_tokens(tokenizer, causal)
+    assert max_input_tokens(tokenizer, seq2seq) <= 1024
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test histogram timing and the Prometheus text rendering
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.metrics import Counter, Gauge, Histogram, get_metric, render
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_render_seconds", "Render test", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, "fetch")
+    histogram.observe(0.5, "fetch")
+    histogram.observe(5.0, "fetch")
+    text = render()
+    assert "# TYPE test_render_seconds histogram" in text
+    assert 'test_render_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{stage="fetch",le="1"} 2' in text
+    assert 'test_render_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'test_render_seconds_count{stage="fetch"} 3' in text
+    assert 'test_render_seconds_sum{stage="fetch"} 5.55' in text
+
+
+def test_timed_decorator_records_each_call_and_exceptions():
+    histogram = Histogram("test_timed_seconds", "Timed test", ["method"])
+
+    @histogram.timed("get_news")
+    def get_news(fail=False):
+        if fail:
+            raise RuntimeError("db down")
+        return "rows"
+
+    assert get_news() == "rows"
+    with pytest.raises(RuntimeError):
+        get_news(fail=True)
+    assert histogram.count("get_news") == 2
+    with histogram.time("save_news"):
+        pass
+    assert histogram.count("save_news") == 1
+
+
+def test_label_count_and_duplicate_names_are_rejected():
+    histogram = Histogram("test_labels_seconds", "Labels test", ["cache", "op"])
+    with pytest.raises(ValueError):
+        histogram.observe(0.1, "summary")
+    with pytest.raises(ValueError):
+        Histogram("test_labels_seconds", "Duplicate")
+    assert get_metric("test_labels_seconds") is histogram
+
+
+def test_counter_and_gauge():
+    counter = Counter("test_jobs_total", "Counter test", ["status"])
+    counter.inc("ok")
+    counter.inc("ok", amount=2)
+    assert counter.value("ok") == 3
+    Gauge("test_queue_depth", "Gauge test", lambda: 7)
+    Gauge("test_broken_gauge", "Broken gauge", lambda: 1 / 0)
+    text = render()
+    assert 'test_jobs_total{status="ok"} 3' in text
+    assert "test_queue_depth 7" in text
+    # A failing callback drops its sample but not the scrape
+    assert "# TYPE test_broken_gauge gauge\n" in text
+    assert not any(line.startswith("test_broken_gauge ") for line in text.splitlines())
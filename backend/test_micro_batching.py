@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test dynamic micro-batching and length-bucketed batch planning
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.batching import MicroBatcher, plan_length_batches, padding_stats
+
+TINY_SUMMARIZATION_MODEL = os.getenv("TINY_SUMMARIZATION_MODEL", "sshleifer/bart-tiny-random")
+
+
+def test_concurrent_requests_share_a_batch():
+    batch_sizes = []
+
+    def batch_fn(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.02)  # simulated forward pass
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: batcher.submit(f"article {i}").result(timeout=5), range(16)))
+    batcher.stop()
+
+    # Every caller gets its own result back
+    assert results == [f"ARTICLE {i}" for i in range(16)]
+    assert max(batch_sizes) > 1
+    assert all(size <= 8 for size in batch_sizes)
+    assert batcher.stats()["items"] == 16
+
+
+def test_single_request_waits_at_most_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=8, max_wait_ms=5)
+    start = time.monotonic()
+    assert batcher.submit("only").result(timeout=1) == "only"
+    assert time.monotonic() - start < 0.5
+    batcher.stop()
+
+
+def test_batch_failure_reaches_every_caller():
+    def batch_fn(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=10)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        assert isinstance(future.exception(timeout=1), ValueError)
+    batcher.stop()
+
+
+def test_length_plan_respects_budget_and_covers_all_items():
+    lengths = [300, 4000, 320, 290, 3900, 310, 305, 4100]
+    plan = plan_length_batches(lengths, max_batch_tokens=8192, max_batch_size=8)
+    assert sorted(i for batch in plan for i in batch) == list(range(len(lengths)))
+    for batch in plan:
+        assert len(batch) == 1 or max(lengths[i] for i in batch) * len(batch) <= 8192
+
+
+def test_length_plan_reduces_padding():
+    lengths = [300, 4000, 320, 290, 3900, 310, 305, 4100]
+    fixed = [list(range(0, 4)), list(range(4, 8))]
+    bucketed = plan_length_batches(lengths, max_batch_tokens=16384, max_batch_size=4)
+    assert padding_stats(lengths, bucketed)["padding_ratio"] < padding_stats(lengths, fixed)["padding_ratio"]
+
+
+def test_tiny_model_micro_batching(monkeypatch):
+    """Runs the real summary batcher on CPU with a tiny HF model"""
+    import pytest
+    transformers = pytest.importorskip("transformers")
+    import app.model_inference as mi
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained(TINY_SUMMARIZATION_MODEL)
+    model = transformers.AutoModelForSeq2SeqLM.from_pretrained(TINY_SUMMARIZATION_MODEL)
+    # Restored on teardown so later tests do not inherit the tiny model
+    monkeypatch.setattr(mi, "TOKENIZER", tokenizer)
+    monkeypatch.setattr(mi, "MODEL", model)
+    monkeypatch.setattr(mi, "SUMMARIZER",
+                        transformers.pipeline("summarization", model=model, tokenizer=tokenizer, device=-1))
+    monkeypatch.setattr(mi, "_model_loaded", True)
+
+    articles = [f"Story {i}: " + "The council approved the new transit plan after a long debate. " * 5
+                for i in range(6)]
+    barrier = threading.Barrier(len(articles))
+
+    def call(article):
+        barrier.wait()
+        return mi.submit_summary(article, use_cache=False).result(timeout=120)
+
+    with ThreadPoolExecutor(max_workers=len(articles)) as pool:
+        summaries = list(pool.map(call, articles))
+
+    assert len(summaries) == len(articles)
+    assert all(isinstance(summary, str) for summary in summaries)
+    assert mi.summary_batcher.stats()["max_batch_size_seen"] > 1
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_a_batch()
+    test_single_request_waits_at_most_max_wait()
+    test_batch_failure_reaches_every_caller()
+    test_length_plan_respects_budget_and_covers_all_items()
+    test_length_plan_reduces_padding()
+    print("✅ Micro-batching tests passed")
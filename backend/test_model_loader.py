@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test single-flight model loading and the warm pool
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.model_loader import ModelLoader
+
+
+def test_concurrent_first_calls_load_once():
+    calls = []
+    lock = threading.Lock()
+
+    def load_fn(name):
+        with lock:
+            calls.append(name)
+        time.sleep(0.05)  # simulated from_pretrained
+        return object()
+
+    loader = ModelLoader(load_fn)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        models = list(pool.map(lambda _: loader.get("7b"), range(16)))
+
+    assert calls == ["7b"]
+    assert all(model is models[0] for model in models)
+    stats = loader.stats()
+    assert stats["loads"] == 1
+    assert stats["models"]["7b"]["status"] == "ready"
+    assert stats["models"]["7b"]["load_seconds"] >= 0.05
+
+
+def test_failed_load_is_retried():
+    attempts = []
+
+    def load_fn(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise RuntimeError("out of memory")
+        return "model"
+
+    loader = ModelLoader(load_fn)
+    with pytest.raises(RuntimeError):
+        loader.get("7b")
+    assert not loader.is_loaded("7b")
+    assert loader.get("7b") == "model"
+    assert loader.stats()["failures"] == 1
+
+
+def test_warm_pool_loads_variants_in_background():
+    loader = ModelLoader(lambda name: f"model:{name}")
+    for thread in loader.warm(["base", "finetuned"]):
+        thread.join(timeout=5)
+
+    assert loader.is_loaded("base") and loader.is_loaded("finetuned")
+    assert loader.get("finetuned") == "model:finetuned"
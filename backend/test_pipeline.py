@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test the staged ingest pipeline offline with fixture feeds and an in-memory store
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.pipeline import Pipeline, Stage, build_ingest_pipeline, parse_workers, run_ingest
+from app.refresh_coordinator import LockLost
+
+FEEDS = {
+    "Wire": [
+        {"title": "Storm hits coast", "link": "https://wire.test/storm", "summary": "Storm story."},
+        {"title": "Markets rally", "link": "https://wire.test/markets", "summary": "Markets story."},
+        {"title": "Broken page", "link": "https://wire.test/broken", "summary": ""},
+    ],
+    "Daily": [
+        {"title": "Storm hits coast", "link": "https://daily.test/storm", "summary": "Storm story."},
+        {"title": "Old news", "link": "https://daily.test/old", "summary": "Already stored."},
+    ],
+}
+PAGES = {
+    "https://wire.test/storm": "The storm reached the coast overnight.",
+    "https://daily.test/storm": "The storm reached the coast overnight.",
+    "https://daily.test/old": "An article ingested by an earlier run.",
+}
+
+
+class MemoryStore:
+    def __init__(self, titles=()):
+        self.rows = {title: {"title": title} for title in titles}
+
+    def exists(self, title):
+        return title in self.rows
+
+    def save(self, items):
+        inserted = [item for item in items if item["title"] not in self.rows]
+        for item in inserted:
+            self.rows[item["title"]] = dict(item)
+        return inserted
+
+    def update_summary(self, news_id, summary):
+        for row in self.rows.values():
+            if row.get("id") == news_id:
+                row["ai_summary"] = summary
+                return True
+        return False
+
+
+def fixture_fetch(source_name, feed_url):
+    return [dict(entry, source=source_name, date="2026-01-01T00:00:00+00:00") for entry in FEEDS[source_name]]
+
+
+def fixture_scrape(url, fallback):
+    if url.endswith("/broken"):
+        raise ConnectionError("page unavailable")
+    return PAGES.get(url, fallback)
+
+
+def fixture_summarize(content, fingerprint):
+    return {"brief": content[:20], "detailed": content, "structure_score": 4.0}
+
+
+def test_parse_workers():
+    assert parse_workers("scrape=16, summarize=8") == {"scrape": 16, "summarize": 8}
+    with pytest.raises(ValueError):
+        parse_workers("scrape=0")
+
+
+def test_ingest_run_dedups_persists_summarizes_and_scores():
+    store = MemoryStore(titles=["Old news"])
+    stats = run_ingest(
+        sources=[(name, f"fixture://{name}") for name in FEEDS],
+        fetch=fixture_fetch, scrape=fixture_scrape, store=store,
+        summarize=fixture_summarize, score=lambda content, brief, fingerprint: 7.5,
+    )
+    stages = stats["stages"]
+    assert stages["fetch"]["emitted"] == 5
+    assert stages["scrape"]["failed"] == 1  # one broken page does not stop the run
+    assert stages["dedup"]["processed"] == 4 and stages["dedup"]["emitted"] == 2
+    assert stages["score"]["emitted"] == 2
+    assert stats["results"] == 2
+    stored = {title: row for title, row in store.rows.items() if title != "Old news"}
+    assert sorted(stored) == ["Markets rally", "Storm hits coast"]
+    assert all(row["ai_summary"]["importance_score"] == 7.5 for row in stored.values())
+
+
+@pytest.mark.parametrize("failed", ["brief", "detailed"])
+def test_failed_summary_leaves_row_pending(failed):
+    def summarize(content, fingerprint):
+        return {**fixture_summarize(content, fingerprint), failed: "Summary generation failed"}
+
+    store = MemoryStore()
+    pipeline = build_ingest_pipeline(
+        fetch=fixture_fetch, scrape=fixture_scrape, store=store, summarize=summarize,
+        score=lambda *args: pytest.fail("scored an unsummarized article"),
+    )
+    assert asyncio.run(pipeline.run([("Wire", "fixture://Wire")])) == []
+    assert pipeline.stats()["stages"]["summarize"]["failed"] == 0
+    assert all("ai_summary" not in row for row in store.rows.values())
+    assert len(store.rows) == 2
+
+
+def test_lost_lock_aborts_the_run_before_further_writes():
+    store = MemoryStore()
+    fenced = []
+
+    def fence():
+        fenced.append(1)
+        if len(fenced) > 1:
+            raise LockLost(1)
+
+    pipeline = build_ingest_pipeline(
+        fetch=fixture_fetch, scrape=fixture_scrape, store=store, summarize=fixture_summarize,
+        score=lambda content, brief, fingerprint: 7.5, fence=fence,
+    )
+    with pytest.raises(LockLost):
+        asyncio.run(pipeline.run([("Wire", "fixture://Wire")]))
+    assert all("ai_summary" not in row for row in store.rows.values())
+
+
+def test_summary_survives_a_failed_score_and_scoring_is_opt_in():
+    def failing_score(content, brief, fingerprint):
+        raise RuntimeError("model unavailable")
+
+    store = MemoryStore()
+    pipeline = build_ingest_pipeline(fetch=fixture_fetch, scrape=fixture_scrape, store=store,
+                                     summarize=fixture_summarize, score=failing_score)
+    assert asyncio.run(pipeline.run([("Wire", "fixture://Wire")])) == []
+    assert all(row["ai_summary"]["brief"] for row in store.rows.values())
+
+    # Without a score function (and PIPELINE_MODEL_SCORING unset) no model is loaded
+    pipeline = build_ingest_pipeline(fetch=fixture_fetch, scrape=fixture_scrape, store=MemoryStore(),
+                                     summarize=fixture_summarize)
+    assert [stage.name for stage in pipeline.stages][-1] == "summarize"
+    assert len(asyncio.run(pipeline.run([("Wire", "fixture://Wire")]))) == 2
+
+
+def test_rows_already_stored_at_persist_time_are_not_resummarized():
+    class RacingStore(MemoryStore):
+        def exists(self, title):
+            return False  # another writer inserts the row between dedup and persist
+
+    store = RacingStore(titles=["Markets rally"])
+    summarized = []
+
+    def summarize(content, fingerprint):
+        summarized.append(content)
+        return fixture_summarize(content, fingerprint)
+
+    pipeline = build_ingest_pipeline(fetch=fixture_fetch, scrape=fixture_scrape, store=store, summarize=summarize)
+    assert [item["title"] for item in asyncio.run(pipeline.run([("Wire", "fixture://Wire")]))] == ["Storm hits coast"]
+    assert summarized == [PAGES["https://wire.test/storm"]]
+    assert "ai_summary" not in store.rows["Markets rally"]
+
+
+def test_slow_stage_applies_backpressure_and_stages_overlap():
+    events = []
+
+    def produce(n):
+        events.append(("produced", n))
+        return n
+
+    def slow_consume(n):
+        time.sleep(0.01)
+        events.append(("consumed", n))
+        return n
+
+    pipeline = Pipeline([Stage("produce", produce, workers=2, maxsize=2),
+                         Stage("consume", slow_consume, workers=1, maxsize=2)])
+    results = asyncio.run(pipeline.run(range(20)))
+    assert sorted(results) == list(range(20))
+    stats = pipeline.stats()["stages"]
+    assert stats["consume"]["max_depth"] <= 2
+    assert stats["consume"]["processed"] == 20
+    # Consumption starts long before production has finished
+    first_consumed = events.index(next(e for e in events if e[0] == "consumed"))
+    last_produced = max(i for i, e in enumerate(events) if e[0] == "produced")
+    assert first_consumed < last_produced
+
+
+def test_batched_stage_gets_lists():
+    batches = []
+
+    def persist(items):
+        batches.append(len(items))
+        return items
+
+    async def source(n):
+        await asyncio.sleep(0)
+        return n
+
+    pipeline = Pipeline([Stage("source", source, workers=4), Stage("persist", persist, batch_size=5)])
+    assert sorted(asyncio.run(pipeline.run(range(12)))) == list(range(12))
+    assert sum(batches) == 12 and max(batches) <= 5
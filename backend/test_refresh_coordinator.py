@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test the lock-protected refresh coordinator with an in-memory Redis
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import refresh_coordinator as rc
+import pytest
+
+from app.refresh_coordinator import LocalLock, LockLost, RedisLock, RefreshCoordinator
+
+
+class FakeRedis:
+    """The Redis commands RedisLock uses, with PX expiry; scripts are emulated by identity"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+        self.hashes = {}
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        if key in self.expires and time.monotonic() >= self.expires[key]:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return self.values.get(key)
+
+    def incr(self, key):
+        with self.lock:
+            self.values[key] = str(int(self.values.get(key, "0")) + 1)
+            return int(self.values[key])
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and self._get(key) is not None:
+                return None
+            self.values[key] = value
+            if px:
+                self.expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def hget(self, key, field):
+        with self.lock:
+            return self.hashes.get(key, {}).get(field)
+
+    def eval(self, script, numkeys, key, *args):
+        with self.lock:
+            if script == rc._RELEASE_SCRIPT:
+                if self._get(key) != args[0]:
+                    return 0
+                self.values.pop(key, None)
+                return 1
+            if script == rc._RENEW_SCRIPT:
+                if self._get(key) != args[0]:
+                    return 0
+                self.expires[key] = time.monotonic() + int(args[1]) / 1000
+                return 1
+            if script == rc._RECORD_SCRIPT:
+                last = int(self.hashes.get(key, {}).get("token", 0))
+                if int(args[0]) <= last:
+                    return 0
+                self.hashes.setdefault(key, {}).update(token=args[0], finished_at=args[1], status=args[2])
+                if args[2] == "ok":
+                    self.hashes[key]["succeeded_at"] = args[1]
+                return 1
+            raise NotImplementedError(script)
+
+
+def test_redis_lock_is_exclusive_and_fenced():
+    redis = FakeRedis()
+    first, second = RedisLock(redis, ttl=0.05), RedisLock(redis, ttl=0.05)
+    token = first.acquire()
+    assert token is not None
+    assert second.acquire() is None
+    time.sleep(0.06)  # first holder stalls past the TTL
+    newer = second.acquire()
+    assert newer > token
+    # The stale holder can neither renew, release nor record over the newer holder
+    assert not first.renew(token)
+    first.release(token)
+    assert RedisLock(redis).acquire() is None
+    assert second.record(newer, "ok")
+    assert not first.record(token, "ok")
+    second.release(newer)
+    assert first.acquire() is not None
+
+
+def test_only_one_coordinator_runs_at_a_time():
+    redis = FakeRedis()
+    started, finish = threading.Event(), threading.Event()
+    runs = []
+
+    def job(lease):
+        runs.append(threading.current_thread().name)
+        started.set()
+        finish.wait(5)
+
+    coordinators = [RefreshCoordinator(job, RedisLock(redis)) for _ in range(3)]
+    worker = threading.Thread(target=coordinators[0].run_once, name="first")
+    worker.start()
+    started.wait(5)
+    assert not coordinators[1].run_once()
+    assert not coordinators[2].run_once()
+    finish.set()
+    worker.join(5)
+    assert runs == ["first"]
+    assert coordinators[1].stats()["skipped"] == 1
+    # Lock released after the run, but the refresh is recent: the next tick skips it
+    assert not coordinators[1].run_once()
+    assert coordinators[1].lock.acquire() is not None
+
+
+def test_sequential_ticks_refresh_once_per_interval():
+    redis = FakeRedis()
+    runs = []
+    coordinators = [RefreshCoordinator(runs.append, RedisLock(redis), interval=900) for _ in range(3)]
+    # Each instance ticks on its own timer, one after another, never contending for the lock
+    assert [coordinator.run_once() for coordinator in coordinators] == [True, False, False]
+    assert len(runs) == 1
+    assert [c.stats()["skipped"] for c in coordinators] == [0, 1, 1]
+    # Once the interval has passed since the last success, the next tick refreshes again
+    coordinators[1].interval = 0
+    assert coordinators[1].run_once() and len(runs) == 2
+
+
+def test_failed_run_does_not_count_as_recent():
+    def failing_job(lease):
+        raise RuntimeError("feeds down")
+
+    redis = FakeRedis()
+    assert RefreshCoordinator(failing_job, RedisLock(redis)).run_once()
+    runs = []
+    assert RefreshCoordinator(runs.append, RedisLock(redis)).run_once() and len(runs) == 1
+
+
+def test_failures_back_off_exponentially_with_jitter():
+    def failing_job(lease):
+        raise RuntimeError("feeds down")
+
+    coordinator = RefreshCoordinator(failing_job, LocalLock(), interval=900, jitter=0.1, retry=60,
+                                     backoff_max=300)
+    assert 810 <= coordinator.next_delay() <= 990
+    delays = []
+    for _ in range(4):
+        assert coordinator.run_once()
+        delays.append(coordinator.next_delay())
+    assert 54 <= delays[0] <= 66 and 108 <= delays[1] <= 132
+    assert all(270 <= delay <= 330 for delay in delays[3:])  # capped
+    coordinator.job = lambda lease: None
+    coordinator.run_once()
+    assert coordinator.failures == 0
+    assert coordinator.lock.acquire() is not None  # released after every run
+
+
+def test_lost_lock_aborts_the_job_at_its_next_write():
+    redis = FakeRedis()
+    writes = []
+
+    def job(lease):
+        lease.check()
+        writes.append("first")
+        time.sleep(0.1)  # stalls past the TTL; another instance takes the lock meanwhile
+        assert second.acquire() is not None
+        lease.check()
+        writes.append("stale")
+
+    lock = RedisLock(redis, ttl=0.05)
+    lock.renew = lambda token: RedisLock.renew(lock, token) and not writes  # heartbeat cannot keep it
+    second = RedisLock(redis, ttl=5)
+    coordinator = RefreshCoordinator(job, lock)
+    assert coordinator.run_once()
+    assert writes == ["first"]
+    stats = coordinator.stats()
+    assert stats["lost_lock"] == 1 and stats["failed"] == 0
+    assert "token" not in redis.hashes.get(lock.runs_key, {})  # the aborted run is not recorded
+
+
+def test_lease_check_rejects_a_superseded_token():
+    redis = FakeRedis()
+    seen = []
+    coordinator = RefreshCoordinator(seen.append, RedisLock(redis))
+    coordinator.run_once()
+    with pytest.raises(LockLost):
+        seen[0].check()  # released after the run
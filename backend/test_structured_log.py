@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test level gating, sampling and per-request summaries of the structured logger
+"""
+
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.structured_log import StructuredLogger, format_event
+
+
+class Unformattable:
+    """Fails the test if a disabled event ever formats its fields"""
+
+    def __str__(self):
+        raise AssertionError("disabled event was formatted")
+
+
+def _logger(caplog, level, name, **kwargs):
+    caplog.set_level(level, logger=name)
+    return StructuredLogger(name, **kwargs)
+
+
+def test_text_and_json_formats():
+    assert format_event("get_news", {"rows": 3, "source": "BBC News"}) == 'get_news rows=3 source="BBC News"'
+    assert json.loads(format_event("get_news", {"rows": 3}, fmt="json")) == {"event": "get_news", "rows": 3}
+
+
+def test_disabled_levels_do_not_format(caplog):
+    log = _logger(caplog, logging.INFO, "test.gating")
+    log.debug("news_row", title=Unformattable())
+    log.sampled("news_row", rate=1.0, title=Unformattable())
+    log.info("get_news", rows=2)
+    assert [record.getMessage() for record in caplog.records] == ["get_news rows=2"]
+
+
+def test_sampling_rate(caplog):
+    log = _logger(caplog, logging.DEBUG, "test.sampling", sample_rate=0.0)
+    for _ in range(100):
+        log.sampled("news_row")
+    assert not caplog.records
+    for _ in range(3):
+        log.sampled("news_row", rate=1.0)
+    assert len(caplog.records) == 3
+    assert caplog.records[0].getMessage() == "news_row sample_rate=1.0"
+
+
+def test_request_summary_has_counts_and_duration(caplog):
+    log = _logger(caplog, logging.INFO, "test.request")
+    with log.request("save_news", items=5) as summary:
+        summary["saved"] = 4
+    message = caplog.records[-1].getMessage()
+    assert message.startswith("save_news items=5 saved=4 duration_ms=")
+
+    with pytest.raises(RuntimeError):
+        with log.request("save_news", items=1):
+            raise RuntimeError("db down")
+    assert caplog.records[-1].levelno == logging.ERROR
+    assert caplog.records[-1].getMessage().endswith('error="db down"')
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the inference worker pool: core partitioning, job batching and reply routing
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.executor import InferenceBusy
+from app.worker_pool import LocalTransport, WorkerClient, WorkerTimeout, partition_cores, serve
+
+
+def test_partition_cores_splits_evenly():
+    assert partition_cores(2, list(range(8))) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert partition_cores(3, list(range(8))) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    # Never more processes than cores
+    assert partition_cores(4, [0, 1]) == [[0], [1]]
+
+
+def _start_worker(transport, handler, max_jobs=8):
+    stop = threading.Event()
+    thread = threading.Thread(target=serve, args=(transport, handler, max_jobs, 0.05, stop), daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_jobs_are_batched_and_replies_routed():
+    batch_sizes = []
+
+    def handler(articles):
+        batch_sizes.append(len(articles))
+        return [{"summary": article.upper(), "score": 0.5} for article in articles]
+
+    transport = LocalTransport()
+    client = WorkerClient(transport)
+    # Queue jobs before the worker starts so they are picked up together
+    futures = [client.submit([f"a{i}", f"b{i}"]) for i in range(4)]
+    stop, thread = _start_worker(transport, handler)
+
+    for i, future in enumerate(futures):
+        assert [r["summary"] for r in future.result(timeout=5)] == [f"A{i}", f"B{i}"]
+    assert len(batch_sizes) < 4  # at least two jobs shared a batch
+    assert client.stats()["completed"] == 4
+    client.close()
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_handler_errors_fail_the_jobs():
+    def handler(articles):
+        raise RuntimeError("model crashed")
+
+    transport = LocalTransport()
+    client = WorkerClient(transport)
+    stop, thread = _start_worker(transport, handler)
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        client.submit(["article"]).result(timeout=5)
+    client.close()
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_jobs_are_grouped_by_adapter():
+    calls = []
+
+    def handler(articles, adapter=None):
+        calls.append((adapter, len(articles)))
+        return [{"summary": article, "model_version": adapter or "base"} for article in articles]
+
+    transport = LocalTransport()
+    client = WorkerClient(transport)
+    futures = [client.submit(["a"]), client.submit(["b"], adapter="finance"), client.submit(["c"])]
+    stop, thread = _start_worker(transport, handler)
+
+    assert [future.result(timeout=5)[0]["model_version"] for future in futures] == ["base", "finance", "base"]
+    assert all(count == 1 for adapter, count in calls if adapter == "finance")
+    client.close()
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_full_queue_rejects_and_silent_workers_time_out():
+    client = WorkerClient(LocalTransport(), max_pending=2)
+    client.submit(["a"])
+    client.submit(["b"])  # no worker is running: both stay pending
+    with pytest.raises(InferenceBusy):
+        client.submit(["c"])
+    with pytest.raises(InferenceBusy):
+        client.check_capacity()
+    assert client.stats()["rejected"] == 2
+
+    idle = WorkerClient(LocalTransport())
+    with pytest.raises(WorkerTimeout):
+        asyncio.run(idle.process_async(["a"], timeout=0.05))
+    assert idle.stats()["timed_out"] == 1 and idle.stats()["pending"] == 0
+    client.close()
+    idle.close()
@@ -22,6 +22,7 @@ import deepspeed
 from typing import Dict, List
 import json
 import logging
+from app.prompts import format_instruction_prompt
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,30 +51,6 @@ def load_training_data(dataset_path: str) -> Dataset:
     logger.info(f"Loaded {len(data)} article-summary pairs")
     return Dataset.from_list(data)
 
-def format_instruction_prompt(article: str, summary: str = None) -> str:
-    """
-    Format training data as instruction-following prompts.
-    This enables instruction-tuning for better summarization performance.
-    """
-    if summary:
-        return f"""### Instruction:
-Summarize the following news article concisely and accurately.
-
-### Article:
-{article}
-
-### Summary:
-{summary}"""
-    else:
-        return f"""### Instruction:
-Summarize the following news article concisely and accurately.
-
-### Article:
-{article}
-
-### Summary:
-"""
-
 def preprocess_function(examples: Dict, tokenizer: AutoTokenizer) -> Dict:
     """
     Preprocess training examples into tokenized format.
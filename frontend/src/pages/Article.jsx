@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { fetchSummary, fetchArticleByTitle } from '../services/api';
+import { fetchSummary, fetchStoredSummary, fetchArticleByTitle } from '../services/api';
 
 // Format relative time
 function formatRelativeTime(dateString) {
@@ -96,7 +96,9 @@ export default function Article() {
       if (cached) {
         setSummary(stripHtml(cached));
       } else {
-        const result = await fetchSummary(article.content, summaryType);
+        // Prefer the summary stored at ingest time, generate on demand only as a fallback
+        const stored = article.id ? await fetchStoredSummary(article.id, summaryType) : null;
+        const result = stored || await fetchSummary(article.content, summaryType);
         localStorage.setItem(key, result);
         setSummary(stripHtml(result));
       }
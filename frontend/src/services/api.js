@@ -139,6 +139,23 @@ export const generateSummary = async (content, summaryType = 'detailed') => {
   }
 };
 
+// Get summary generated at ingest time (returns null if not ready yet)
+export const fetchStoredSummary = async (articleId, summaryType = 'detailed') => {
+  try {
+    const params = new URLSearchParams({ type: summaryType });
+    const response = await fetch(`${API_BASE}/news/summary/${encodeURIComponent(articleId)}?${params}`);
+    if (!response.ok) {
+      return null;
+    }
+    
+    const data = await response.json();
+    return data.summary || null;
+  } catch (error) {
+    console.error('Error fetching stored summary:', error);
+    return null;
+  }
+};
+
 // Compatibility function alias
 export const fetchSummary = async (content, type = 'detailed') => {
   const result = await generateSummary(content, type);